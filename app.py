@@ -1,14 +1,27 @@
-from flask import Flask, request, jsonify, render_template_string, send_file, session
-from services.match_percentage import get_match_score
-from services.skills_analysis import analyze_skills
+from flask import Flask, request, jsonify, render_template_string, send_file, session, Response, stream_with_context
+from services.batch_analysis import analyze_batch, ANALYSIS_MODES
+from services.skills_analysis import SKILLS_MODES
+from services.prefilter import PREFILTER_METHODS
+from services.talent_pool import (
+    get_talent_pool, get_talent_pool_stats, TALENT_POOL_TOP_K, TALENT_POOL_ADMIN_TOKEN
+)
+from services.llm_utils import (
+    get_cache_stats, get_rate_limit_stats, get_structured_output_stats, get_token_usage_stats,
+    get_single_flight_stats, get_llm_resilience_stats
+)
+from services.stream_results import get_stream_result_store, RUNNING, EXPIRED
+from services.token_utils import load_encoding
+from services.metrics import ANALYSIS_SECONDS, ANALYSIS_IN_FLIGHT, EXPORT_SECONDS, render_metrics
 from utils.resume_parser import get_all_resumes, extract_resume_text
+from utils.extraction_pool import extract_many
+from utils.extraction_cache import get_extraction_cache_stats
+from utils.zip_reader import read_zip_members, ZipLimitError
 import os
+import hmac
 import json
 import csv
-import tempfile
 from datetime import datetime
 import zipfile
-import shutil
 from werkzeug.utils import secure_filename
 import pandas as pd
 from reportlab.lib.pagesizes import letter, A4
@@ -17,12 +30,15 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 import io
+import queue
+import threading
+import uuid
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'
 
 # Configure upload settings
-UPLOAD_FOLDER = 'uploads'
+UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc', 'txt'}
 
 if not os.path.exists(UPLOAD_FOLDER):
@@ -31,6 +47,9 @@ if not os.path.exists(UPLOAD_FOLDER):
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
 
+# Load the tokenizer now (briefly) rather than on the first request's path
+load_encoding()
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
@@ -280,6 +299,97 @@ def home():
                                 </div>
                             </div>
                         </div>
+                        <div class="row mt-3">
+                            <div class="col-md-6">
+                                <div class="form-check">
+                                    <input class="form-check-input" type="radio" name="uploadType" id="poolUpload" value="pool">
+                                    <label class="form-check-label" for="poolUpload">
+                                        <i class="fas fa-database"></i> Talent Pool (previously uploaded resumes)
+                                    </label>
+                                </div>
+                                <div id="poolArea" class="mt-3" style="display: none;">
+                                    <label for="poolTopK" class="form-label">Best matches to analyze</label>
+                                    <input type="number" class="form-control" id="poolTopK" name="poolTopK" min="1" placeholder="Server default">
+                                </div>
+                            </div>
+                        </div>
+                    </div>
+
+                    <!-- Analysis Options Section -->
+                    <div class="form-section">
+                        <h3 class="section-title">
+                            <i class="fas fa-sliders-h"></i> Analysis Options
+                        </h3>
+                        <div class="row">
+                            <div class="col-md-6">
+                                <div class="form-check">
+                                    <input class="form-check-input" type="checkbox" id="bypassCache" name="bypassCache">
+                                    <label class="form-check-label" for="bypassCache">
+                                        Bypass cached results
+                                    </label>
+                                </div>
+                                <div class="form-text">Re-run every resume against the model instead of reusing earlier responses.</div>
+                                <div class="form-check mt-2">
+                                    <input class="form-check-input" type="checkbox" id="keepDuplicates" name="keepDuplicates">
+                                    <label class="form-check-label" for="keepDuplicates">
+                                        Analyze every copy of duplicate resumes
+                                    </label>
+                                </div>
+                                <div class="form-text">By default near-identical resumes (e.g. PDF and DOCX of one CV) are analyzed once.</div>
+                                <div class="form-check mt-2">
+                                    <input class="form-check-input" type="checkbox" id="packRequests" name="packRequests">
+                                    <label class="form-check-label" for="packRequests">
+                                        Score several resumes per request
+                                    </label>
+                                </div>
+                                <div class="form-text">Fewer, larger requests for ZIP uploads of short resumes.</div>
+                                <div class="form-check mt-2">
+                                    <input class="form-check-input" type="checkbox" id="cascade" name="cascade">
+                                    <label class="form-check-label" for="cascade">
+                                        Pre-screen large batches with a cheaper model
+                                    </label>
+                                </div>
+                                <div class="form-text">Only the shortlisted resumes get the full analysis.</div>
+                                <div class="form-check mt-2">
+                                    <input class="form-check-input" type="checkbox" id="prefilter" name="prefilter">
+                                    <label class="form-check-label" for="prefilter">
+                                        Keyword pre-filter before any model call
+                                    </label>
+                                </div>
+                                <div class="form-text">Ranks large batches locally; only the best matches are sent to the model.</div>
+                            </div>
+                            <div class="col-md-6">
+                                <label for="analysisMode" class="form-label">Analysis Mode</label>
+                                <select class="form-select" id="analysisMode" name="analysisMode">
+                                    <option value="">Server default</option>
+                                    <option value="separate">Separate match and skills calls</option>
+                                    <option value="fused">Fused single call (fewer tokens)</option>
+                                </select>
+                                <label for="skillsMode" class="form-label mt-2">Skills Matching</label>
+                                <select class="form-select" id="skillsMode" name="skillsMode">
+                                    <option value="">Server default</option>
+                                    <option value="llm">Model lists matched and missing skills</option>
+                                    <option value="local">Local keyword matching only (no model call)</option>
+                                    <option value="hybrid">Local matching, model adds gaps and recommendations</option>
+                                </select>
+                                <label for="prefilterMethod" class="form-label mt-2">Pre-filter Ranking</label>
+                                <select class="form-select" id="prefilterMethod" name="prefilterMethod">
+                                    <option value="">Server default</option>
+                                    <option value="bm25">BM25 keyword relevance</option>
+                                    <option value="tfidf">TF-IDF cosine similarity</option>
+                                </select>
+                                <div class="row mt-2">
+                                    <div class="col-6">
+                                        <label for="prefilterTopK" class="form-label">Pre-filter Top K</label>
+                                        <input type="number" class="form-control" id="prefilterTopK" name="prefilterTopK" min="0" placeholder="Server default">
+                                    </div>
+                                    <div class="col-6">
+                                        <label for="prefilterMinScore" class="form-label">Pre-filter Min Relevance</label>
+                                        <input type="number" class="form-control" id="prefilterMinScore" name="prefilterMinScore" min="0" max="100" placeholder="Server default">
+                                    </div>
+                                </div>
+                            </div>
+                        </div>
                     </div>
 
                     <!-- Submit Button -->
@@ -295,6 +405,8 @@ def home():
                     <div class="spinner"></div>
                     <h4>Analyzing resumes...</h4>
                     <p>This may take a few minutes depending on the number of resumes.</p>
+                    <p id="progressText" class="text-muted"></p>
+                    <ul id="liveScores" class="list-unstyled"></ul>
                 </div>
 
                 <!-- Results Section -->
@@ -322,13 +434,9 @@ def home():
             // Toggle upload type
             document.querySelectorAll('input[name="uploadType"]').forEach(radio => {
                 radio.addEventListener('change', function() {
-                    if (this.value === 'single') {
-                        document.getElementById('singleUpload').style.display = 'block';
-                        document.getElementById('folderUploadArea').style.display = 'none';
-                    } else {
-                        document.getElementById('singleUpload').style.display = 'none';
-                        document.getElementById('folderUploadArea').style.display = 'block';
-                    }
+                    document.getElementById('singleUpload').style.display = this.value === 'single' ? 'block' : 'none';
+                    document.getElementById('folderUploadArea').style.display = this.value === 'folder' ? 'block' : 'none';
+                    document.getElementById('poolArea').style.display = this.value === 'pool' ? 'block' : 'none';
                 });
             });
 
@@ -367,21 +475,36 @@ def home():
                 // Show loading
                 document.getElementById('loading').style.display = 'block';
                 document.getElementById('results').style.display = 'none';
+                document.getElementById('downloadButtons').style.display = 'none';
+                document.getElementById('progressText').textContent = '';
+                document.getElementById('liveScores').innerHTML = '';
+                analysisResults = [];
                 
                 try {
-                    const response = await fetch('/analyze', {
+                    // Results are streamed back as Server-Sent Events
+                    const response = await fetch('/analyze-stream', {
                         method: 'POST',
                         body: formData
                     });
                     
-                    const result = await response.json();
-                    
-                    if (result.success) {
-                        analysisResults = result.results;
-                        displayResults(result.results);
-                        document.getElementById('downloadButtons').style.display = 'block';
-                    } else {
+                    if (!(response.headers.get('Content-Type') || '').includes('text/event-stream')) {
+                        const result = await response.json();
                         alert('Error: ' + result.error);
+                        return;
+                    }
+                    
+                    const reader = response.body.getReader();
+                    const decoder = new TextDecoder();
+                    let buffer = '';
+                    while (true) {
+                        const { value, done } = await reader.read();
+                        if (done) break;
+                        buffer += decoder.decode(value, { stream: true });
+                        let boundary;
+                        while ((boundary = buffer.indexOf('\\n\\n')) !== -1) {
+                            handleStreamEvent(buffer.slice(0, boundary));
+                            buffer = buffer.slice(boundary + 2);
+                        }
                     }
                 } catch (error) {
                     alert('Error: ' + error.message);
@@ -390,6 +513,46 @@ def home():
                 }
             });
 
+            let totalResumes = 0;
+
+            function handleStreamEvent(rawEvent) {
+                let eventName = 'message';
+                let data = '';
+                rawEvent.split('\\n').forEach(line => {
+                    if (line.startsWith('event: ')) eventName = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                });
+                const payload = data ? JSON.parse(data) : {};
+                
+                if (eventName === 'start') {
+                    totalResumes = payload.total_resumes;
+                    document.getElementById('progressText').textContent = `Analyzed 0 of ${totalResumes} resumes`;
+                } else if (eventName === 'score') {
+                    if (payload.field === 'overall_match_percentage') {
+                        const item = document.createElement('li');
+                        item.dataset.filename = payload.filename;
+                        item.textContent = `${payload.filename}: ${payload.value}%`;
+                        document.getElementById('liveScores').appendChild(item);
+                    }
+                } else if (eventName === 'retry') {
+                    // The score streamed so far was discarded; it arrives again
+                    document.querySelectorAll('#liveScores li').forEach(item => {
+                        if (item.dataset.filename === payload.filename) item.remove();
+                    });
+                } else if (eventName === 'result') {
+                    analysisResults[payload.index] = payload.result;
+                    const finished = analysisResults.filter(Boolean);
+                    document.getElementById('progressText').textContent = `Analyzed ${finished.length} of ${totalResumes} resumes`;
+                    displayResults(finished);
+                } else if (eventName === 'complete') {
+                    analysisResults = payload.results;
+                    displayResults(payload.results.slice());
+                    document.getElementById('downloadButtons').style.display = 'block';
+                } else if (eventName === 'error') {
+                    alert('Error: ' + payload.error);
+                }
+            }
+
             function displayResults(results) {
                 const container = document.getElementById('resultsContent');
                 container.innerHTML = '';
@@ -410,7 +573,10 @@ def home():
                     card.innerHTML = `
                         <div class="row">
                             <div class="col-md-8">
-                                <h5><i class="fas fa-file-alt"></i> ${result.filename}</h5>
+                                <h5><i class="fas fa-file-alt"></i> ${result.filename}
+                                    ${result.analysis_tier === 'prescreen' ? '<span class="badge bg-secondary ms-2">Pre-screen only</span>' : ''}
+                                    ${result.duplicate_group ? `<span class="badge bg-info text-dark ms-2" title="${duplicateLabel(result)}">Duplicate group #${result.duplicate_group.id}</span>` : ''}
+                                    ${result.analysis_tier === 'prefilter' ? `<span class="badge bg-light text-dark ms-2">Keyword pre-filter only (relevance ${result.prefilter.relevance})</span>` : ''}</h5>
                                 <div class="row mt-3">
                                     <div class="col-md-3">
                                         <strong>Overall Match:</strong><br>
@@ -512,10 +678,20 @@ def home():
                 window.URL.revokeObjectURL(url);
             }
 
+            function duplicateLabel(result) {
+                const group = result.duplicate_group;
+                if (!group) return '';
+                const parts = [`#${group.id}`];
+                if (group.size > 1) parts.push(`${group.size} copies, analyzed as ${group.representative}`);
+                if (group.talent_pool_match) parts.push(`matches earlier upload ${group.talent_pool_match.filename}`);
+                return parts.join(', ');
+            }
+
             function generateCSV() {
                 const headers = ['Filename', 'Overall Match %', 'Skills Match %', 'Experience Match %', 
                                 'Education Match %', 'Matched Must-Have Skills', 'Matched Nice-to-Have Skills',
-                                'Additional Skills', 'Missing Critical Skills', 'Missing Important Skills'];
+                                'Additional Skills', 'Missing Critical Skills', 'Missing Important Skills',
+                                'Analysis Tier', 'Pre-filter Relevance', 'Duplicate Group'];
                 const rows = [headers];
                 
                 analysisResults.forEach(result => {
@@ -529,7 +705,10 @@ def home():
                         (result.skills_analysis.matched_skills?.nice_to_have || []).join('; '),
                         (result.skills_analysis.matched_skills?.additional || []).join('; '),
                         (result.skills_analysis.missing_skills?.critical || []).join('; '),
-                        (result.skills_analysis.missing_skills?.important || []).join('; ')
+                        (result.skills_analysis.missing_skills?.important || []).join('; '),
+                        result.analysis_tier || '',
+                        result.prefilter ? result.prefilter.relevance : '',
+                        duplicateLabel(result)
                     ];
                     rows.push(row);
                 });
@@ -546,30 +725,41 @@ def home():
     """
     return render_template_string(html_template)
 
-@app.route("/analyze", methods=["POST"])
-def analyze_resumes():
-    """Analyze uploaded resumes against the job description"""
-    try:
-        # Get form data
-        api_key = request.form.get('apiKey')
-        job_title = request.form.get('jobTitle')
-        experience = request.form.get('experience')
-        location = request.form.get('location')
-        industry = request.form.get('industry')
-        must_have_skills = request.form.get('mustHaveSkills')
-        nice_to_have_skills = request.form.get('niceToHaveSkills')
-        job_description = request.form.get('jobDescription')
-        upload_type = request.form.get('uploadType')
-
-        # Validate required fields
-        if not api_key or not job_description:
-            return jsonify({"success": False, "error": "API key and job description are required"})
-
-        # Set OpenAI API key
-        os.environ["OPENAI_API_KEY"] = api_key
-
-        # Construct complete job description
-        complete_jd = f"""
+class AnalysisRequestError(Exception):
+    """Invalid /analyze form input, reported to the client as {"success": false}"""
+
+def _form_flag(name):
+    """Read an optional boolean form field (checkboxes send "on")"""
+    value = request.form.get(name)
+    if value is None:
+        return None
+    return value.lower() in ('1', 'true', 'on', 'yes')
+
+def _prepare_analysis():
+    """
+    Parse the /analyze form: build the complete job description, extract the
+    uploaded resumes and collect the analysis options for analyze_batch.
+    """
+    # Get form data
+    api_key = request.form.get('apiKey')
+    job_title = request.form.get('jobTitle')
+    experience = request.form.get('experience')
+    location = request.form.get('location')
+    industry = request.form.get('industry')
+    must_have_skills = request.form.get('mustHaveSkills')
+    nice_to_have_skills = request.form.get('niceToHaveSkills')
+    job_description = request.form.get('jobDescription')
+    upload_type = request.form.get('uploadType')
+    analysis_mode = request.form.get('analysisMode') or None
+    skills_mode = request.form.get('skillsMode') or None
+    prefilter_method = request.form.get('prefilterMethod') or None
+
+    # Validate required fields
+    if not api_key or not job_description:
+        raise AnalysisRequestError("API key and job description are required")
+
+    # Construct complete job description
+    complete_jd = f"""
 {job_title}
 Location: {location}
 Experience Required: {experience}
@@ -581,127 +771,147 @@ Nice-to-Have: {nice_to_have_skills}
 
 Job Description:
 {job_description}
-        """.strip()
+    """.strip()
 
-        resumes = {}
+    resumes = {}
+    
+    if upload_type == 'single':
+        # Handle single file upload
+        if 'singleResume' not in request.files:
+            raise AnalysisRequestError("No file uploaded")
         
-        if upload_type == 'single':
-            # Handle single file upload
-            if 'singleResume' not in request.files:
-                return jsonify({"success": False, "error": "No file uploaded"})
-            
-            file = request.files['singleResume']
-            if file.filename == '':
-                return jsonify({"success": False, "error": "No file selected"})
-            
-            if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
-                
-                # Extract text from the uploaded file
-                resume_text = extract_resume_text(filepath)
-                if resume_text and not resume_text.startswith("Error"):
-                    resumes[filename] = resume_text
-                else:
-                    return jsonify({"success": False, "error": f"Could not extract text from {filename}"})
-            else:
-                return jsonify({"success": False, "error": "Invalid file type"})
-
-        elif upload_type == 'folder':
-            # Handle folder/ZIP upload
-            if 'folderResumes' not in request.files:
-                return jsonify({"success": False, "error": "No ZIP file uploaded"})
-            
-            zip_file = request.files['folderResumes']
-            if zip_file.filename == '':
-                return jsonify({"success": False, "error": "No ZIP file selected"})
+        file = request.files['singleResume']
+        if file.filename == '':
+            raise AnalysisRequestError("No file selected")
+        
+        if file and allowed_file(file.filename):
+            filename = secure_filename(file.filename)
+            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+            file.save(filepath)
             
-            if zip_file and zip_file.filename.endswith('.zip'):
-                # Create temporary directory for extraction
-                temp_dir = tempfile.mkdtemp()
-                zip_path = os.path.join(temp_dir, 'resumes.zip')
-                zip_file.save(zip_path)
-                
-                try:
-                    # Extract ZIP file
-                    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                        zip_ref.extractall(temp_dir)
-                    
-                    # Process extracted files
-                    for root, dirs, files in os.walk(temp_dir):
-                        for file in files:
-                            if allowed_file(file):
-                                file_path = os.path.join(root, file)
-                                resume_text = extract_resume_text(file_path)
-                                if resume_text and not resume_text.startswith("Error"):
-                                    resumes[file] = resume_text
-                finally:
-                    # Improved cleanup with retry mechanism
-                    try:
-                        # Remove the ZIP file first
-                        if os.path.exists(zip_path):
-                            os.remove(zip_path)
-                        
-                        # Wait a moment for file handles to be released
-                        import time
-                        time.sleep(0.1)
-                        
-                        # Remove the temporary directory
-                        if os.path.exists(temp_dir):
-                            import shutil
-                            shutil.rmtree(temp_dir, ignore_errors=True)
-                    except Exception as cleanup_error:
-                        print(f"Cleanup warning: {cleanup_error}")
-                        # Try alternative cleanup method
-                        try:
-                            import shutil
-                            shutil.rmtree(temp_dir, ignore_errors=True)
-                        except:
-                            pass
+            # Extract text from the uploaded file
+            resume_text = extract_resume_text(filepath)
+            if resume_text and not resume_text.startswith("Error"):
+                resumes[filename] = resume_text
             else:
-                return jsonify({"success": False, "error": "Invalid ZIP file"})
-
-        if not resumes:
-            return jsonify({"success": False, "error": "No valid resumes found"})
+                raise AnalysisRequestError(f"Could not extract text from {filename}")
+        else:
+            raise AnalysisRequestError("Invalid file type")
 
-        # Analyze each resume
-        results = []
-        is_batch = len(resumes) > 1  # Check if this is a batch analysis
+    elif upload_type == 'folder':
+        # Handle folder/ZIP upload
+        if 'folderResumes' not in request.files:
+            raise AnalysisRequestError("No ZIP file uploaded")
         
-        print(f"Analysis Mode: {'BATCH' if is_batch else 'SINGLE'} - Processing {len(resumes)} resumes")
+        zip_file = request.files['folderResumes']
+        if zip_file.filename == '':
+            raise AnalysisRequestError("No ZIP file selected")
         
-        for filename, resume_text in resumes.items():
+        if zip_file and zip_file.filename.endswith('.zip'):
+            # Read the resume members straight from the upload; nothing is
+            # written to disk
             try:
-                print(f"Analyzing: {filename} (Batch mode: {is_batch})")
-                
-                # Get match percentage with batch analysis flag
-                match_result = get_match_score(resume_text, complete_jd, is_batch_analysis=is_batch)
-                
-                # Debug: Print the score for verification
-                overall_score = match_result.get('overall_match_percentage', 'N/A')
-                print(f"  {filename} Score: {overall_score}%")
-                
-                # Get skills analysis
-                skills_result = analyze_skills(resume_text, complete_jd)
-                
-                results.append({
-                    "filename": filename,
-                    "match_analysis": match_result,
-                    "skills_analysis": skills_result
-                })
-            except Exception as e:
-                print(f"Error analyzing {filename}: {str(e)}")
-                results.append({
-                    "filename": filename,
-                    "error": str(e),
-                    "match_analysis": {"overall_match_percentage": "Error"},
-                    "skills_analysis": {"matched_skills": {}, "missing_skills": {}}
-                })
+                members = read_zip_members(zip_file.stream, allowed_file)
+            except (zipfile.BadZipFile, ZipLimitError) as e:
+                raise AnalysisRequestError(f"Invalid ZIP file: {e}")
+            
+            # Process the members in parallel, keeping the archive order
+            for member, resume_text in extract_many(members).items():
+                if resume_text and not resume_text.startswith("Error"):
+                    resumes[os.path.basename(member)] = resume_text
+        else:
+            raise AnalysisRequestError("Invalid ZIP file")
+
+    elif upload_type == 'pool':
+        # Re-query resumes received earlier; nothing is uploaded or parsed
+        resumes = _talent_pool_resumes(complete_jd, must_have_skills)
+
+    if not resumes:
+        raise AnalysisRequestError("No valid resumes found")
+
+    if analysis_mode and analysis_mode.lower() not in ANALYSIS_MODES:
+        raise AnalysisRequestError(f"Invalid analysis mode: {analysis_mode}")
+    if skills_mode and skills_mode.lower() not in SKILLS_MODES:
+        raise AnalysisRequestError(f"Invalid skills mode: {skills_mode}")
+    if prefilter_method and prefilter_method.lower() not in PREFILTER_METHODS:
+        raise AnalysisRequestError(f"Invalid pre-filter method: {prefilter_method}")
+
+    try:
+        prefilter_top_k = int(request.form['prefilterTopK']) if request.form.get('prefilterTopK') else None
+        prefilter_min_score = float(request.form['prefilterMinScore']) if request.form.get('prefilterMinScore') else None
+    except ValueError:
+        raise AnalysisRequestError("Pre-filter top K and minimum relevance must be numbers")
+
+    # Only a request that passed validation adds its resumes to the pool
+    if upload_type != 'pool':
+        _store_in_talent_pool(resumes)
+
+    options = {
+        "api_key": api_key,
+        "use_cache": not _form_flag('bypassCache'),
+        "analysis_mode": analysis_mode,
+        "pack_match_requests": _form_flag('packRequests'),
+        "cascade": _form_flag('cascade'),
+        "prefilter": _form_flag('prefilter'),
+        "prefilter_top_k": prefilter_top_k,
+        "prefilter_min_score": prefilter_min_score,
+        "prefilter_method": prefilter_method,
+        "dedup": False if _form_flag('keepDuplicates') else None,
+        "must_have_skills": must_have_skills,
+        "nice_to_have_skills": nice_to_have_skills,
+        "skills_mode": skills_mode
+    }
+    return complete_jd, resumes, options
+
+def _store_in_talent_pool(resumes):
+    """Keep the extracted texts so later job descriptions can be matched against them"""
+    pool = get_talent_pool()
+    if pool is None:
+        return
+    try:
+        added = pool.add_many(list(resumes.items()))
+        print(f"Talent pool: {sum(1 for _, is_new in added if is_new)} new of {len(added)} resumes")
+    except Exception as e:
+        print(f"Talent pool warning: {e}")
+
+def _talent_pool_resumes(complete_jd, must_have_skills):
+    """Best-matching pool resumes for a job description, keyed by a unique filename"""
+    pool = get_talent_pool()
+    if pool is None:
+        raise AnalysisRequestError("Talent pool is disabled")
+    try:
+        top_k = int(request.form.get('poolTopK') or TALENT_POOL_TOP_K)
+    except ValueError:
+        raise AnalysisRequestError("Talent pool top K must be a number")
+    if top_k < 1:
+        raise AnalysisRequestError("Talent pool top K must be at least 1")
+
+    matches = pool.search(complete_jd, must_have_skills, top_k=top_k)
+    texts = pool.texts([match["id"] for match in matches])
+    resumes = {}
+    for match in matches:
+        name = match["filename"]
+        if name in resumes:
+            name = f"{name} [{match['id']}]"
+        resumes[name] = texts[match["id"]]
+    print(f"Talent pool: analyzing the best {len(resumes)} resumes")
+    return resumes
+
+@app.route("/analyze", methods=["POST"])
+@ANALYSIS_SECONDS.labels("analyze").time()
+@ANALYSIS_IN_FLIGHT.labels("analyze").track_inprogress()
+def analyze_resumes():
+    """Analyze uploaded resumes against the job description"""
+    try:
+        complete_jd, resumes, options = _prepare_analysis()
+
+        # Analyze all resumes concurrently; result order follows the upload order
+        results = analyze_batch(resumes, complete_jd, **options)
 
         # Store results in session for PDF generation
         session['analysis_results'] = results
         session['job_description'] = complete_jd
+        session.pop('analysis_job_id', None)
         
         print(f"Analysis Complete: Stored {len(results)} results in session")
         print(f"Resume filenames: {[r.get('filename', 'Unknown') for r in results]}")
@@ -715,11 +925,104 @@ Job Description:
     except Exception as e:
         return jsonify({"success": False, "error": str(e)})
 
+@app.route("/analyze-stream", methods=["POST"])
+def analyze_resumes_stream():
+    """
+    Analyze uploaded resumes and push progress as Server-Sent Events.
+
+    Events: "start" (total resumes), "score" (a match field such as
+    overall_match_percentage as soon as it has streamed in), "retry" (a
+    resume's reply is streamed again; drop its scores so far), "result" (one
+    finished resume), "complete" (all results) and "error".
+    """
+    try:
+        complete_jd, resumes, options = _prepare_analysis()
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)})
+
+    # The session cookie is sent with the response headers, so the results
+    # are kept server-side under a job id for the CSV/PDF downloads
+    job_id = uuid.uuid4().hex
+    session['analysis_job_id'] = job_id
+    session['job_description'] = complete_jd
+    session.pop('analysis_results', None)
+    get_stream_result_store().start(job_id)
+
+    events = queue.Queue()
+
+    @ANALYSIS_SECONDS.labels("analyze-stream").time()
+    @ANALYSIS_IN_FLIGHT.labels("analyze-stream").track_inprogress()
+    def run_analysis():
+        try:
+            results = analyze_batch(
+                resumes, complete_jd,
+                on_result=lambda index, result: events.put(("result", {"index": index, "result": result})),
+                on_partial=lambda filename, key, value: events.put(
+                    ("score", {"filename": filename, "field": key, "value": value})),
+                on_retry=lambda filename: events.put(("retry", {"filename": filename})),
+                **options
+            )
+            get_stream_result_store().finish(job_id, results)
+            events.put(("complete", {"success": True, "results": results, "total_resumes": len(results)}))
+        except Exception as e:
+            get_stream_result_store().finish(job_id, [])
+            events.put(("error", {"success": False, "error": str(e)}))
+
+    def generate():
+        yield _sse("start", {"total_resumes": len(resumes), "filenames": list(resumes)})
+        threading.Thread(target=run_analysis, daemon=True).start()
+        while True:
+            event, data = events.get()
+            yield _sse(event, data)
+            if event in ("complete", "error"):
+                break
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _duplicate_label(result):
+    """Export text of a result's duplicate group, empty for unique resumes"""
+    group = result.get('duplicate_group')
+    if not group:
+        return ''
+    parts = [f"#{group['id']}"]
+    if group.get('size', 1) > 1:
+        parts.append(f"{group['size']} copies, analyzed as {group['representative']}")
+    if group.get('talent_pool_match'):
+        parts.append(f"matches earlier upload {group['talent_pool_match']['filename']}")
+    return ', '.join(parts)
+
+class ResultsUnavailableError(Exception):
+    """The session's streamed analysis is still running or its results have expired"""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+def _session_results():
+    """Results of the last analysis: from the session cookie or the stream job store"""
+    results = session.get('analysis_results')
+    if results:
+        return results
+    job_id = session.get('analysis_job_id')
+    if not job_id:
+        return []
+    results = get_stream_result_store().get(job_id)
+    if results == RUNNING:
+        raise ResultsUnavailableError("The analysis is still running", 409)
+    if results == EXPIRED:
+        raise ResultsUnavailableError("The results of this analysis have expired", 410)
+    return results
+
 @app.route("/download-csv")
+@EXPORT_SECONDS.labels("csv").time()
 def download_csv():
     """Download analysis results as CSV"""
     try:
-        results = session.get('analysis_results', [])
+        results = _session_results()
         if not results:
             return jsonify({"error": "No results available"}), 404
 
@@ -733,7 +1036,7 @@ def download_csv():
             'Education Match %', 'Matched Must-Have Skills', 'Matched Nice-to-Have Skills',
             'Additional Skills', 'Missing Critical Skills', 'Missing Important Skills', 
             'Missing Optional Skills', 'Strengths', 'Weaknesses', 'Recommendations',
-            'Key Matches', 'Missing Requirements'
+            'Key Matches', 'Missing Requirements', 'Analysis Tier', 'Pre-filter Relevance', 'Duplicate Group'
         ])
         
         # Write data
@@ -754,7 +1057,10 @@ def download_csv():
                 '; '.join(result.get('match_analysis', {}).get('detailed_analysis', {}).get('weaknesses', [])),
                 '; '.join(result.get('match_analysis', {}).get('detailed_analysis', {}).get('recommendations', [])),
                 '; '.join(result.get('match_analysis', {}).get('key_matches', [])),
-                '; '.join(result.get('match_analysis', {}).get('missing_requirements', []))
+                '; '.join(result.get('match_analysis', {}).get('missing_requirements', [])),
+                result.get('analysis_tier', ''),
+                result.get('prefilter', {}).get('relevance', ''),
+                _duplicate_label(result)
             ])
         
         output.seek(0)
@@ -764,14 +1070,17 @@ def download_csv():
             as_attachment=True,
             download_name=f'resume_analysis_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
         )
+    except ResultsUnavailableError as e:
+        return jsonify({"error": str(e)}), e.status
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @app.route("/download-pdf")
+@EXPORT_SECONDS.labels("pdf").time()
 def download_pdf():
     """Download analysis results as PDF"""
     try:
-        results = session.get('analysis_results', [])
+        results = _session_results()
         job_description = session.get('job_description', '')
         
         print(f"PDF Generation Debug: Found {len(results)} results in session")
@@ -848,6 +1157,12 @@ def download_pdf():
                 ['Experience Match', f"{match_analysis.get('experience_match_percentage', 'N/A')}%"],
                 ['Education Match', f"{match_analysis.get('education_match_percentage', 'N/A')}%"]
             ]
+            if result.get('analysis_tier') == 'prescreen':
+                match_data.append(['Analysis Tier', 'Pre-screen only'])
+            elif result.get('analysis_tier') == 'prefilter':
+                match_data.append(['Analysis Tier', 'Keyword pre-filter only'])
+            if result.get('prefilter'):
+                match_data.append(['Pre-filter Relevance', f"{result['prefilter']['relevance']}"])
             
             match_table = Table(match_data, colWidths=[2*inch, 1*inch])
             match_table.setStyle(TableStyle([
@@ -862,6 +1177,10 @@ def download_pdf():
             ]))
             story.append(match_table)
             story.append(Spacer(1, 12))
+
+            if result.get('duplicate_group'):
+                story.append(Paragraph(f"<b>Duplicate Group:</b> {_duplicate_label(result)}", styles['Normal']))
+                story.append(Spacer(1, 8))
             
             # Detailed Analysis Section
             detailed_analysis = match_analysis.get('detailed_analysis', {})
@@ -979,6 +1298,8 @@ def download_pdf():
             as_attachment=True,
             download_name=f'resume_analysis_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
         )
+    except ResultsUnavailableError as e:
+        return jsonify({"error": str(e)}), e.status
     except Exception as e:
         print(f"PDF Generation Error: {str(e)}")
         import traceback
@@ -991,14 +1312,81 @@ def health_check():
     return jsonify({
         "status": "healthy",
         "service": "Resume Matching System",
-        "version": "2.0.0"
+        "version": "2.0.0",
+        "llm_cache": get_cache_stats(),
+        "rate_limits": get_rate_limit_stats(),
+        "structured_output": get_structured_output_stats(),
+        "token_usage": get_token_usage_stats(),
+        "single_flight": get_single_flight_stats(),
+        "resilience": get_llm_resilience_stats(),
+        "talent_pool": get_talent_pool_stats(),
+        "extraction_cache": get_extraction_cache_stats()
     })
 
+@app.route("/talent-pool", methods=["GET"])
+def talent_pool_stats():
+    """Size of the talent pool"""
+    return jsonify(get_talent_pool_stats())
+
+def _talent_pool_admin():
+    """
+    The pool, or an error response when the pool or its admin endpoints are
+    disabled (no TALENT_POOL_ADMIN_TOKEN) or the X-Admin-Token header is wrong.
+    """
+    pool = get_talent_pool()
+    if pool is None or not TALENT_POOL_ADMIN_TOKEN:
+        return None, (jsonify({"success": False, "error": "Talent pool admin endpoints are disabled"}), 404)
+    token = request.headers.get('X-Admin-Token', '')
+    if not hmac.compare_digest(token.encode('utf-8'), TALENT_POOL_ADMIN_TOKEN.encode('utf-8')):
+        return None, (jsonify({"success": False, "error": "Invalid admin token"}), 401)
+    return pool, None
+
+@app.route("/talent-pool/search", methods=["POST"])
+def talent_pool_search():
+    """
+    Rank every stored resume against a job description without re-uploading.
+
+    Accepts form or JSON fields jobDescription, mustHaveSkills and topK, and
+    requires the X-Admin-Token header. Only the id, filename and score of
+    each match are returned.
+    """
+    pool, error = _talent_pool_admin()
+    if error:
+        return error
+    data = request.get_json(silent=True) or request.form
+    job_description = data.get('jobDescription')
+    if not job_description:
+        return jsonify({"success": False, "error": "Job description is required"}), 400
+    try:
+        top_k = int(data.get('topK') or TALENT_POOL_TOP_K)
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "error": "topK must be a number"}), 400
+
+    results = [{"id": match["id"], "filename": match["filename"], "score": match["score"]}
+               for match in pool.search(job_description, data.get('mustHaveSkills'), top_k=top_k)]
+    return jsonify({"success": True, "results": results, "pool_size": pool.stats()["resumes"]})
+
+@app.route("/talent-pool/<int:resume_id>", methods=["DELETE"])
+def talent_pool_delete(resume_id):
+    """Remove a resume and its index entries from the talent pool; requires X-Admin-Token"""
+    pool, error = _talent_pool_admin()
+    if error:
+        return error
+    if not pool.remove(resume_id):
+        return jsonify({"success": False, "error": "Resume not found"}), 404
+    return jsonify({"success": True})
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus metrics: extraction, LLM, cache, queue and export timings"""
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
+
 @app.route("/debug-session", methods=["GET"])
 def debug_session():
     """Debug endpoint to check session data"""
     try:
-        results = session.get('analysis_results', [])
+        results = _session_results()
         job_description = session.get('job_description', '')
         
         debug_info = {
@@ -1019,6 +1407,8 @@ def debug_session():
             })
         
         return jsonify(debug_info)
+    except ResultsUnavailableError as e:
+        return jsonify({"error": str(e)}), e.status
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
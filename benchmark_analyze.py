@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark for /analyze.
+
+Starts fake_openai_server.py (or uses --backend-url), points the app at it via
+OPENAI_BASE_URL and drives /analyze in-process with synthetic PDF/DOCX/TXT
+resume batches. Reports p50/p95 request latency, throughput and peak RSS per
+batch size; --json-out saves the report and --compare diffs against a saved one.
+
+    python benchmark_analyze.py --sizes 1 10 100 1000 --repeats 3
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SKILLS = ["Java", "Spring Boot", "Python", "SQL", "AWS", "Docker", "Kubernetes", "React",
+          "JavaScript", "Microservices", "REST APIs", "Git", "Kafka", "PostgreSQL", "Terraform"]
+TITLES = ["Software Engineer", "Backend Developer", "Senior Java Developer", "Full Stack Developer"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Systems", "Hooli", "Stark Industries"]
+
+BENCHMARK_JD = {
+    "jobTitle": "Senior Java Developer",
+    "experience": "5+ years",
+    "location": "Remote",
+    "industry": "Technology",
+    "mustHaveSkills": "Java, Spring Boot, SQL",
+    "niceToHaveSkills": "AWS, Docker, Kubernetes",
+    "jobDescription": "Design, build and operate Java microservices on AWS. "
+                      "Own services end to end, mentor engineers and improve reliability."
+}
+
+
+def synthetic_resume_text(index, rng):
+    name = f"Candidate {index:04d}"
+    skills = rng.sample(SKILLS, rng.randint(4, 9))
+    lines = [name, f"{rng.choice(TITLES)} | candidate{index}@example.com | +1 555 {index:04d}", "",
+             "Summary", f"{rng.randint(2, 12)} years building backend systems with {skills[0]} and {skills[1]}.",
+             "", "Experience"]
+    for job in range(rng.randint(2, 4)):
+        start = 2010 + rng.randint(0, 10)
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({start} - {start + rng.randint(1, 4)})")
+        for _ in range(rng.randint(3, 5)):
+            lines.append(f"- Built and maintained {rng.choice(SKILLS)} services handling "
+                         f"{rng.randint(1, 50)}k requests per second")
+    lines += ["", "Skills", ", ".join(skills), "", "Education",
+              f"B.Sc. Computer Science, State University ({rng.randint(2005, 2018)})"]
+    return "\n".join(lines)
+
+
+def render_pdf(text):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    y = 750
+    for line in text.splitlines():
+        if y < 50:
+            pdf.showPage()
+            y = 750
+        pdf.drawString(50, y, line)
+        y -= 14
+    pdf.save()
+    return buffer.getvalue()
+
+
+def render_docx(text):
+    from docx import Document
+
+    document = Document()
+    for line in text.splitlines():
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def build_batch(size, formats, seed):
+    """Return [(filename, bytes)] of size synthetic resumes cycling through formats"""
+    rng = random.Random(seed)
+    renderers = {"pdf": render_pdf, "docx": render_docx, "txt": lambda text: text.encode("utf-8")}
+    batch = []
+    for index in range(size):
+        fmt = formats[index % len(formats)]
+        text = synthetic_resume_text(index, rng)
+        batch.append((f"resume_{index:04d}.{fmt}", renderers[fmt](text)))
+    return batch
+
+
+def zip_batch(batch):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for filename, data in batch:
+            archive.writestr(filename, data)
+    return buffer.getvalue()
+
+
+def _rss_mb():
+    """Current resident set size in MB (Linux), or the lifetime peak elsewhere"""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return _max_rss_mb()
+
+
+def _max_rss_mb():
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class RSSSampler:
+    """Track the peak RSS of this process while a run is in progress"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _rss_mb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = _rss_mb()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_mb())
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_backend(args):
+    port = _free_port()
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_openai_server.py"),
+               "--port", str(port),
+               "--latency-dist", args.latency_dist,
+               "--latency-ms", str(args.latency_ms),
+               "--latency-jitter-ms", str(args.latency_jitter_ms),
+               "--latency-sigma", str(args.latency_sigma),
+               "--rate-limit-prob", str(args.rate_limit_prob),
+               "--malformed-prob", str(args.malformed_prob),
+               "--seed", str(args.seed)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process, f"http://127.0.0.1:{port}/v1"
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Fake OpenAI backend did not start")
+
+
+def run_once(client, batch, form_options):
+    data = dict(BENCHMARK_JD, apiKey="sk-benchmark", **form_options)
+    if len(batch) == 1:
+        filename, payload = batch[0]
+        data["uploadType"] = "single"
+        data["singleResume"] = (io.BytesIO(payload), filename)
+    else:
+        data["uploadType"] = "folder"
+        data["folderResumes"] = (io.BytesIO(zip_batch(batch)), "resumes.zip")
+
+    started = time.perf_counter()
+    response = client.post("/analyze", data=data, content_type="multipart/form-data")
+    elapsed = time.perf_counter() - started
+    body = response.get_json() or {}
+    if response.status_code != 200 or not body.get("success"):
+        raise RuntimeError(f"/analyze failed ({response.status_code}): {body.get('error')}")
+    failed = sum(1 for r in body.get("results", []) if "error" in r.get("match_analysis", {}))
+    return elapsed, len(body.get("results", [])), failed
+
+
+def run_benchmark(args):
+    backend = None
+    if args.backend_url:
+        base_url = args.backend_url
+    else:
+        backend, base_url = start_fake_backend(args)
+
+    # Must be set before the app is imported; load_dotenv does not override them
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_API_KEY"] = "sk-benchmark"
+    os.environ["LLM_CACHE_ENABLED"] = "true" if args.with_cache else "false"
+    os.environ["EXTRACTION_CACHE_ENABLED"] = "true" if args.with_cache else "false"
+    # Keep everything the app writes to disk (uploads, talent pool, caches,
+    # streamed results) out of the working tree
+    state_dir = tempfile.mkdtemp(prefix="benchmark_analyze_")
+    os.environ["UPLOAD_FOLDER"] = os.path.join(state_dir, "uploads")
+    os.environ["TALENT_POOL_PATH"] = os.path.join(state_dir, "talent_pool.sqlite3")
+    os.environ["EXTRACTION_CACHE_PATH"] = os.path.join(state_dir, "extraction_cache.sqlite3")
+    os.environ["LLM_CACHE_PATH"] = os.path.join(state_dir, "llm_cache.sqlite3")
+    os.environ["STREAM_RESULTS_PATH"] = os.path.join(state_dir, "stream_results.sqlite3")
+    os.environ.setdefault("LLM_RATE_LIMIT_RPM", "1000000")
+    os.environ.setdefault("LLM_RATE_LIMIT_TPM", "1000000000")
+
+    from app import app
+    from services.llm_utils import get_token_usage_stats
+    app.config["TESTING"] = True
+
+    form_options = {}
+    if args.analysis_mode:
+        form_options["analysisMode"] = args.analysis_mode
+    if args.pack:
+        form_options["packRequests"] = "on"
+    if args.skills_mode:
+        form_options["skillsMode"] = args.skills_mode
+    if args.cascade:
+        form_options["cascade"] = "on"
+    if args.prefilter_top_k is not None:
+        form_options["prefilter"] = "on"
+        form_options["prefilterTopK"] = str(args.prefilter_top_k)
+
+    report = {"backend": base_url, "formats": args.formats, "runs": []}
+    try:
+        with app.test_client() as client:
+            for size in args.sizes:
+                batch = build_batch(size, args.formats, args.seed)
+                latencies = []
+                failed = 0
+                usage_before = get_token_usage_stats()
+                with RSSSampler() as sampler:
+                    for _ in range(args.repeats):
+                        elapsed, analysed, errors = run_once(client, batch, form_options)
+                        latencies.append(elapsed)
+                        failed += errors
+                total_time = sum(latencies)
+                usage_after = get_token_usage_stats()
+                prompt_tokens = usage_after["prompt_tokens"] - usage_before["prompt_tokens"]
+                cached_tokens = usage_after["cached_prompt_tokens"] - usage_before["cached_prompt_tokens"]
+                run = {
+                    "size": size,
+                    "repeats": args.repeats,
+                    "p50_seconds": round(percentile(latencies, 50), 3),
+                    "p95_seconds": round(percentile(latencies, 95), 3),
+                    "throughput_resumes_per_second": round(size * len(latencies) / total_time, 2),
+                    "peak_rss_mb": round(sampler.peak, 1),
+                    "cached_prompt_ratio": round(cached_tokens / prompt_tokens, 3) if prompt_tokens else 0.0,
+                    "failed_results": failed
+                }
+                report["runs"].append(run)
+                print(f"size={size:5d}  p50={run['p50_seconds']:8.3f}s  p95={run['p95_seconds']:8.3f}s  "
+                      f"throughput={run['throughput_resumes_per_second']:8.2f}/s  "
+                      f"peak_rss={run['peak_rss_mb']:7.1f}MB  cached={run['cached_prompt_ratio']:.0%}  "
+                      f"failed={failed}")
+    finally:
+        if backend is not None:
+            backend.terminate()
+            backend.wait()
+        shutil.rmtree(state_dir, ignore_errors=True)
+    return report
+
+
+def compare(report, baseline_path):
+    with open(baseline_path) as baseline_file:
+        baseline = {run["size"]: run for run in json.load(baseline_file)["runs"]}
+    print(f"\nChange vs {baseline_path}:")
+    for run in report["runs"]:
+        previous = baseline.get(run["size"])
+        if previous is None:
+            continue
+        deltas = []
+        for key in ("p50_seconds", "p95_seconds", "throughput_resumes_per_second", "peak_rss_mb"):
+            if previous[key]:
+                deltas.append(f"{key}={100.0 * (run[key] - previous[key]) / previous[key]:+.1f}%")
+        print(f"size={run['size']:5d}  " + "  ".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /analyze against a fake OpenAI backend")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeats", type=int, default=3, help="Requests per batch size")
+    parser.add_argument("--formats", nargs="+", choices=["pdf", "docx", "txt"], default=["pdf", "docx", "txt"])
+    parser.add_argument("--analysis-mode", choices=["separate", "fused"], default=None)
+    parser.add_argument("--pack", action="store_true", help="Pack match-scoring requests")
+    parser.add_argument("--skills-mode", choices=["llm", "local", "hybrid"], default=None)
+    parser.add_argument("--cascade", action="store_true", help="Pre-screen batches with the cheap model")
+    parser.add_argument("--prefilter-top-k", type=int, default=None,
+                        help="Send only the top K resumes of the BM25 pre-filter to the LLM")
+    parser.add_argument("--with-cache", action="store_true", help="Leave the LLM response and extraction caches enabled")
+    parser.add_argument("--backend-url", default=None, help="Use a running backend instead of starting one")
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=400.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=150.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--rate-limit-prob", type=float, default=0.0)
+    parser.add_argument("--malformed-prob", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json-out", default=None, help="Write the report to this JSON file")
+    parser.add_argument("--compare", default=None, help="Baseline report to diff against")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    if args.json_out:
+        with open(args.json_out, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+        print(f"Report written to {args.json_out}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
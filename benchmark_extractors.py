@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Speed and accuracy of every registered text extractor backend.
+
+Renders a synthetic corpus of PDF/DOCX/TXT resumes (or reads --resumes-dir),
+runs each registered backend of utils/extractors.py over the files of its
+formats and reports MB/s of input, chars/s of output and word recall. For the
+synthetic corpus recall is measured against the source text; for
+--resumes-dir it is measured against the first backend of the default chain.
+Pick the fastest backend whose recall is good enough and set it first in
+EXTRACTOR_BACKENDS, e.g. "pdf=pypdfium2,pypdf2".
+
+    python benchmark_extractors.py --files 50 --repeats 3
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+
+from benchmark_analyze import synthetic_resume_text, render_pdf, render_docx
+from utils.extractors import registered_backends, backend_chain
+
+_WORD = re.compile(r"\w+")
+RENDERERS = {"pdf": render_pdf, "docx": render_docx, "txt": lambda text: text.encode("utf-8")}
+
+
+def build_corpus(files, formats, seed, pages):
+    """Return {format: [(filename, bytes, source text)]}; pages repeats each resume to lengthen it"""
+    rng = random.Random(seed)
+    corpus = {}
+    for fmt in formats:
+        for index in range(files):
+            text = "\n\n".join(synthetic_resume_text(index, rng) for _ in range(pages))
+            corpus.setdefault(fmt, []).append((f"resume_{index:04d}.{fmt}", RENDERERS[fmt](text), text))
+    return corpus
+
+
+def read_corpus(resumes_dir):
+    """Return {format: [(filename, bytes, None)]} of the files of a folder"""
+    corpus = {}
+    for filename in sorted(os.listdir(resumes_dir)):
+        fmt = os.path.splitext(filename)[1].lower().lstrip(".")
+        if fmt in RENDERERS or fmt == "doc":
+            with open(os.path.join(resumes_dir, filename), "rb") as file:
+                corpus.setdefault(fmt, []).append((filename, file.read(), None))
+    return corpus
+
+
+def recall(extracted, reference):
+    """Share of the reference words (with multiplicity) found in the extracted text"""
+    expected = Counter(_WORD.findall(reference.lower()))
+    found = Counter(_WORD.findall(extracted.lower()))
+    total = sum(expected.values())
+    return sum((expected & found).values()) / total if total else 1.0
+
+
+def run_backend(backend, files, repeats):
+    """Best-of-repeats timing of one backend over files; returns (seconds, texts, errors)"""
+    best = None
+    for _ in range(repeats):
+        texts, errors = [], 0
+        started = time.perf_counter()
+        for filename, data, _ in files:
+            try:
+                texts.append("\n".join(backend.extract((filename, data), sys.maxsize)))
+            except Exception:
+                texts.append("")
+                errors += 1
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, texts, errors
+
+
+def run_benchmark(corpus, repeats):
+    rows = []
+    for fmt, files in corpus.items():
+        input_bytes = sum(len(data) for _, data, _ in files)
+        references = [text for _, _, text in files]
+        default = backend_chain(fmt)
+        baseline = None
+        # The default backend runs first, so it can serve as the reference for real documents
+        for backend in sorted(registered_backends(fmt), key=lambda backend: backend not in default[:1]):
+            row = {"format": fmt, "backend": backend.name, "priority": backend.priority, "files": len(files)}
+            if not backend.available():
+                rows.append(dict(row, status=f"not installed ({backend.module})"))
+                continue
+            seconds, texts, errors = run_backend(backend, files, repeats)
+            if references[0] is None:
+                if baseline is None:
+                    baseline = texts
+                references_used = baseline
+            else:
+                references_used = references
+            chars = sum(len(text) for text in texts)
+            rows.append(dict(
+                row, status="ok", errors=errors, seconds=round(seconds, 4),
+                mb_per_second=round(input_bytes / seconds / 1e6, 2) if seconds else None,
+                chars_per_second=round(chars / seconds) if seconds else None,
+                recall=round(sum(recall(text, reference) for text, reference in zip(texts, references_used))
+                             / len(texts), 4)
+            ))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=30, help="Synthetic files per format")
+    parser.add_argument("--pages", type=int, default=1, help="Resumes concatenated per synthetic file")
+    parser.add_argument("--formats", nargs="+", choices=sorted(RENDERERS), default=sorted(RENDERERS))
+    parser.add_argument("--resumes-dir", default=None, help="Benchmark the files of this folder instead")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per backend; the fastest counts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if args.resumes_dir:
+        corpus = read_corpus(args.resumes_dir)
+    else:
+        corpus = build_corpus(args.files, args.formats, args.seed, args.pages)
+    if not corpus:
+        print("No files to benchmark")
+        return 1
+    rows = run_benchmark(corpus, max(1, args.repeats))
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    print(f"\n{'format':6}  {'backend':12}  {'MB/s':>8}  {'chars/s':>11}  {'recall':>7}  {'errors':>6}")
+    for row in rows:
+        if row["status"] != "ok":
+            print(f"{row['format']:6}  {row['backend']:12}  {row['status']}")
+            continue
+        print(f"{row['format']:6}  {row['backend']:12}  {row['mb_per_second']:8.2f}  "
+              f"{row['chars_per_second']:11,d}  {row['recall']:7.3f}  {row['errors']:6d}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
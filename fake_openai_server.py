@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Deterministic OpenAI-compatible stand-in for local load testing.
+
+Serves POST /v1/chat/completions (plain and streamed) with canned JSON bodies
+shaped like the replies the services/* prompts expect (match, skills,
+fused, packed and cascade pre-screen), a configurable latency
+distribution, optional 429 and malformed-JSON injection and a simulated
+provider prefix cache (reported as usage.prompt_tokens_details.cached_tokens). Point the app at it with:
+
+    python fake_openai_server.py --port 8001
+    OPENAI_BASE_URL=http://localhost:8001/v1 OPENAI_API_KEY=fake python app.py
+"""
+
+from flask import Flask, request, jsonify, Response
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+
+
+def _seed_for(prompt):
+    return int(hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8], 16)
+
+
+def _match_body(rng):
+    overall = rng.randint(35, 95)
+    return {
+        "overall_match_percentage": overall,
+        "skills_match_percentage": max(0, min(100, overall + rng.randint(-10, 10))),
+        "experience_match_percentage": max(0, min(100, overall + rng.randint(-15, 15))),
+        "education_match_percentage": max(0, min(100, overall + rng.randint(-20, 20))),
+        "detailed_analysis": {
+            "strengths": ["Relevant backend experience", "Strong Java background"],
+            "weaknesses": ["Limited cloud exposure"],
+            "recommendations": ["Probe system design depth in interview"]
+        },
+        "key_matches": ["Java", "Spring"],
+        "missing_requirements": ["Kubernetes"]
+    }
+
+
+def _skills_body(rng):
+    return {
+        "matched_skills": {"must_have": ["Java"], "nice_to_have": ["JavaScript"], "additional": ["Git"]},
+        "missing_skills": {"critical": [], "important": ["AWS"], "optional": ["Kubernetes"]},
+        "skill_gaps": {"high_priority": ["AWS"], "medium_priority": ["Docker"], "low_priority": []},
+        "skill_analysis": {
+            "technical_skills_match": rng.randint(40, 95),
+            "soft_skills_match": rng.randint(40, 95),
+            "domain_knowledge_match": rng.randint(40, 95)
+        },
+        "recommendations": ["Gain hands-on cloud experience"]
+    }
+
+
+def canned_reply(prompt):
+    """Pick a reply body matching the prompt family; deterministic per prompt"""
+    rng = random.Random(_seed_for(prompt))
+    if "RESUME ID:" in prompt:
+        ids = re.findall(r"RESUME ID: (\S+)", prompt)
+        results = []
+        for item_id in ids:
+            entry = _match_body(rng)
+            entry["id"] = item_id
+            results.append(entry)
+        return {"results": results}
+    if "pre-screening" in prompt:
+        return {"overall_match_percentage": rng.randint(20, 95), "reason": "Coarse estimate from the resume summary"}
+    if '"match_analysis"' in prompt:
+        return {"match_analysis": _match_body(rng), "skills_analysis": _skills_body(rng)}
+    if "matched_skills" in prompt:
+        return _skills_body(rng)
+    if '"skill_gaps"' in prompt:
+        body = _skills_body(rng)
+        return {key: body[key] for key in ("skill_gaps", "skill_analysis", "recommendations")}
+    if "overall_match_percentage" in prompt:
+        return _match_body(rng)
+    return {"message": "ok"}
+
+
+# Prefix caching as providers implement it: prompts of at least 1024 tokens are
+# cached in 128-token steps (approximated as 4 characters per token)
+PREFIX_CACHE_MIN_CHARS = 1024 * 4
+PREFIX_CACHE_STEP_CHARS = 128 * 4
+PREFIX_CACHE_MAX_ENTRIES = 200000
+
+
+class FakeBackendConfig:
+    def __init__(self, latency_dist="lognormal", latency_ms=400.0, latency_jitter_ms=150.0,
+                 latency_sigma=0.5, rate_limit_prob=0.0, retry_after=1.0, malformed_prob=0.0, seed=None):
+        self.latency_dist = latency_dist
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_sigma = latency_sigma
+        self.rate_limit_prob = rate_limit_prob
+        self.retry_after = retry_after
+        self.malformed_prob = malformed_prob
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "rate_limited": 0, "malformed": 0}
+        self.prefixes = set()
+
+    def sample_latency(self):
+        with self.lock:
+            if self.latency_dist == "fixed":
+                millis = self.latency_ms
+            elif self.latency_dist == "uniform":
+                millis = self.rng.uniform(self.latency_ms - self.latency_jitter_ms,
+                                          self.latency_ms + self.latency_jitter_ms)
+            else:
+                # Log-normal around the given median gives the long tail real APIs show
+                millis = self.latency_ms * self.rng.lognormvariate(0.0, self.latency_sigma)
+        return max(millis, 0.0) / 1000.0
+
+    def should_rate_limit(self):
+        with self.lock:
+            return self.rng.random() < self.rate_limit_prob
+
+    def cached_prefix_chars(self, prompt):
+        """Length of the longest previously seen cacheable prefix; records this prompt's prefixes"""
+        boundaries = range(PREFIX_CACHE_MIN_CHARS, len(prompt) + 1, PREFIX_CACHE_STEP_CHARS)
+        digests = [hashlib.sha256(prompt[:end].encode('utf-8')).digest() for end in boundaries]
+        with self.lock:
+            cached = 0
+            for end, digest in zip(boundaries, digests):
+                if digest not in self.prefixes:
+                    break
+                cached = end
+            if len(self.prefixes) > PREFIX_CACHE_MAX_ENTRIES:
+                self.prefixes.clear()
+            self.prefixes.update(digests)
+        return cached
+
+    def should_malform(self):
+        with self.lock:
+            return self.rng.random() < self.malformed_prob
+
+
+def create_app(config):
+    app = Flask(__name__)
+
+    @app.route("/health", methods=["GET"])
+    def health():
+        return jsonify({"status": "healthy", **config.stats})
+
+    @app.route("/v1/chat/completions", methods=["POST"])
+    def chat_completions():
+        payload = request.get_json(force=True)
+        with config.lock:
+            config.stats["requests"] += 1
+
+        if config.should_rate_limit():
+            with config.lock:
+                config.stats["rate_limited"] += 1
+            error = {"error": {"message": "Rate limit reached (injected)", "type": "requests",
+                               "code": "rate_limit_exceeded"}}
+            return jsonify(error), 429, {"retry-after": str(config.retry_after)}
+
+        prompt = "".join(m.get("content") or "" for m in payload.get("messages", []))
+        content = json.dumps(canned_reply(prompt))
+        if config.should_malform():
+            # Truncated reply, as when a completion hits max_tokens
+            with config.lock:
+                config.stats["malformed"] += 1
+            content = content[:len(content) // 2]
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": config.cached_prefix_chars(prompt) // 4}
+        }
+        model = payload.get("model", "gpt-4")
+        completion_id = f"chatcmpl-fake-{_seed_for(prompt):x}"
+        created = int(time.time())
+        latency = config.sample_latency()
+
+        if not payload.get("stream"):
+            time.sleep(latency)
+            return jsonify({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            })
+
+        include_usage = (payload.get("stream_options") or {}).get("include_usage")
+        pieces = [content[i:i + 16] for i in range(0, len(content), 16)]
+
+        def generate():
+            for piece in pieces:
+                time.sleep(latency / len(pieces))
+                chunk = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+            final = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            if include_usage:
+                usage_chunk = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [], "usage": usage
+                }
+                yield f"data: {json.dumps(usage_chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return Response(generate(), mimetype="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic fake OpenAI chat completions backend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--latency-ms", type=float, default=400.0, help="Fixed/mean/median latency")
+    parser.add_argument("--latency-jitter-ms", type=float, default=150.0, help="Half-width of the uniform distribution")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Shape of the lognormal distribution")
+    parser.add_argument("--rate-limit-prob", type=float, default=0.0, help="Probability of answering 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--malformed-prob", type=float, default=0.0, help="Probability of a truncated JSON reply")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = FakeBackendConfig(
+        latency_dist=args.latency_dist,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        latency_sigma=args.latency_sigma,
+        rate_limit_prob=args.rate_limit_prob,
+        retry_after=args.retry_after,
+        malformed_prob=args.malformed_prob,
+        seed=args.seed
+    )
+    print(f"Fake OpenAI backend on http://{args.host}:{args.port}/v1 "
+          f"({args.latency_dist} latency ~{args.latency_ms:.0f}ms, 429 probability {args.rate_limit_prob})")
+    create_app(config).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
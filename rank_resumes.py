@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Instant approximate ranking of a resume folder against a job description.
+
+Extracts every resume of --resumes-dir, vectorises the pool once with hashed
+TF-IDF (services/similarity.py) and ranks it with a single sparse
+matrix-vector product. No LLM calls are made.
+
+    python rank_resumes.py --resumes-dir resumes --jd job_description.txt --top-k 20
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from services.similarity import SimilarityEngine
+from utils.jd_parser import get_job_description
+from utils.resume_parser import get_all_resumes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes-dir", default="resumes", help="Folder of PDF/DOCX/DOC/TXT resumes")
+    parser.add_argument("--jd", required=True, help="Text file with the job description")
+    parser.add_argument("--top-k", type=int, default=20, help="Number of resumes to list (0 = all)")
+    parser.add_argument("--json", action="store_true", help="Print the ranking as JSON")
+    args = parser.parse_args()
+
+    resumes = get_all_resumes(args.resumes_dir)
+    if not resumes:
+        print("No resumes to rank")
+        return 1
+    jd = get_job_description(args.jd)
+
+    started = time.perf_counter()
+    engine = SimilarityEngine().fit(resumes)
+    fitted = time.perf_counter()
+    ranking = engine.rank(jd, args.top_k or None)
+    ranked = time.perf_counter()
+
+    if args.json:
+        print(json.dumps([{"filename": filename, "similarity": round(score, 4)} for filename, score in ranking],
+                         indent=2))
+    else:
+        print(f"\nVectorised {len(engine)} resumes in {fitted - started:.2f}s, "
+              f"ranked in {(ranked - fitted) * 1000:.1f}ms\n")
+        for position, (filename, score) in enumerate(ranking, 1):
+            print(f"{position:4d}. {score:.4f}  {filename}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
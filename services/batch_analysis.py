@@ -0,0 +1,374 @@
+from services.match_percentage import get_match_score
+from services.skills_analysis import analyze_skills, SKILLS_MODE, SKILLS_MODES
+from services.fused_analysis import analyze_match_and_skills
+from services.packed_scoring import pack_resumes, score_pack
+from services.resume_compaction import compact_resume_text, RESUME_COMPACTION_ENABLED
+from services.metrics import ANALYSIS_RESUMES
+from services.cascade import (
+    prescreen_resume, select_shortlist, CASCADE_ENABLED, CASCADE_MIN_BATCH_SIZE, TIER_PRESCREEN, TIER_FULL
+)
+from services.prefilter import (
+    prefilter_resumes, select_prefiltered, PREFILTER_ENABLED, PREFILTER_MIN_BATCH_SIZE, TIER_PREFILTER
+)
+from services.dedup import find_duplicate_groups, DEDUP_ENABLED
+from services.talent_pool import get_talent_pool, content_hash
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# Maximum number of LLM calls in flight at once for a single /analyze request
+ANALYZE_MAX_CONCURRENCY = int(os.getenv("ANALYZE_MAX_CONCURRENCY", "8"))
+
+# "separate" runs get_match_score and analyze_skills as two calls per resume,
+# "fused" asks for both results in a single completion
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "separate").lower()
+ANALYSIS_MODES = ("separate", "fused")
+
+# Score several resumes per match request in "separate" mode
+MATCH_PACKING_ENABLED = os.getenv("MATCH_PACKING_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+def _error_result(filename, error):
+    return {
+        "filename": filename,
+        "error": str(error),
+        "analysis_tier": TIER_FULL,
+        "match_analysis": {"overall_match_percentage": "Error"},
+        "skills_analysis": {"matched_skills": {}, "missing_skills": {}}
+    }
+
+
+def _prescreen_result(filename, prescreen):
+    return {
+        "filename": filename,
+        "analysis_tier": TIER_PRESCREEN,
+        "prescreen": prescreen,
+        "match_analysis": {"overall_match_percentage": prescreen["overall_match_percentage"],
+                           "detailed_analysis": {"strengths": [prescreen["reason"]] if prescreen["reason"] else []}},
+        "skills_analysis": {"matched_skills": {}, "missing_skills": {}}
+    }
+
+
+def _prefilter_result(filename, prefilter):
+    return {
+        "filename": filename,
+        "analysis_tier": TIER_PREFILTER,
+        "prefilter": prefilter,
+        "match_analysis": {"overall_match_percentage": "N/A"},
+        "skills_analysis": {"matched_skills": {"must_have": prefilter["matched_must_have"]}, "missing_skills": {}}
+    }
+
+
+def _deduplicate(resumes):
+    """
+    Collapse near-duplicate resumes onto one representative each.
+
+    A representative that is a near-duplicate of a resume received in an
+    earlier batch is still analyzed with its own text: "similar" may hide a
+    new job or skill. The earlier resume is only reported as
+    "talent_pool_match"; identical texts are answered by the LLM response
+    cache anyway.
+
+    Returns:
+        (unique, groups): unique maps each representative to its text,
+        groups maps representatives with duplicates or a talent pool match
+        to their "duplicate_group" annotation
+    """
+    clusters, _ = find_duplicate_groups(resumes)
+    duplicates = {members[0]: members for members in clusters}
+    skipped = {member for members in clusters for member in members[1:]}
+    unique = {filename: text for filename, text in resumes.items() if filename not in skipped}
+
+    pool = get_talent_pool()
+    batch_hashes = {content_hash(text) for text in resumes.values()} if pool is not None else set()
+    groups = {}
+    for filename in unique:
+        group = {"representative": filename, "members": duplicates.get(filename, [filename])}
+        if pool is not None:
+            earlier = [match for match in pool.near_duplicates(unique[filename])
+                       if match["content_hash"] not in batch_hashes]
+            if earlier:
+                group["talent_pool_match"] = earlier[0]
+        if len(group["members"]) > 1 or "talent_pool_match" in group:
+            group["id"] = len(groups) + 1
+            group["size"] = len(group["members"])
+            groups[filename] = group
+    return unique, groups
+
+
+def analyze_batch(resumes, jd, max_concurrency=None, use_cache=True, analysis_mode=None,
+                  pack_match_requests=None, api_key=None, compact_resumes=None,
+                  on_result=None, on_partial=None, on_retry=None, cascade=None, prefilter=None,
+                  prefilter_top_k=None, prefilter_min_score=None, must_have_skills=None,
+                  nice_to_have_skills=None, skills_mode=None, prefilter_method=None, dedup=None,
+                  is_batch=None):
+    """
+    Analyze every resume against a job description using a bounded worker pool.
+
+    The match and skills calls of each resume are submitted as separate tasks,
+    so both resumes and the two calls per resume run in parallel. In "fused"
+    mode a single call per resume returns both results. With packing enabled
+    the match calls of several resumes share one request. Results are returned
+    in the same order as the input. Resume text is compacted first so every
+    prompt carries fewer tokens, and each result reports the saving.
+
+    With the pre-filter enabled, batches of at least PREFILTER_MIN_BATCH_SIZE
+    resumes are ranked locally with BM25 and only the top ones reach the LLM.
+    With the cascade enabled, batches of at least CASCADE_MIN_BATCH_SIZE
+    remaining resumes are then pre-screened by the cheap model and only the
+    shortlist gets the full analysis. Every result records its "analysis_tier".
+
+    Args:
+        resumes: Mapping of filename to resume text
+        jd: Job description text
+        max_concurrency: Worker pool size (defaults to ANALYZE_MAX_CONCURRENCY)
+        use_cache: Set to False to bypass the LLM response cache
+        analysis_mode: "separate" or "fused" (defaults to ANALYSIS_MODE)
+        pack_match_requests: Pack match scoring of several resumes per request
+            (defaults to MATCH_PACKING_ENABLED, ignored in "fused" mode)
+        api_key: OpenAI API key of the caller (defaults to OPENAI_API_KEY)
+        compact_resumes: Compact resume text before prompting
+            (defaults to RESUME_COMPACTION_ENABLED)
+        on_result: Optional callback(index, result) invoked from a worker
+            thread as soon as each resume's result is complete
+        on_partial: Optional callback(filename, key, value) invoked for each
+            match field as it streams in ("separate" mode without packing)
+        on_retry: Optional callback(filename) invoked when a resume's match
+            stream is retried; its fields reported so far are void
+        cascade: Pre-screen the batch before the full analysis
+            (defaults to CASCADE_ENABLED)
+        prefilter: Rank the batch with BM25 before any LLM call
+            (defaults to PREFILTER_ENABLED)
+        prefilter_top_k: Resumes ranked within the top K reach the LLM
+            (defaults to PREFILTER_TOP_K)
+        prefilter_min_score: Resumes with at least this relevance (0-100)
+            reach the LLM (defaults to PREFILTER_MIN_SCORE)
+        must_have_skills: Comma separated must-have skills, weighted higher
+            by the pre-filter and matched locally in "local"/"hybrid" skills mode
+        nice_to_have_skills: Comma separated nice-to-have skills
+        skills_mode: "llm", "local" or "hybrid" skills analysis in "separate"
+            mode (defaults to SKILLS_MODE)
+        prefilter_method: "bm25" or "tfidf" (defaults to PREFILTER_METHOD)
+        dedup: Analyze each cluster of near-duplicate resumes once and share
+            the result, annotated with "duplicate_group" (defaults to
+            DEDUP_ENABLED)
+        is_batch: Score with the batch prompt and temperature (defaults to
+            more than one resume; kept when duplicates collapse a batch)
+    """
+    max_concurrency = max(1, max_concurrency or ANALYZE_MAX_CONCURRENCY)
+    analysis_mode = (analysis_mode or ANALYSIS_MODE).lower()
+    if analysis_mode not in ANALYSIS_MODES:
+        raise ValueError(f"Unknown analysis mode: {analysis_mode}")
+    skills_mode = (skills_mode or SKILLS_MODE).lower()
+    if skills_mode not in SKILLS_MODES:
+        raise ValueError(f"Unknown skills mode: {skills_mode}")
+    if pack_match_requests is None:
+        pack_match_requests = MATCH_PACKING_ENABLED
+    if is_batch is None:
+        is_batch = len(resumes) > 1  # Check if this is a batch analysis
+    pack_match_requests = pack_match_requests and is_batch and analysis_mode == "separate"
+    if compact_resumes is None:
+        compact_resumes = RESUME_COMPACTION_ENABLED
+    if dedup is None:
+        dedup = DEDUP_ENABLED
+    if dedup and resumes:
+        unique, groups = _deduplicate(resumes)
+        if groups:
+            print(f"Deduplication: {len(resumes)} resumes in {len(unique)} unique, "
+                  f"{len(groups)} duplicate groups")
+            positions = {filename: index for index, filename in enumerate(resumes)}
+            representatives = list(unique)
+
+            def expand(filename, result):
+                group = groups.get(filename)
+                if group is None:
+                    return [(positions[filename], result)]
+                return [(positions[member], dict(result, filename=member, duplicate_group=group))
+                        for member in group["members"]]
+
+            forward = None
+            if on_result is not None:
+                def forward(index, result):
+                    for position, shared in expand(representatives[index], result):
+                        on_result(position, shared)
+
+            unique_results = analyze_batch(
+                unique, jd, max_concurrency=max_concurrency, use_cache=use_cache, analysis_mode=analysis_mode,
+                pack_match_requests=pack_match_requests, api_key=api_key, compact_resumes=compact_resumes,
+                on_result=forward, on_partial=on_partial, on_retry=on_retry, cascade=cascade, prefilter=prefilter,
+                prefilter_top_k=prefilter_top_k, prefilter_min_score=prefilter_min_score,
+                must_have_skills=must_have_skills, nice_to_have_skills=nice_to_have_skills,
+                skills_mode=skills_mode, prefilter_method=prefilter_method, dedup=False, is_batch=is_batch
+            )
+            results = [None] * len(resumes)
+            for filename, result in zip(representatives, unique_results):
+                for position, shared in expand(filename, result):
+                    results[position] = shared
+                    if shared["filename"] != filename:
+                        ANALYSIS_RESUMES.labels(shared.get("analysis_tier", TIER_FULL)).inc()
+            return results
+
+    if prefilter is None:
+        prefilter = PREFILTER_ENABLED
+    prefilter = prefilter and len(resumes) >= PREFILTER_MIN_BATCH_SIZE
+
+    results = [None] * len(resumes)
+
+    # Resumes that lose the local pre-filter never reach the LLM
+    candidates = resumes
+    prefilters = {}
+    if prefilter:
+        prefilters = prefilter_resumes(resumes, jd, must_have_skills, method=prefilter_method)
+        shortlist = select_prefiltered(prefilters, prefilter_top_k, prefilter_min_score)
+        print(f"Pre-filter: {len(shortlist)} of {len(resumes)} resumes sent to the LLM")
+
+        candidates = {filename: text for filename, text in resumes.items() if filename in shortlist}
+        for index, filename in enumerate(resumes):
+            if filename not in shortlist:
+                results[index] = _prefilter_result(filename, prefilters[filename])
+                if on_result is not None:
+                    on_result(index, results[index])
+
+    if cascade is None:
+        cascade = CASCADE_ENABLED
+    cascade = cascade and len(candidates) >= CASCADE_MIN_BATCH_SIZE
+
+    compaction = {}
+    if compact_resumes:
+        compacted = {}
+        for filename, resume_text in resumes.items():
+            if filename not in candidates:
+                compacted[filename] = resume_text
+                continue
+            compacted[filename], compaction[filename] = compact_resume_text(resume_text)
+            stats = compaction[filename]
+            print(f"  {filename} compacted: {stats['original_tokens']} -> {stats['compacted_tokens']} tokens "
+                  f"({stats['saved_percent']}% saved)")
+        resumes = compacted
+        candidates = {filename: resumes[filename] for filename in candidates}
+
+    print(f"Analysis Mode: {'BATCH' if is_batch else 'SINGLE'} - Processing {len(candidates)} resumes "
+          f"(mode: {analysis_mode}, max concurrency: {max_concurrency})")
+
+    # Only shortlisted resumes get the full analysis
+    full_resumes = candidates
+    prescreens = {}
+    if cascade:
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = {
+                filename: executor.submit(prescreen_resume, resume_text, jd, use_cache=use_cache, api_key=api_key)
+                for filename, resume_text in candidates.items()
+            }
+        prescreens = {filename: future.result() for filename, future in futures.items()}
+        shortlist = select_shortlist(prescreens)
+        print(f"Cascade: {len(shortlist)} of {len(candidates)} resumes shortlisted for full analysis")
+
+        full_resumes = {filename: text for filename, text in candidates.items() if filename in shortlist}
+        for index, filename in enumerate(resumes):
+            if filename in candidates and filename not in shortlist:
+                results[index] = _prescreen_result(filename, prescreens[filename])
+                if filename in prefilters:
+                    results[index]["prefilter"] = prefilters[filename]
+                if filename in compaction:
+                    results[index]["compaction"] = compaction[filename]
+                if on_result is not None:
+                    on_result(index, results[index])
+
+    def build_result(filename, match_future, skills_future):
+        try:
+            if skills_future is None:
+                match_result, skills_result = match_future.result()
+            elif filename in pack_futures:
+                match_result = match_future.result()[filename]
+                skills_result = skills_future.result()
+            else:
+                match_result = match_future.result()
+                skills_result = skills_future.result()
+
+            # Debug: Print the score for verification
+            overall_score = match_result.get('overall_match_percentage', 'N/A')
+            print(f"  {filename} Score: {overall_score}%")
+
+            result = {
+                "filename": filename,
+                "match_analysis": match_result,
+                "skills_analysis": skills_result,
+                "analysis_tier": TIER_FULL
+            }
+            if filename in prefilters:
+                result["prefilter"] = prefilters[filename]
+            if filename in prescreens:
+                result["prescreen"] = prescreens[filename]
+            if filename in compaction:
+                result["compaction"] = compaction[filename]
+            return result
+        except Exception as e:
+            print(f"Error analyzing {filename}: {str(e)}")
+            return _error_result(filename, e)
+
+    def track(index, filename, match_future, skills_future):
+        futures = [f for f in (match_future, skills_future) if f is not None]
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            results[index] = build_result(filename, match_future, skills_future)
+            if on_result is not None:
+                on_result(index, results[index])
+
+        for future in futures:
+            future.add_done_callback(done)
+
+    def partial_callback(filename):
+        if on_partial is None:
+            return None
+        return lambda key, value: on_partial(filename, key, value)
+
+    def retry_callback(filename):
+        if on_retry is None:
+            return None
+        return lambda: on_retry(filename)
+
+    # Callbacks run on the worker threads, so every result is in place once
+    # the executor has shut down
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        pack_futures = {}
+        if pack_match_requests:
+            packs = pack_resumes(full_resumes, jd)
+            print(f"Packing match requests: {len(full_resumes)} resumes into {len(packs)} requests")
+            for pack in packs:
+                pack_future = executor.submit(score_pack, pack, jd, use_cache=use_cache, api_key=api_key)
+                for _, filename, _ in pack:
+                    pack_futures[filename] = pack_future
+
+        for index, (filename, resume_text) in enumerate(resumes.items()):
+            if filename not in full_resumes:
+                continue
+            if analysis_mode == "fused":
+                fused_future = executor.submit(analyze_match_and_skills, resume_text, jd,
+                                               is_batch_analysis=is_batch, use_cache=use_cache, api_key=api_key)
+                track(index, filename, fused_future, None)
+                continue
+
+            if filename in pack_futures:
+                match_future = pack_futures[filename]
+            else:
+                match_future = executor.submit(get_match_score, resume_text, jd, is_batch_analysis=is_batch,
+                                               use_cache=use_cache, api_key=api_key,
+                                               on_partial=partial_callback(filename),
+                                               on_retry=retry_callback(filename))
+            skills_future = executor.submit(analyze_skills, resume_text, jd, use_cache=use_cache,
+                                            api_key=api_key, must_have_skills=must_have_skills,
+                                            nice_to_have_skills=nice_to_have_skills, skills_mode=skills_mode)
+            track(index, filename, match_future, skills_future)
+
+    for result in results:
+        ANALYSIS_RESUMES.labels(result.get("analysis_tier", TIER_FULL)).inc()
+    return results
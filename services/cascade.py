@@ -0,0 +1,87 @@
+from services.llm_utils import call_llm_json
+from services.schemas import PRESCREEN_SCHEMA
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# Pre-screen every resume of a batch with a cheap model and run the full
+# analysis only on the shortlist
+CASCADE_ENABLED = os.getenv("CASCADE_ENABLED", "false").lower() in ("1", "true", "yes")
+CASCADE_PRESCREEN_MODEL = os.getenv("CASCADE_PRESCREEN_MODEL", "gpt-4o-mini")
+# A resume advances when it ranks within the top K or reaches the minimum
+# score; 0 disables either criterion
+CASCADE_TOP_K = int(os.getenv("CASCADE_TOP_K", "10"))
+CASCADE_MIN_SCORE = float(os.getenv("CASCADE_MIN_SCORE", "75"))
+# Smaller batches go straight to the full analysis
+CASCADE_MIN_BATCH_SIZE = int(os.getenv("CASCADE_MIN_BATCH_SIZE", "10"))
+
+TIER_PRESCREEN = "prescreen"
+TIER_FULL = "full"
+
+
+def prescreen_resume(resume, jd, model=None, use_cache=True, api_key=None):
+    """
+    Coarse overall score of a resume from the cheap pre-screen model.
+
+    Returns:
+        dict with overall_match_percentage (None if the reply could not be
+        parsed), reason and model
+    """
+    model = model or CASCADE_PRESCREEN_MODEL
+    prompt = f"""
+        You are pre-screening resumes for a job opening. Give a quick, coarse estimate of how well the resume matches the job description.
+
+        JOB DESCRIPTION:
+        {jd}
+
+        Respond with ONLY valid JSON:
+        {{
+            "overall_match_percentage": <number 0-100>,
+            "reason": "<one short sentence>"
+        }}
+
+        RESUME:
+        {resume}
+        """
+
+    # A failed pre-screen only sends the resume on to the full analysis, so
+    # it is not worth a repair request
+    parsed, _ = call_llm_json(prompt, PRESCREEN_SCHEMA, temperature=0.0, model=model, use_cache=use_cache,
+                              api_key=api_key, repair_retries=0)
+
+    try:
+        score = int(round(float(parsed["overall_match_percentage"])))
+        reason = parsed.get("reason", "")
+    except Exception:
+        score, reason = None, "Could not parse pre-screen response"
+    return {"overall_match_percentage": score, "reason": reason, "model": model}
+
+
+def select_shortlist(prescreens, top_k=None, min_score=None):
+    """
+    Pick the filenames that go on to the full analysis.
+
+    Args:
+        prescreens: Mapping of filename to prescreen_resume() result
+        top_k: Number of best-scoring resumes that always advance
+            (defaults to CASCADE_TOP_K)
+        min_score: Score at or above which a resume advances
+            (defaults to CASCADE_MIN_SCORE)
+
+    Resumes without a usable pre-screen score always advance.
+    """
+    top_k = CASCADE_TOP_K if top_k is None else top_k
+    min_score = CASCADE_MIN_SCORE if min_score is None else min_score
+
+    shortlist = {name for name, prescreen in prescreens.items() if prescreen["overall_match_percentage"] is None}
+    scored = sorted(
+        (name for name in prescreens if name not in shortlist),
+        key=lambda name: prescreens[name]["overall_match_percentage"],
+        reverse=True
+    )
+    if top_k > 0:
+        shortlist.update(scored[:top_k])
+    if min_score > 0:
+        shortlist.update(name for name in scored if prescreens[name]["overall_match_percentage"] >= min_score)
+    return shortlist
@@ -0,0 +1,126 @@
+from dotenv import load_dotenv
+import numpy as np
+import os
+import re
+import zlib
+
+load_dotenv()
+
+# Cluster near-identical resumes of a batch (PDF and DOCX exports of one CV,
+# small edits) and analyze each cluster once
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() in ("1", "true", "yes")
+# Estimated Jaccard similarity of word shingles at which two resumes are duplicates
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.9"))
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))
+# LSH bands; with 128 permutations, 16 bands of 8 rows make pairs above ~0.7
+# similarity candidates, which are then checked against DEDUP_THRESHOLD
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+DEDUP_SHINGLE_WORDS = int(os.getenv("DEDUP_SHINGLE_WORDS", "3"))
+
+_WORD = re.compile(r"\w+")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+
+class MinHasher:
+    """MinHash signatures of word shingles under num_perm seeded hash permutations"""
+
+    def __init__(self, num_perm=None, shingle_words=None, seed=1):
+        self.num_perm = num_perm or DEDUP_NUM_PERM
+        self.shingle_words = shingle_words or DEDUP_SHINGLE_WORDS
+        rng = np.random.RandomState(seed)
+        # a, b < 2^31 and shingle hashes < 2^32 keep a * h + b within uint64
+        self._a = rng.randint(1, 2 ** 31 - 1, self.num_perm).astype(np.uint64)
+        self._b = rng.randint(0, 2 ** 31 - 1, self.num_perm).astype(np.uint64)
+
+    def shingles(self, text):
+        words = _WORD.findall((text or "").lower())
+        size = min(self.shingle_words, len(words)) or 1
+        return {zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(max(1, len(words) - size + 1))}
+
+    def signature(self, text):
+        hashes = np.fromiter(self.shingles(text), dtype=np.uint64)
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of two MinHash signatures"""
+    return float(np.mean(signature == other))
+
+
+def band_keys(signature, bands=None):
+    """One bucket key per LSH band; resumes sharing any key are candidates"""
+    bands = bands or DEDUP_BANDS
+    rows = len(signature) // bands
+    return [signature[band * rows:(band + 1) * rows].tobytes() for band in range(bands)]
+
+
+class MinHashLSH:
+    """In-memory LSH index over MinHash signatures"""
+
+    def __init__(self, bands=None):
+        self.bands = bands or DEDUP_BANDS
+        self._buckets = [{} for _ in range(self.bands)]
+
+    def insert(self, key, signature):
+        for band, bucket in enumerate(band_keys(signature, self.bands)):
+            self._buckets[band].setdefault(bucket, []).append(key)
+
+    def query(self, signature):
+        candidates = set()
+        for band, bucket in enumerate(band_keys(signature, self.bands)):
+            candidates.update(self._buckets[band].get(bucket, ()))
+        return candidates
+
+
+_minhasher = None
+
+
+def get_minhasher():
+    """Shared hasher; signatures are only comparable under the same permutations"""
+    global _minhasher
+    if _minhasher is None:
+        _minhasher = MinHasher()
+    return _minhasher
+
+
+def find_duplicate_groups(resumes, threshold=None):
+    """
+    Cluster near-identical resumes.
+
+    Candidate pairs come from the LSH buckets and are kept when their
+    estimated similarity reaches the threshold; clusters are the connected
+    components of those pairs.
+
+    Args:
+        resumes: Mapping of filename to resume text
+        threshold: Minimum estimated similarity (defaults to DEDUP_THRESHOLD)
+
+    Returns:
+        (groups, signatures): groups lists every cluster of two or more
+        filenames in input order, signatures maps filename to its signature
+    """
+    threshold = DEDUP_THRESHOLD if threshold is None else threshold
+    hasher = get_minhasher()
+    lsh = MinHashLSH()
+    parent = {}
+    signatures = {}
+
+    def root(name):
+        while parent[name] != name:
+            parent[name] = parent[parent[name]]
+            name = parent[name]
+        return name
+
+    for filename, text in resumes.items():
+        signature = signatures[filename] = hasher.signature(text)
+        parent[filename] = filename
+        for candidate in lsh.query(signature):
+            if similarity(signature, signatures[candidate]) >= threshold:
+                parent[root(filename)] = root(candidate)
+        lsh.insert(filename, signature)
+
+    clusters = {}
+    for filename in resumes:
+        clusters.setdefault(root(filename), []).append(filename)
+    return [members for members in clusters.values() if len(members) > 1], signatures
@@ -0,0 +1,129 @@
+from services.llm_utils import call_llm_json
+from services.schemas import FUSED_ANALYSIS_SCHEMA
+
+def _match_fallback(response):
+    return {
+        "error": "Could not parse response",
+        "raw_response": response,
+        "overall_match_percentage": "N/A"
+    }
+
+def _skills_fallback(response):
+    return {
+        "error": "Could not parse response",
+        "raw_response": response,
+        "matched_skills": {"must_have": [], "nice_to_have": [], "additional": []},
+        "missing_skills": {"critical": [], "important": [], "optional": []},
+        "skill_gaps": {"high_priority": [], "medium_priority": [], "low_priority": []},
+        "skill_analysis": {"technical_skills_match": 0, "soft_skills_match": 0, "domain_knowledge_match": 0},
+        "recommendations": []
+    }
+
+def analyze_match_and_skills(resume, jd, is_batch_analysis=False, use_cache=True, api_key=None):
+    """
+    Score a resume and analyze its skills with a single LLM call.
+
+    Returns a (match_analysis, skills_analysis) tuple shaped exactly like the
+    results of get_match_score and analyze_skills, so exports are unchanged.
+
+    Args:
+        resume: Resume text content
+        jd: Job description text
+        is_batch_analysis: Whether this is part of a batch analysis
+        use_cache: Set to False to bypass the LLM response cache
+        api_key: OpenAI API key of the caller (defaults to OPENAI_API_KEY)
+    """
+    batch_note = ""
+    if is_batch_analysis:
+        batch_note = ("This is part of a batch analysis - score this resume independently as if it's "
+                      "the only resume you're analyzing. Do not be influenced by other resumes in the batch.")
+
+    prompt = f"""
+    You are an expert HR recruiter and skills analyst analyzing a resume against a job description. {batch_note}
+
+    JOB DESCRIPTION:
+    {jd}
+
+    SCORING GUIDELINES:
+    - Overall Match (0-100): Consider all factors holistically
+    - Skills Match (0-100): Technical skills alignment with must-have and nice-to-have skills
+    - Experience Match (0-100): Years of experience and relevance to role
+    - Education Match (0-100): Educational background alignment
+
+    SCORING CRITERIA:
+    90-100: Perfect match, exceeds requirements
+    80-89: Strong match, meets most requirements
+    70-79: Good match, meets core requirements
+    60-69: Fair match, some gaps
+    50-59: Below average, significant gaps
+    0-49: Poor match, major gaps
+
+    IMPORTANT: Respond with ONLY valid JSON. No additional text before or after the JSON.
+
+    JSON STRUCTURE:
+    {{
+        "match_analysis": {{
+            "overall_match_percentage": <specific number 0-100>,
+            "skills_match_percentage": <specific number 0-100>,
+            "experience_match_percentage": <specific number 0-100>,
+            "education_match_percentage": <specific number 0-100>,
+            "detailed_analysis": {{
+                "strengths": ["specific strengths with details"],
+                "weaknesses": ["specific weaknesses with details"],
+                "recommendations": ["specific actionable recommendations"]
+            }},
+            "key_matches": ["specific matching points"],
+            "missing_requirements": ["specific missing requirements"]
+        }},
+        "skills_analysis": {{
+            "matched_skills": {{
+                "must_have": ["exact must-have skills found"],
+                "nice_to_have": ["exact nice-to-have skills found"],
+                "additional": ["other relevant skills found"]
+            }},
+            "missing_skills": {{
+                "critical": ["critical missing skills"],
+                "important": ["important missing skills"],
+                "optional": ["optional missing skills"]
+            }},
+            "skill_gaps": {{
+                "high_priority": ["high priority skills to learn"],
+                "medium_priority": ["medium priority skills to learn"],
+                "low_priority": ["low priority skills to learn"]
+            }},
+            "skill_analysis": {{
+                "technical_skills_match": <number 0-100>,
+                "soft_skills_match": <number 0-100>,
+                "domain_knowledge_match": <number 0-100>
+            }},
+            "recommendations": ["specific skill development recommendations"]
+        }}
+    }}
+
+    ANALYSIS FOCUS:
+    1. Exact technical skills match against the must-have and nice-to-have skills of the job description
+    2. Years of experience vs. requirements
+    3. Project relevance and complexity
+    4. Educational background quality
+    5. Soft skills: Communication, leadership, problem-solving
+    6. Domain knowledge: Industry-specific expertise
+    7. Provide specific, nuanced scores based on the actual content. Do not use generic scores.
+
+    RESUME:
+    {resume}
+    """
+
+    temperature = 0.9 if is_batch_analysis else 0.8
+    parsed, response = call_llm_json(prompt, FUSED_ANALYSIS_SCHEMA, temperature=temperature,
+                                     use_cache=use_cache, api_key=api_key)
+
+    if parsed is None:
+        return _match_fallback(response), _skills_fallback(response)
+
+    match_result = parsed.get("match_analysis")
+    skills_result = parsed.get("skills_analysis")
+    if not isinstance(match_result, dict):
+        match_result = _match_fallback(response)
+    if not isinstance(skills_result, dict):
+        skills_result = _skills_fallback(response)
+    return match_result, skills_result
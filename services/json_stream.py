@@ -0,0 +1,79 @@
+import json
+
+
+class IncrementalJSONParser:
+    """
+    Parse a streamed JSON object and report each top-level field once complete.
+
+    Feed text chunks as they arrive; feed() returns the (key, value) pairs
+    whose values were completed by that chunk. Any text before the first '{'
+    (such as a Markdown code fence) is ignored.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget everything fed so far, e.g. before a reply is streamed again"""
+        self._position = 0
+        self._text = ""
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._field_start = None
+        self.fields = {}
+
+    def feed(self, chunk):
+        completed = []
+        if self._finished or not chunk:
+            return completed
+        self._text += chunk
+
+        while self._position < len(self._text):
+            char = self._text[self._position]
+            index = self._position
+            self._position += 1
+
+            if not self._started:
+                if char == '{':
+                    self._started = True
+                    self._depth = 1
+                    self._field_start = index + 1
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._complete_field(self._text[self._field_start:index], completed)
+                    self._finished = True
+                    break
+            elif char == ',' and self._depth == 1:
+                self._complete_field(self._text[self._field_start:index], completed)
+                self._field_start = index + 1
+        return completed
+
+    def _complete_field(self, field_text, completed):
+        if not field_text.strip():
+            return
+        try:
+            field = json.loads("{" + field_text + "}")
+        except json.JSONDecodeError:
+            return
+        for key, value in field.items():
+            self.fields[key] = value
+            completed.append((key, value))
@@ -0,0 +1,90 @@
+from dotenv import load_dotenv
+import hashlib
+import httpx
+import openai
+import os
+import threading
+import time
+
+load_dotenv()
+
+# Connection pool and timeout settings shared by every per-key client
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "32"))
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "16"))
+LLM_POOL_KEEPALIVE_EXPIRY = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "120"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "120"))
+# Clients that have not been used for this long are closed and dropped
+LLM_CLIENT_IDLE_SECONDS = float(os.getenv("LLM_CLIENT_IDLE_SECONDS", "900"))
+
+
+class ClientRegistry:
+    """
+    One OpenAI client per API key, each with its own keep-alive connection pool.
+
+    Clients are created lazily, reused across requests and threads, and closed
+    once they have been idle for longer than idle_seconds.
+    """
+
+    def __init__(self, idle_seconds=LLM_CLIENT_IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _fingerprint(api_key):
+        # Avoid keeping raw keys as dictionary keys
+        return hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+
+    def _new_client(self, api_key):
+        http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=LLM_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=LLM_POOL_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(LLM_READ_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+        )
+        # Retries are handled by the rate limit scheduler in llm_utils
+        return openai.OpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+
+    def get(self, api_key=None):
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("No OpenAI API key provided")
+
+        fingerprint = self._fingerprint(api_key)
+        now = time.time()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(fingerprint)
+            if entry is None:
+                entry = [self._new_client(api_key), now]
+                self._clients[fingerprint] = entry
+            entry[1] = now
+            return entry[0]
+
+    def _evict_idle(self, now):
+        for fingerprint, (client, last_used) in list(self._clients.items()):
+            if now - last_used > self.idle_seconds:
+                del self._clients[fingerprint]
+                try:
+                    client.close()
+                except Exception as e:
+                    print(f"Error closing idle LLM client: {str(e)}")
+
+    def size(self):
+        with self._lock:
+            return len(self._clients)
+
+
+_registry = ClientRegistry()
+
+
+def get_client(api_key=None):
+    """Return the pooled OpenAI client for an API key (defaults to OPENAI_API_KEY)"""
+    return _registry.get(api_key)
+
+
+def get_client_pool_size():
+    return _registry.size()
@@ -1,19 +1,422 @@
+import httpx
 import openai
 from dotenv import load_dotenv
+from services.llm_cache import get_llm_cache, make_cache_key
+from services.llm_clients import get_client
+from services.metrics import (
+    LLM_REQUEST_SECONDS, LLM_PROMPT_TOKENS, LLM_CACHED_PROMPT_TOKENS, LLM_COMPLETION_TOKENS, LLM_ERRORS,
+    LLM_PARSE_FAILURES, LLM_REPAIR_REQUESTS, LLM_CACHE_LOOKUPS, LLM_IN_FLIGHT
+)
+from services.rate_limiter import (
+    get_scheduler, get_scheduler_stats, retry_after_seconds, backoff_delay, LLM_MAX_RETRIES
+)
+from services.resilience import (
+    run_hedged, get_circuit_breaker, get_latency_tracker, get_resilience_stats,
+    DeadlineExceededError, LLM_CALL_TIMEOUT_SECONDS, LLM_CALL_BUDGET_SECONDS, LLM_HEDGE_ENABLED
+)
+from services.schemas import validate, parse_json
+from services.single_flight import SingleFlight
+from services.token_utils import estimate_tokens
 import os
+import threading
+import time
 
 load_dotenv()
-client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-def call_llm(prompt, temperature=0.7):
+DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4")
+# Completion tokens reserved against the TPM budget before the reply is known
+LLM_EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "800"))
+
+# Transient failures that are retried with backoff instead of dropping the resume;
+# a connection dropped while a streamed reply is read surfaces as an httpx error
+_RETRYABLE_ERRORS = (openai.APIConnectionError, openai.InternalServerError, DeadlineExceededError,
+                     httpx.TransportError)
+
+# "auto" picks the strongest response format the model supports; "json_schema",
+# "json_object" or "off" force one. The default gpt-4 supports neither format,
+# so with it auto sends no response_format and relies on validation and repair
+LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "auto").lower()
+# Repair requests sent for a reply that fails its schema
+LLM_REPAIR_RETRIES = int(os.getenv("LLM_REPAIR_RETRIES", "1"))
+
+# Share one in-flight completion between concurrent identical calls
+LLM_SINGLE_FLIGHT_ENABLED = os.getenv("LLM_SINGLE_FLIGHT_ENABLED", "true").lower() in ("1", "true", "yes")
+_flights = SingleFlight()
+
+# Model name prefixes by response format support
+_JSON_SCHEMA_MODELS = ("gpt-4o", "gpt-4.1", "gpt-5", "o1", "o3", "o4")
+_JSON_OBJECT_MODELS = ("gpt-4-turbo", "gpt-4-1106", "gpt-4-0125", "gpt-3.5-turbo")
+
+_structured_stats = {"requests": 0, "parse_failures": 0, "validation_failures": 0,
+                     "repair_retries": 0, "repaired": 0, "unrecovered": 0}
+_structured_stats_lock = threading.Lock()
+
+# Token usage reported by the API, including prompt tokens served from the
+# provider's prefix cache
+_usage_stats = {"calls": 0, "prompt_tokens": 0, "cached_prompt_tokens": 0, "completion_tokens": 0}
+_usage_stats_lock = threading.Lock()
+
+def _count(name):
+    with _structured_stats_lock:
+        _structured_stats[name] += 1
+
+def _prompt_type(schema):
+    """Metrics label of a call: the schema name, or "unstructured" for plain text prompts"""
+    return schema["name"] if schema is not None else "unstructured"
+
+def _record_usage(model, usage, prompt_type):
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    cached_tokens = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", 0) or 0
+    print(f"  LLM usage ({model}): {prompt_tokens} prompt tokens ({cached_tokens} cached), "
+          f"{completion_tokens} completion tokens")
+    LLM_PROMPT_TOKENS.labels(model, prompt_type).inc(prompt_tokens)
+    LLM_CACHED_PROMPT_TOKENS.labels(model, prompt_type).inc(cached_tokens)
+    LLM_COMPLETION_TOKENS.labels(model, prompt_type).inc(completion_tokens)
+    with _usage_stats_lock:
+        _usage_stats["calls"] += 1
+        _usage_stats["prompt_tokens"] += prompt_tokens
+        _usage_stats["cached_prompt_tokens"] += cached_tokens
+        _usage_stats["completion_tokens"] += completion_tokens
+
+def _response_format(model, schema):
+    """
+    Response format to request for model, or None for plain text.
+
+    In auto mode, models outside both prefix lists (including plain gpt-4,
+    the default OPENAI_MODEL) get None: the API rejects response_format for
+    them, so their replies are only validated and repaired afterwards.
+    """
+    if schema is None:
+        return None
+    mode = LLM_STRUCTURED_OUTPUT
+    if mode == "auto":
+        if model.startswith(_JSON_SCHEMA_MODELS):
+            mode = "json_schema"
+        elif model.startswith(_JSON_OBJECT_MODELS):
+            mode = "json_object"
+        else:
+            mode = "off"
+    if mode == "json_schema":
+        return {"type": "json_schema", "json_schema": dict(schema, strict=True)}
+    if mode == "json_object":
+        return {"type": "json_object"}
+    return None
+
+def _is_valid(content, schema):
     try:
+        return not validate(parse_json(content), schema["schema"])
+    except ValueError:
+        return False
+
+def _read_stream(stream, on_delta):
+    parts = []
+    usage = None
+    try:
+        for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                on_delta(delta)
+    finally:
+        # Release the connection of a stream that failed or was abandoned
+        stream.close()
+    return "".join(parts), usage
+
+def _create_completion(client, api_key, model, prompt, temperature, on_delta=None, response_format=None,
+                       prompt_type="unstructured", on_retry=None):
+    """
+    Run one completion under the rate limit scheduler; returns (content, usage)
+
+    Each attempt, including reading a streamed reply to its end, has a
+    LLM_CALL_TIMEOUT_SECONDS deadline, and the whole call (queueing, attempts,
+    hedges and backoff) has a LLM_CALL_BUDGET_SECONDS budget; a missed
+    deadline is retried at most once. Non-streamed attempts
+    slower than the model's recent p95 latency are hedged with a duplicate
+    request, and the model's circuit breaker rejects calls while its backend
+    keeps failing.
+
+    A streamed reply is read inside the retry loop. When it fails after some
+    fragments reached on_delta, on_retry() is called so the caller can
+    discard them before the retry streams the reply again; without on_retry
+    the error is raised.
+    """
+    scheduler = get_scheduler(api_key)
+    breaker = get_circuit_breaker(model)
+    tracker = get_latency_tracker(model)
+    extra = {}
+    if on_delta is not None:
+        extra = {"stream": True, "stream_options": {"include_usage": True}}
+    if response_format is not None:
+        extra["response_format"] = response_format
+    estimated_tokens = estimate_tokens(prompt) + LLM_EXPECTED_COMPLETION_TOKENS
+    # A streamed reply cannot be hedged without emitting every fragment twice
+    hedge = LLM_HEDGE_ENABLED and on_delta is None
+
+    delivered = {"fragments": 0}
+    delivered_lock = threading.Lock()
+
+    def send(abandoned, timeout):
         response = client.chat.completions.create(
-            model="gpt-4",
+            model=model,
             messages=[
                 {"role": "user", "content": prompt}
             ],
-            temperature=temperature
+            temperature=temperature,
+            timeout=timeout,
+            **extra
         )
-        return response.choices[0].message.content
-    except Exception as e:
-        return f"Error calling LLM: {str(e)}"
+        if on_delta is None:
+            return response.choices[0].message.content, getattr(response, "usage", None)
+
+        def deliver(delta):
+            with delivered_lock:
+                # An attempt past its deadline keeps running in its thread; stop it
+                # before it mixes fragments into the retry
+                if abandoned.is_set():
+                    raise DeadlineExceededError("streamed reply abandoned after its deadline")
+                delivered["fragments"] += 1
+                on_delta(delta)
+
+        return _read_stream(response, deliver)
+
+    give_up_at = time.monotonic() + LLM_CALL_BUDGET_SECONDS
+
+    def remaining():
+        return give_up_at - time.monotonic()
+
+    def acquire_hedge():
+        if not scheduler.acquire(estimated_tokens, timeout=max(remaining(), 0.0)):
+            raise DeadlineExceededError("no rate limit capacity for a hedge within the call budget")
+
+    attempt = 0
+    deadline_misses = 0
+    while True:
+        # An open circuit fails fast, before the call takes a place in the rate limit queue
+        breaker.before_call()
+        if not scheduler.acquire(estimated_tokens, timeout=max(remaining(), 0.0)):
+            breaker.abandon()
+            raise DeadlineExceededError(f"LLM call spent its {LLM_CALL_BUDGET_SECONDS:g}s budget waiting to be sent")
+        started = time.monotonic()
+        deadline = min(LLM_CALL_TIMEOUT_SECONDS, max(remaining(), 0.001))
+        abandoned = threading.Event()
+        LLM_IN_FLIGHT.inc()
+        try:
+            content, usage = run_hedged(lambda abandoned=abandoned: send(abandoned, deadline),
+                                        hedge_delay=tracker.hedge_delay() if hedge else None, deadline=deadline,
+                                        before_hedge=acquire_hedge)
+        except openai.RateLimitError as e:
+            breaker.record_success()
+            # An exhausted quota will not recover by waiting
+            if getattr(e, "code", None) == "insufficient_quota" or attempt >= LLM_MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt, retry_after_seconds(e))
+            if delay >= remaining():
+                raise
+            print(f"Rate limited by OpenAI, retrying in {delay:.1f}s (attempt {attempt + 1})")
+            scheduler.pause(delay)
+        except openai.BadRequestError as e:
+            breaker.record_success()
+            # The capability table can be wrong for a model snapshot; fall back to plain text
+            if "response_format" not in extra or "response_format" not in str(e):
+                raise
+            print(f"Model {model} rejected response_format, retrying without it")
+            del extra["response_format"]
+            continue
+        except _RETRYABLE_ERRORS as e:
+            with delivered_lock:
+                abandoned.set()
+            breaker.record_failure()
+            if isinstance(e, DeadlineExceededError):
+                deadline_misses += 1
+            if attempt >= LLM_MAX_RETRIES or deadline_misses > 1 or \
+                    (delivered["fragments"] and on_retry is None):
+                raise
+            delay = backoff_delay(attempt, retry_after_seconds(e))
+            # The retry needs time for its own attempt, not only the backoff
+            if delay >= remaining():
+                raise
+            if delivered["fragments"]:
+                # The retry streams the reply from the start again
+                on_retry()
+                delivered["fragments"] = 0
+            print(f"Transient LLM error ({type(e).__name__}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+        except Exception:
+            # Any other API error still proves the backend is answering
+            breaker.record_success()
+            raise
+        else:
+            # Only reached once the whole reply, streamed or not, has arrived
+            breaker.record_success()
+            if on_delta is None:
+                tracker.record(time.monotonic() - started)
+            LLM_REQUEST_SECONDS.labels(model, prompt_type).observe(time.monotonic() - started)
+            scheduler.reconcile(estimated_tokens, getattr(usage, "total_tokens", None))
+            _record_usage(model, usage, prompt_type)
+            return content, usage
+        finally:
+            LLM_IN_FLIGHT.dec()
+        attempt += 1
+
+def call_llm(prompt, temperature=0.7, model=DEFAULT_MODEL, use_cache=True, api_key=None, on_delta=None,
+             schema=None, on_retry=None):
+    """
+    Send a single-turn prompt to the chat completions API.
+
+    Successful responses are cached by a hash of (model, prompt, temperature).
+    Pass use_cache=False to skip the lookup for this call; the fresh response
+    still replaces the cached one. The request goes through the pooled client
+    of api_key (defaults to OPENAI_API_KEY) and is queued by the per-key rate
+    limit scheduler; 429s and transient errors are retried with backoff.
+
+    When on_delta is given the completion is streamed and on_delta is called
+    with each text fragment as it arrives (a cached response is delivered as
+    one fragment). The full text is returned either way. If the stream breaks
+    after some fragments were delivered, on_retry() is called before the reply
+    is streamed again, and the caller should discard what it received so far.
+
+    When schema (see services.schemas) is given, structured JSON output is
+    requested if the model supports it, and only replies that validate
+    against the schema are cached or served from the cache.
+
+    Concurrent calls with the same (model, prompt, temperature) share one
+    in-flight completion; a caller that joins receives the text as one
+    on_delta fragment once it is complete.
+    """
+    cache = get_llm_cache()
+    cache_key = make_cache_key(model, prompt, temperature)
+    if cache is not None and use_cache:
+        cached = cache.get(cache_key)
+        if cached is not None and (schema is None or _is_valid(cached, schema)):
+            LLM_CACHE_LOOKUPS.labels("hit").inc()
+            if on_delta is not None:
+                on_delta(cached)
+            return cached
+        LLM_CACHE_LOOKUPS.labels("miss").inc()
+
+    def fetch():
+        try:
+            client = get_client(api_key)
+            content, _ = _create_completion(client, api_key, model, prompt, temperature, on_delta=on_delta,
+                                            response_format=_response_format(model, schema),
+                                            prompt_type=_prompt_type(schema), on_retry=on_retry)
+        except Exception as e:
+            LLM_ERRORS.labels(model, _prompt_type(schema)).inc()
+            return f"Error calling LLM: {str(e)}"
+
+        if cache is not None and content and (schema is None or _is_valid(content, schema)):
+            cache.set(cache_key, content)
+        return content
+
+    if not LLM_SINGLE_FLIGHT_ENABLED:
+        return fetch()
+
+    content, shared = _flights.do(cache_key, fetch)
+    if shared:
+        # The leader may have failed for reasons of its own, such as an invalid API key
+        if content is None or content.startswith("Error calling LLM"):
+            return fetch()
+        if on_delta is not None:
+            on_delta(content)
+    return content
+
+def call_llm_json(prompt, schema, temperature=0.7, model=DEFAULT_MODEL, use_cache=True, api_key=None,
+                  on_delta=None, repair_retries=None, on_retry=None):
+    """
+    Call the LLM for a JSON reply and validate it against schema.
+
+    A reply that does not parse or validate is sent back once more (up to
+    repair_retries, defaults to LLM_REPAIR_RETRIES) together with the errors,
+    asking only for the corrected JSON.
+
+    Returns:
+        (parsed, raw_response); when no reply validates, parsed is the last
+        reply that was at least a JSON object, or None
+    """
+    repair_retries = LLM_REPAIR_RETRIES if repair_retries is None else repair_retries
+    _count("requests")
+    response = call_llm(prompt, temperature=temperature, model=model, use_cache=use_cache, api_key=api_key,
+                        on_delta=on_delta, schema=schema, on_retry=on_retry)
+
+    for attempt in range(repair_retries + 1):
+        if response.startswith("Error calling LLM"):
+            return None, response
+        try:
+            parsed = parse_json(response)
+            errors = validate(parsed, schema["schema"])
+        except ValueError as e:
+            parsed, errors = None, [f"invalid JSON: {str(e)}"]
+            _count("parse_failures")
+            LLM_PARSE_FAILURES.labels(schema["name"]).inc()
+        else:
+            if not errors:
+                if attempt:
+                    _count("repaired")
+                return parsed, response
+            _count("validation_failures")
+            LLM_PARSE_FAILURES.labels(schema["name"]).inc()
+
+        if attempt == repair_retries:
+            break
+        _count("repair_retries")
+        LLM_REPAIR_REQUESTS.labels(schema["name"]).inc()
+        print(f"Invalid {schema['name']} response ({errors[0]}), requesting a repair")
+        repair_prompt = f"""{prompt}
+
+        YOUR PREVIOUS RESPONSE WAS INVALID:
+        {'; '.join(errors[:10])}
+
+        PREVIOUS RESPONSE:
+        {response}
+
+        Respond again with ONLY the corrected, complete JSON. No additional text before or after the JSON.
+        """
+        response = call_llm(repair_prompt, temperature=temperature, model=model, use_cache=use_cache,
+                            api_key=api_key, schema=schema)
+
+    _count("unrecovered")
+    return (parsed if isinstance(parsed, dict) else None), response
+
+def get_cache_stats():
+    """Hit/miss counters of the LLM response cache"""
+    cache = get_llm_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
+
+def get_structured_output_stats():
+    """Parse/validation failure and repair counters of call_llm_json"""
+    with _structured_stats_lock:
+        stats = dict(_structured_stats)
+    failures = stats["parse_failures"] + stats["validation_failures"]
+    attempts = stats["requests"] + stats["repair_retries"]
+    stats["failure_rate"] = round(failures / attempts, 4) if attempts else 0.0
+    stats["mode"] = LLM_STRUCTURED_OUTPUT
+    return stats
+
+def get_token_usage_stats():
+    """Prompt/completion token totals and the share of prompt tokens served from the prefix cache"""
+    with _usage_stats_lock:
+        stats = dict(_usage_stats)
+    stats["cached_prompt_ratio"] = (round(stats["cached_prompt_tokens"] / stats["prompt_tokens"], 4)
+                                    if stats["prompt_tokens"] else 0.0)
+    return stats
+
+def get_single_flight_stats():
+    """Completions executed and identical concurrent calls coalesced into them"""
+    stats = _flights.stats()
+    stats["enabled"] = LLM_SINGLE_FLIGHT_ENABLED
+    return stats
+
+def get_llm_resilience_stats():
+    """Hedging, deadline and circuit breaker state per model"""
+    return get_resilience_stats()
+
+def get_rate_limit_stats():
+    """Queue depth and 429 counters of the rate limit schedulers"""
+    return get_scheduler_stats()
@@ -1,7 +1,9 @@
-from services.llm_utils import call_llm
-import json
+from services.llm_utils import call_llm_json
+from services.json_stream import IncrementalJSONParser
+from services.schemas import MATCH_ANALYSIS_SCHEMA
 
-def get_match_score(resume, jd, is_batch_analysis=False):
+def get_match_score(resume, jd, is_batch_analysis=False, use_cache=True, api_key=None, on_partial=None,
+                    on_retry=None):
     """
     Analyze a single resume against a job description.
     
@@ -9,15 +11,19 @@ def get_match_score(resume, jd, is_batch_analysis=False):
         resume: Resume text content
         jd: Job description text
         is_batch_analysis: Whether this is part of a batch analysis
+        use_cache: Set to False to bypass the LLM response cache
+        api_key: OpenAI API key of the caller (defaults to OPENAI_API_KEY)
+        on_partial: Optional callback(key, value) invoked for each top-level
+            field (e.g. overall_match_percentage) as soon as it has streamed in
+        on_retry: Optional callback() invoked when the stream broke and the
+            reply is streamed again; the fields reported so far are void and
+            will be reported anew
     """
     
     if is_batch_analysis:
         prompt = f"""
         You are an expert HR recruiter analyzing a resume against a job description. This is part of a batch analysis - score each resume independently and accurately.
 
-        RESUME:
-        {resume}
-
         JOB DESCRIPTION:
         {jd}
 
@@ -58,14 +64,14 @@ def get_match_score(resume, jd, is_batch_analysis=False):
         3. Do not use generic or conservative scores
         4. Consider exact technical skills match, experience level, education quality
         5. Be precise: if a candidate deserves 90%, give them 90%, not 85%
+
+        RESUME:
+        {resume}
         """
     else:
         prompt = f"""
         You are an expert HR recruiter analyzing a resume against a job description. Provide a detailed, nuanced assessment with specific scoring.
 
-        RESUME:
-        {resume}
-
         JOB DESCRIPTION:
         {jd}
 
@@ -105,17 +111,34 @@ def get_match_score(resume, jd, is_batch_analysis=False):
         4. Educational background quality
         5. Leadership and management experience
         6. Industry-specific experience
+
+        RESUME:
+        {resume}
         """
     
     # Use higher temperature for batch analysis to encourage more varied responses
     temperature = 0.9 if is_batch_analysis else 0.8
-    response = call_llm(prompt, temperature=temperature)
+    on_delta = restart = None
+    if on_partial is not None:
+        parser = IncrementalJSONParser()
+
+        def on_delta(chunk):
+            for key, value in parser.feed(chunk):
+                on_partial(key, value)
+
+        # A retried stream starts over; its fields are reported again
+        def restart():
+            parser.reset()
+            if on_retry is not None:
+                on_retry()
+
+    parsed, response = call_llm_json(prompt, MATCH_ANALYSIS_SCHEMA, temperature=temperature,
+                                     use_cache=use_cache, api_key=api_key, on_delta=on_delta, on_retry=restart)
     
-    try:
-        return json.loads(response)
-    except Exception:
-        return {
-            "error": "Could not parse response", 
-            "raw_response": response,
-            "overall_match_percentage": "N/A"
-        }
+    if parsed is not None:
+        return parsed
+    return {
+        "error": "Could not parse response", 
+        "raw_response": response,
+        "overall_match_percentage": "N/A"
+    }
@@ -0,0 +1,72 @@
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from services.rate_limiter import get_scheduler_stats
+
+# Prometheus metrics served by /metrics. Labels stay low-cardinality: file
+# formats, model names, prompt types (schema names) and export formats only.
+
+_LLM_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+_EXPORT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+
+EXTRACTION_SECONDS = Histogram(
+    "resume_extraction_seconds", "Time to extract text from one resume file", ["format"]
+)
+EXTRACTION_FAILURES = Counter(
+    "resume_extraction_failures_total", "Resume files whose text could not be extracted", ["format"]
+)
+EXTRACTION_PEAK_RSS_BYTES = Histogram(
+    "resume_extraction_peak_rss_bytes", "Peak resident memory of the extraction worker while it parsed one resume file",
+    ["format"], buckets=tuple(mb * 1024 * 1024 for mb in (64, 128, 256, 512, 1024, 2048, 4096))
+)
+EXTRACTION_CACHE_LOOKUPS = Counter(
+    "resume_extraction_cache_lookups_total", "Extraction cache lookups", ["result"]
+)
+
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_seconds", "Latency of successful LLM completions", ["model", "prompt_type"], buckets=_LLM_BUCKETS
+)
+LLM_PROMPT_TOKENS = Counter(
+    "llm_prompt_tokens_total", "Prompt tokens sent to the LLM", ["model", "prompt_type"]
+)
+LLM_CACHED_PROMPT_TOKENS = Counter(
+    "llm_cached_prompt_tokens_total", "Prompt tokens served from the provider prefix cache", ["model", "prompt_type"]
+)
+LLM_COMPLETION_TOKENS = Counter(
+    "llm_completion_tokens_total", "Completion tokens returned by the LLM", ["model", "prompt_type"]
+)
+LLM_ERRORS = Counter(
+    "llm_errors_total", "LLM calls that failed after retries", ["model", "prompt_type"]
+)
+LLM_PARSE_FAILURES = Counter(
+    "llm_parse_failures_total", "LLM replies that did not parse or validate", ["prompt_type"]
+)
+LLM_REPAIR_REQUESTS = Counter(
+    "llm_repair_retries_total", "Repair requests sent for invalid LLM replies", ["prompt_type"]
+)
+LLM_CACHE_LOOKUPS = Counter(
+    "llm_cache_lookups_total", "LLM response cache lookups", ["result"]
+)
+LLM_IN_FLIGHT = Gauge(
+    "llm_requests_in_flight", "LLM completions currently being processed"
+)
+LLM_QUEUE_DEPTH = Gauge(
+    "llm_rate_limit_queue_depth", "LLM calls waiting for rate limit capacity"
+)
+LLM_QUEUE_DEPTH.set_function(lambda: get_scheduler_stats()["waiting"])
+
+ANALYSIS_SECONDS = Histogram(
+    "analysis_request_seconds", "Duration of /analyze requests", ["endpoint"], buckets=_LLM_BUCKETS + (300, 600)
+)
+ANALYSIS_IN_FLIGHT = Gauge(
+    "analysis_requests_in_flight", "Analysis requests currently being processed", ["endpoint"]
+)
+ANALYSIS_RESUMES = Counter(
+    "analysis_resumes_total", "Resumes analyzed", ["analysis_tier"]
+)
+EXPORT_SECONDS = Histogram(
+    "export_seconds", "Time to generate a results export", ["format"], buckets=_EXPORT_BUCKETS
+)
+
+
+def render_metrics():
+    """Return (body, content_type) of the Prometheus text exposition"""
+    return generate_latest(), CONTENT_TYPE_LATEST
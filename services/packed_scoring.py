@@ -0,0 +1,176 @@
+from services.llm_utils import call_llm_json
+from services.match_percentage import get_match_score
+from services.schemas import PACKED_MATCH_SCHEMA, validate
+from services.token_utils import estimate_tokens
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# Token budget for one packed request, covering the prompt and the expected reply
+MATCH_PACK_TOKEN_BUDGET = int(os.getenv("MATCH_PACK_TOKEN_BUDGET", "7000"))
+MATCH_PACK_MAX_ITEMS = int(os.getenv("MATCH_PACK_MAX_ITEMS", "8"))
+# Completion tokens reserved for each resume's JSON result
+MATCH_PACK_OUTPUT_TOKENS_PER_ITEM = int(os.getenv("MATCH_PACK_OUTPUT_TOKENS_PER_ITEM", "400"))
+
+_RESUME_SEPARATOR = "=" * 20
+
+
+def _build_prompt(items, jd):
+    resume_blocks = "\n\n".join(
+        f"{_RESUME_SEPARATOR} RESUME ID: {item_id} {_RESUME_SEPARATOR}\n{text}"
+        for item_id, _, text in items
+    )
+    return f"""
+        You are an expert HR recruiter analyzing several resumes against the same job description. Each resume is marked with a RESUME ID.
+
+        JOB DESCRIPTION:
+        {jd}
+
+        CRITICAL: Score every resume independently as if it's the only resume you're analyzing. Do not compare resumes with each other and do not let one resume influence another's score.
+
+        SCORING GUIDELINES:
+        - Overall Match (0-100): Consider all factors holistically
+        - Skills Match (0-100): Technical skills alignment with must-have and nice-to-have skills
+        - Experience Match (0-100): Years of experience and relevance to role
+        - Education Match (0-100): Educational background alignment
+
+        SCORING CRITERIA:
+        90-100: Perfect match, exceeds requirements
+        80-89: Strong match, meets most requirements
+        70-79: Good match, meets core requirements
+        60-69: Fair match, some gaps
+        50-59: Below average, significant gaps
+        0-49: Poor match, major gaps
+
+        Respond with ONLY valid JSON containing exactly one entry per RESUME ID:
+        {{
+            "results": [
+                {{
+                    "id": "<RESUME ID>",
+                    "overall_match_percentage": <specific number 0-100>,
+                    "skills_match_percentage": <specific number 0-100>,
+                    "experience_match_percentage": <specific number 0-100>,
+                    "education_match_percentage": <specific number 0-100>,
+                    "detailed_analysis": {{
+                        "strengths": ["specific strengths with details"],
+                        "weaknesses": ["specific weaknesses with details"],
+                        "recommendations": ["specific actionable recommendations"]
+                    }},
+                    "key_matches": ["specific matching points"],
+                    "missing_requirements": ["specific missing requirements"]
+                }}
+            ]
+        }}
+
+        IMPORTANT: Provide specific, nuanced scores based on each resume's actual content. Do not use generic or conservative scores.
+
+        RESUMES:
+        {resume_blocks}
+        """
+
+
+def pack_resumes(resumes, jd, token_budget=None, max_items=None):
+    """
+    Group resumes into packs that each fit into one request.
+
+    Every pack holds at most max_items resumes, and the prompt tokens plus the
+    reserved completion tokens stay within token_budget. A resume that does
+    not fit alongside others is placed in a pack of its own.
+
+    Args:
+        resumes: Mapping of filename to resume text
+        jd: Job description text
+        token_budget: Token budget per request (defaults to MATCH_PACK_TOKEN_BUDGET)
+        max_items: Maximum resumes per request (defaults to MATCH_PACK_MAX_ITEMS)
+
+    Returns:
+        List of packs, each a list of (item_id, filename, resume_text) tuples
+    """
+    token_budget = token_budget or MATCH_PACK_TOKEN_BUDGET
+    max_items = max(1, max_items or MATCH_PACK_MAX_ITEMS)
+    base_tokens = estimate_tokens(_build_prompt([], jd))
+
+    packs = []
+    current, current_tokens = [], base_tokens
+    for index, (filename, text) in enumerate(resumes.items(), 1):
+        item = (f"R{index}", filename, text)
+        item_tokens = estimate_tokens(text) + MATCH_PACK_OUTPUT_TOKENS_PER_ITEM + 20
+        if current and (len(current) >= max_items or current_tokens + item_tokens > token_budget):
+            packs.append(current)
+            current, current_tokens = [], base_tokens
+        current.append(item)
+        current_tokens += item_tokens
+    if current:
+        packs.append(current)
+    return packs
+
+
+_ITEM_SCHEMA = PACKED_MATCH_SCHEMA["schema"]["properties"]["results"]["items"]
+
+
+def _score_individually(items, jd, use_cache=True, api_key=None):
+    """Score items with one get_match_score call each, concurrently"""
+    def score(item):
+        return get_match_score(item[2], jd, is_batch_analysis=True, use_cache=use_cache, api_key=api_key)
+
+    if len(items) == 1:
+        return {items[0][1]: score(items[0])}
+    # Bounded by the pack size, MATCH_PACK_MAX_ITEMS
+    with ThreadPoolExecutor(max_workers=len(items)) as executor:
+        return {item[1]: result for item, result in zip(items, executor.map(score, items))}
+
+
+def score_pack(items, jd, use_cache=True, api_key=None, repack=True):
+    """
+    Score a pack of resumes with one LLM request.
+
+    Items missing from the reply, or whose entry fails the match schema, are
+    sent again as one smaller pack when the reply kept at least part of the
+    pack; items that still fail are re-scored on their own with
+    get_match_score, concurrently. The valid entries are kept.
+
+    Args:
+        items: List of (item_id, filename, resume_text) tuples from pack_resumes
+        jd: Job description text
+        use_cache: Set to False to bypass the LLM response cache
+        api_key: OpenAI API key of the caller (defaults to OPENAI_API_KEY)
+        repack: Set to False to re-score failed items individually right away
+
+    Returns:
+        Mapping of filename to match analysis
+    """
+    if len(items) == 1:
+        return _score_individually(items, jd, use_cache=use_cache, api_key=api_key)
+
+    # Invalid entries are repaired below rather than re-requesting the whole pack
+    parsed, _ = call_llm_json(_build_prompt(items, jd), PACKED_MATCH_SCHEMA, temperature=0.9,
+                              use_cache=use_cache, api_key=api_key, repair_retries=0)
+    entries = parsed.get("results", []) if isinstance(parsed, dict) else []
+
+    by_id = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if isinstance(entry, dict) and entry.get("id") is not None:
+            by_id[str(entry["id"]).strip()] = entry
+
+    results = {}
+    failed = []
+    for item_id, filename, text in items:
+        entry = by_id.get(item_id)
+        if entry is None or validate(entry, _ITEM_SCHEMA):
+            failed.append((item_id, filename, text))
+            continue
+        result = dict(entry)
+        result.pop("id", None)
+        results[filename] = result
+
+    if failed:
+        # A reply that scored nothing is unlikely to do better with the same resumes
+        if repack and len(failed) < len(items):
+            print(f"  Packed results missing for {len(failed)} of {len(items)} resumes, re-packing them")
+            results.update(score_pack(failed, jd, use_cache=use_cache, api_key=api_key, repack=False))
+        else:
+            print(f"  Packed results missing for {len(failed)} of {len(items)} resumes, retrying individually")
+            results.update(_score_individually(failed, jd, use_cache=use_cache, api_key=api_key))
+    return results
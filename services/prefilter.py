@@ -0,0 +1,199 @@
+from collections import Counter
+from dotenv import load_dotenv
+import math
+import os
+import re
+
+load_dotenv()
+
+# Rank the resumes of a batch locally with BM25 and send only the best ones
+# to the LLM
+PREFILTER_ENABLED = os.getenv("PREFILTER_ENABLED", "false").lower() in ("1", "true", "yes")
+# A resume advances when it ranks within the top K or reaches the minimum
+# relevance (0-100, relative to the best resume); 0 disables either criterion
+PREFILTER_TOP_K = int(os.getenv("PREFILTER_TOP_K", "50"))
+PREFILTER_MIN_SCORE = float(os.getenv("PREFILTER_MIN_SCORE", "0"))
+# Smaller batches go straight to the LLM
+PREFILTER_MIN_BATCH_SIZE = int(os.getenv("PREFILTER_MIN_BATCH_SIZE", "10"))
+# Extra query weight of every must-have skill term
+PREFILTER_MUST_HAVE_BOOST = float(os.getenv("PREFILTER_MUST_HAVE_BOOST", "3"))
+# "bm25" scores with the inverted index below, "tfidf" with the hashed
+# TF-IDF vectors of services/similarity.py
+PREFILTER_METHOD = os.getenv("PREFILTER_METHOD", "bm25").lower()
+PREFILTER_METHODS = ("bm25", "tfidf")
+
+TIER_PREFILTER = "prefilter"
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Keeps skill spellings such as c++, c#, node.js and front-end together
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.-]*")
+_STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in is it its of on or our that the this to was were will with
+    we you your they their who which what when where how all any can may must should would able also other
+    than into about more such within required requirements requirement experience years year work working
+    role job location industry key skills must-have nice-to-have description
+""".split())
+
+
+def tokenize(text):
+    """Lowercase word tokens without stopwords, trailing punctuation stripped"""
+    tokens = []
+    for token in _TOKEN.findall((text or "").lower()):
+        token = token.rstrip(".-")
+        if token and token not in _STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def bm25_idf(n_docs, df):
+    """Okapi BM25 inverse document frequency (never negative)"""
+    return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+
+def bm25_weight(tf, doc_length, average_length, k1=BM25_K1, b=BM25_B):
+    """Saturated, length-normalised term frequency of one document"""
+    return tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_length / average_length))
+
+
+class BM25Index:
+    """
+    In-memory inverted index scored with Okapi BM25.
+
+    Documents can be added one at a time; scoring only walks the postings of
+    the query terms, so ranking a thousand resumes takes milliseconds.
+    """
+
+    def __init__(self, k1=BM25_K1, b=BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._postings = {}
+        self._doc_lengths = {}
+        self._total_length = 0
+
+    def __len__(self):
+        return len(self._doc_lengths)
+
+    def add(self, doc_id, text):
+        if doc_id in self._doc_lengths:
+            raise ValueError(f"Document already indexed: {doc_id}")
+        tokens = tokenize(text)
+        self._doc_lengths[doc_id] = len(tokens)
+        self._total_length += len(tokens)
+        for term, count in Counter(tokens).items():
+            self._postings.setdefault(term, {})[doc_id] = count
+
+    def idf(self, term):
+        return bm25_idf(len(self._doc_lengths), len(self._postings.get(term, ())))
+
+    def score(self, query_weights):
+        """
+        Args:
+            query_weights: Mapping of query term to weight
+
+        Returns:
+            dict of doc_id to BM25 score; documents sharing no term score 0
+        """
+        scores = dict.fromkeys(self._doc_lengths, 0.0)
+        if not self._doc_lengths:
+            return scores
+        average_length = self._total_length / len(self._doc_lengths) or 1
+        for term, weight in query_weights.items():
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, tf in postings.items():
+                scores[doc_id] += weight * idf * bm25_weight(tf, self._doc_lengths[doc_id], average_length,
+                                                             self.k1, self.b)
+        return scores
+
+
+def _skill_terms(must_have_skills):
+    """Split a comma/semicolon separated skill list into per-skill token lists"""
+    skills = re.split(r"[,;\n]", must_have_skills or "")
+    return [(skill.strip(), tokenize(skill)) for skill in skills if tokenize(skill)]
+
+
+def build_query(jd, must_have_skills=None):
+    """Query term weights: job description term counts plus a boost per must-have term"""
+    weights = Counter(tokenize(jd))
+    for _, terms in _skill_terms(must_have_skills):
+        for term in terms:
+            weights[term] += PREFILTER_MUST_HAVE_BOOST
+    return dict(weights)
+
+
+def _tfidf_scores(resumes, jd, must_have_skills=None):
+    # Imported here so NumPy/SciPy load only when the TF-IDF method is used
+    from services.similarity import SimilarityEngine
+
+    # Repeating the must-have skills gives them the same extra weight as in BM25
+    query = "\n".join([jd] + [must_have_skills or ""] * int(PREFILTER_MUST_HAVE_BOOST))
+    return dict(SimilarityEngine().fit(resumes).rank(query))
+
+
+def prefilter_resumes(resumes, jd, must_have_skills=None, method=None):
+    """
+    Score every resume against the job description.
+
+    Args:
+        resumes: Mapping of filename to resume text
+        jd: Job description text
+        must_have_skills: Comma separated must-have skills, weighted higher
+        method: "bm25" or "tfidf" (defaults to PREFILTER_METHOD)
+
+    Returns:
+        Mapping of filename to dict with score (raw BM25 or cosine
+        similarity), relevance (0-100, relative to the best resume), rank
+        (1 = best) and the must-have skills found in the resume
+    """
+    method = (method or PREFILTER_METHOD).lower()
+    if method not in PREFILTER_METHODS:
+        raise ValueError(f"Unknown pre-filter method: {method}")
+    if method == "tfidf":
+        scores = _tfidf_scores(resumes, jd, must_have_skills)
+    else:
+        index = BM25Index()
+        for filename, text in resumes.items():
+            index.add(filename, text)
+        scores = index.score(build_query(jd, must_have_skills))
+
+    skills = _skill_terms(must_have_skills)
+    best = max(scores.values(), default=0.0)
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    prefilter = {}
+    for rank, filename in enumerate(ranked, 1):
+        resume_terms = set(tokenize(resumes[filename]))
+        prefilter[filename] = {
+            "score": round(scores[filename], 4),
+            "relevance": round(100 * scores[filename] / best, 1) if best > 0 else 0.0,
+            "rank": rank,
+            "matched_must_have": [skill for skill, terms in skills if resume_terms.issuperset(terms)]
+        }
+    return prefilter
+
+
+def select_prefiltered(prefilter, top_k=None, min_score=None):
+    """
+    Pick the filenames that go on to the LLM.
+
+    Args:
+        prefilter: Mapping of filename to prefilter_resumes() entry
+        top_k: Number of best-ranked resumes that always advance
+            (defaults to PREFILTER_TOP_K)
+        min_score: Relevance at or above which a resume advances
+            (defaults to PREFILTER_MIN_SCORE)
+    """
+    top_k = PREFILTER_TOP_K if top_k is None else top_k
+    min_score = PREFILTER_MIN_SCORE if min_score is None else min_score
+
+    shortlist = set()
+    if top_k > 0:
+        shortlist.update(name for name, entry in prefilter.items() if entry["rank"] <= top_k)
+    if min_score > 0:
+        shortlist.update(name for name, entry in prefilter.items() if entry["relevance"] >= min_score)
+    if top_k <= 0 and min_score <= 0:
+        shortlist.update(prefilter)
+    return shortlist
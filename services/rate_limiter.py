@@ -0,0 +1,163 @@
+from dotenv import load_dotenv
+import hashlib
+import os
+import random
+import threading
+import time
+
+load_dotenv()
+
+# Account limits; the scheduler targets LLM_RATE_LIMIT_HEADROOM of each
+LLM_RATE_LIMIT_RPM = float(os.getenv("LLM_RATE_LIMIT_RPM", "500"))
+LLM_RATE_LIMIT_TPM = float(os.getenv("LLM_RATE_LIMIT_TPM", "30000"))
+LLM_RATE_LIMIT_HEADROOM = float(os.getenv("LLM_RATE_LIMIT_HEADROOM", "0.9"))
+# Retry policy for 429 and transient API errors
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "8"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "60"))
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at capacity per minute"""
+
+    def __init__(self, per_minute):
+        self.capacity = max(per_minute, 1.0)
+        self.refill_per_second = self.capacity / 60.0
+        self.available = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.available = min(self.capacity, self.available + elapsed * self.refill_per_second)
+            self.updated_at = now
+
+    def wait_time(self, amount, now):
+        """Seconds until amount can be consumed (0 when available now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.refill_per_second
+
+    def consume(self, amount):
+        self.available -= min(amount, self.capacity)
+
+    def refund(self, amount):
+        self.available = min(self.capacity, self.available + amount)
+
+
+class RateLimitScheduler:
+    """
+    Queue LLM requests so that requests and tokens per minute stay under limits.
+
+    acquire() blocks the calling thread until both the request bucket and the
+    token bucket can cover the request. pause() holds back every caller, e.g.
+    after the API answered 429 with a Retry-After header.
+    """
+
+    def __init__(self, rpm=LLM_RATE_LIMIT_RPM, tpm=LLM_RATE_LIMIT_TPM, headroom=LLM_RATE_LIMIT_HEADROOM):
+        self.requests = TokenBucket(rpm * headroom)
+        self.tokens = TokenBucket(tpm * headroom)
+        self._condition = threading.Condition()
+        self._paused_until = 0.0
+        self.waiting = 0
+        self.rate_limited = 0
+
+    def acquire(self, tokens, timeout=None):
+        """Wait until a request of tokens may be sent; False if timeout seconds pass first"""
+        give_up_at = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self.waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = max(
+                        self._paused_until - now,
+                        self.requests.wait_time(1, now),
+                        self.tokens.wait_time(tokens, now)
+                    )
+                    if delay <= 0:
+                        self.requests.consume(1)
+                        self.tokens.consume(tokens)
+                        return True
+                    if give_up_at is not None:
+                        if now >= give_up_at:
+                            return False
+                        delay = min(delay, give_up_at - now)
+                    self._condition.wait(timeout=delay)
+            finally:
+                self.waiting -= 1
+
+    def reconcile(self, estimated_tokens, actual_tokens):
+        """Give back tokens that were reserved but not used"""
+        if actual_tokens is None or actual_tokens >= estimated_tokens:
+            return
+        with self._condition:
+            self.tokens.refund(estimated_tokens - actual_tokens)
+            self._condition.notify_all()
+
+    def pause(self, seconds):
+        with self._condition:
+            self.rate_limited += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self):
+        with self._condition:
+            return {
+                "waiting": self.waiting,
+                "rate_limited": self.rate_limited,
+                "paused_for_seconds": round(max(self._paused_until - time.monotonic(), 0.0), 2)
+            }
+
+
+def retry_after_seconds(error):
+    """Read Retry-After (or retry-after-ms) from an API error response, if any"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Jittered exponential backoff that never undercuts the server's Retry-After"""
+    delay = min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * (2 ** attempt))
+    delay = random.uniform(delay / 2, delay)
+    if retry_after is not None:
+        delay = max(delay, retry_after + random.uniform(0, LLM_BACKOFF_BASE_SECONDS))
+    return delay
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(api_key=None):
+    """Return the scheduler for an API key; limits are tracked per key"""
+    api_key = api_key or os.getenv("OPENAI_API_KEY") or ""
+    fingerprint = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+    with _schedulers_lock:
+        scheduler = _schedulers.get(fingerprint)
+        if scheduler is None:
+            scheduler = RateLimitScheduler()
+            _schedulers[fingerprint] = scheduler
+        return scheduler
+
+
+def get_scheduler_stats():
+    with _schedulers_lock:
+        schedulers = list(_schedulers.values())
+    stats = {"schedulers": len(schedulers), "waiting": 0, "rate_limited": 0}
+    for scheduler in schedulers:
+        scheduler_stats = scheduler.stats()
+        stats["waiting"] += scheduler_stats["waiting"]
+        stats["rate_limited"] += scheduler_stats["rate_limited"]
+    return stats
@@ -0,0 +1,229 @@
+from collections import deque
+from dotenv import load_dotenv
+import os
+import queue
+import threading
+import time
+
+load_dotenv()
+
+# Wall-clock deadline of one completion attempt
+LLM_CALL_TIMEOUT_SECONDS = float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", "60"))
+# Wall-clock budget of one call across its queueing, attempts, hedges and
+# backoff; no retry starts once it is spent
+LLM_CALL_BUDGET_SECONDS = float(os.getenv("LLM_CALL_BUDGET_SECONDS", "120"))
+# Send a duplicate request for calls slower than the recent latency percentile
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+# Until enough latencies are recorded the initial delay is used
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_INITIAL_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_INITIAL_DELAY_SECONDS", "20"))
+LLM_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "1"))
+# Consecutive failures that open the circuit, and how long it stays open
+LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+LLM_CIRCUIT_RESET_SECONDS = float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30"))
+
+_LATENCY_WINDOW = 200
+
+
+class DeadlineExceededError(Exception):
+    """No attempt of a completion finished within LLM_CALL_TIMEOUT_SECONDS"""
+
+
+class CircuitOpenError(Exception):
+    """The model's backend is failing; calls are rejected until it recovers"""
+
+
+class LatencyTracker:
+    """Sliding window of recent successful completion latencies"""
+
+    def __init__(self, window=_LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct):
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def hedge_delay(self):
+        """Seconds to wait before hedging, derived from the recent tail latency"""
+        with self._lock:
+            samples = len(self._samples)
+        if samples < LLM_HEDGE_MIN_SAMPLES:
+            return LLM_HEDGE_INITIAL_DELAY_SECONDS
+        return max(LLM_HEDGE_MIN_DELAY_SECONDS, self.percentile(LLM_HEDGE_PERCENTILE))
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after failure_threshold consecutive failures; open rejects
+    every call for reset_seconds, then half-open lets one probe through whose
+    outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=LLM_CIRCUIT_FAILURE_THRESHOLD, reset_seconds=LLM_CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may be sent now"""
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self._state = "half_open"
+                self._probe_in_flight = False
+            if self._state == "closed":
+                return
+            if self._state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+        raise CircuitOpenError(f"LLM backend circuit is open, retry in {retry_in:.0f}s")
+
+    def abandon(self):
+        """The admitted call was never sent; let another probe through"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self.times_opened += 1
+                    print(f"LLM circuit opened after {self._failures} consecutive failures")
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            return {"state": self._state, "consecutive_failures": self._failures,
+                    "times_opened": self.times_opened, "rejected": self.rejected}
+
+
+_hedge_stats = {"hedges_sent": 0, "hedge_wins": 0, "deadlines_exceeded": 0}
+_hedge_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _hedge_stats_lock:
+        _hedge_stats[name] += 1
+
+
+def run_hedged(send, hedge_delay=None, deadline=None, before_hedge=None):
+    """
+    Call send() in a worker thread and return its result within deadline.
+
+    If no reply has arrived after hedge_delay seconds, send() is called a
+    second time (after before_hedge(), if given) and whichever attempt
+    succeeds first wins; the slower one is left to finish in the background
+    and its result is dropped. A failure of the first attempt before the
+    hedge is sent is raised straight away so the caller's retry policy applies.
+    Everything send() does, such as reading a streamed reply, counts against
+    the deadline; an attempt that misses it is not interrupted, so send()
+    should stop on its own once the caller gives up on it.
+
+    Raises:
+        DeadlineExceededError: If no attempt succeeded within deadline seconds
+    """
+    deadline = deadline or LLM_CALL_TIMEOUT_SECONDS
+    results = queue.Queue()
+
+    def attempt(is_hedge):
+        try:
+            if is_hedge and before_hedge is not None:
+                before_hedge()
+            results.put((True, send(), is_hedge))
+        except Exception as e:
+            results.put((False, e, is_hedge))
+
+    started = time.monotonic()
+    threading.Thread(target=attempt, args=(False,), daemon=True).start()
+    pending = 1
+    hedged = hedge_delay is None
+    error = None
+    while pending:
+        elapsed = time.monotonic() - started
+        wait = (deadline if hedged else min(hedge_delay, deadline)) - elapsed
+        try:
+            ok, value, is_hedge = results.get(timeout=max(wait, 0.0))
+        except queue.Empty:
+            if not hedged and time.monotonic() - started < deadline:
+                hedged = True
+                pending += 1
+                _count("hedges_sent")
+                threading.Thread(target=attempt, args=(True,), daemon=True).start()
+                continue
+            _count("deadlines_exceeded")
+            raise DeadlineExceededError(f"LLM call exceeded its {deadline:g}s deadline")
+        pending -= 1
+        if ok:
+            if is_hedge:
+                _count("hedge_wins")
+            return value
+        error = value
+        if not hedged:
+            raise error
+    raise error
+
+
+_trackers = {}
+_breakers = {}
+_registry_lock = threading.Lock()
+
+
+def get_latency_tracker(model):
+    with _registry_lock:
+        if model not in _trackers:
+            _trackers[model] = LatencyTracker()
+        return _trackers[model]
+
+
+def get_circuit_breaker(model):
+    """Return the circuit breaker of a model; backends degrade per model"""
+    with _registry_lock:
+        if model not in _breakers:
+            _breakers[model] = CircuitBreaker()
+        return _breakers[model]
+
+
+def get_resilience_stats():
+    with _hedge_stats_lock:
+        stats = dict(_hedge_stats)
+    with _registry_lock:
+        trackers = dict(_trackers)
+        breakers = dict(_breakers)
+    stats["hedge_enabled"] = LLM_HEDGE_ENABLED
+    stats["call_timeout_seconds"] = LLM_CALL_TIMEOUT_SECONDS
+    stats["call_budget_seconds"] = LLM_CALL_BUDGET_SECONDS
+    stats["models"] = {}
+    for model in set(trackers) | set(breakers):
+        model_stats = breakers[model].stats() if model in breakers else {}
+        if model in trackers:
+            p95 = trackers[model].percentile(95)
+            model_stats["p95_seconds"] = round(p95, 3) if p95 is not None else None
+            model_stats["hedge_delay_seconds"] = round(trackers[model].hedge_delay(), 3)
+        stats["models"][model] = model_stats
+    return stats
@@ -0,0 +1,151 @@
+from services.token_utils import count_tokens
+from dotenv import load_dotenv
+import os
+import re
+
+load_dotenv()
+
+RESUME_COMPACTION_ENABLED = os.getenv("RESUME_COMPACTION_ENABLED", "true").lower() in ("1", "true", "yes")
+# Upper bound on resume tokens sent in any prompt
+RESUME_MAX_TOKENS = int(os.getenv("RESUME_MAX_TOKENS", "3000"))
+
+SECTION_HEADINGS = {
+    "summary", "profile", "objective", "professional summary", "about me",
+    "experience", "work experience", "professional experience", "employment history", "work history",
+    "education", "academic background", "qualifications",
+    "skills", "technical skills", "core competencies", "key skills",
+    "projects", "key projects", "certifications", "certificates", "licenses",
+    "achievements", "awards", "publications", "languages", "interests", "hobbies",
+    "volunteer experience", "references", "training", "courses"
+}
+# Sections that keep their full share of the budget when trimming
+PRIORITY_SECTIONS = ("experience", "skills", "education", "summary", "profile", "qualifications")
+
+_PAGE_ARTEFACT_PATTERNS = [
+    re.compile(r"^page\s*\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE),
+    re.compile(r"^-?\s*\d{1,3}\s*-?$"),
+    re.compile(r"^\d+\s*/\s*\d+$"),
+]
+_SPACES = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+_BULLETS = re.compile(r"^[\u2022\u25cf\u25aa\u25a0\u2023\u2043\u25e6\u00b7*-]+\s+")
+# "Page 2", "page 3 of 5": the numbering of a page header/footer
+_PAGE_NUMBER = re.compile(r"\bpage\s*\d+(\s*(of|/)\s*\d+)?", re.IGNORECASE)
+# Longer lines are content, even when they mention a page
+_HEADER_MAX_CHARS = 80
+
+
+def _normalize_line(line):
+    line = _SPACES.sub(" ", line).strip()
+    return _BULLETS.sub("- ", line)
+
+
+def _line_key(line):
+    key = line.lower()
+    # Page headers/footers such as "Jane Doe - Page 2" differ only by the
+    # number; any other line must repeat exactly to count as a duplicate
+    if len(line) <= _HEADER_MAX_CHARS:
+        key = _PAGE_NUMBER.sub("page #", key)
+    return key
+
+
+def _is_page_artefact(line):
+    return any(pattern.match(line) for pattern in _PAGE_ARTEFACT_PATTERNS)
+
+
+def _section_name(line):
+    heading = line.strip(" :-").lower()
+    if heading in SECTION_HEADINGS:
+        return heading
+    return None
+
+
+def _split_sections(lines):
+    sections = [["", []]]
+    for line in lines:
+        name = _section_name(line)
+        if name is not None:
+            sections.append([name, [line]])
+        else:
+            sections[-1][1].append(line)
+    return [(name, body) for name, body in sections if body]
+
+
+def _trim_sections(lines, max_tokens):
+    sections = _split_sections(lines)
+    weights = [2.0 if any(p in name for p in PRIORITY_SECTIONS) else 1.0 for name, _ in sections]
+    line_tokens = [[count_tokens(line) + 1 for line in body] for _, body in sections]
+    section_tokens = [sum(tokens) for tokens in line_tokens]
+
+    # Sections that fit into their weighted share keep everything; the slack
+    # is handed to the sections that need more
+    budgets = [0] * len(sections)
+    remaining = list(range(len(sections)))
+    budget_left = max_tokens
+    while remaining:
+        total_weight = sum(weights[i] for i in remaining)
+        fitting = [i for i in remaining if section_tokens[i] <= budget_left * weights[i] / total_weight]
+        if not fitting:
+            for i in remaining:
+                budgets[i] = int(budget_left * weights[i] / total_weight)
+            break
+        for i in fitting:
+            budgets[i] = section_tokens[i]
+            budget_left -= section_tokens[i]
+            remaining.remove(i)
+
+    trimmed = []
+    for (_, body), tokens, budget in zip(sections, line_tokens, budgets):
+        used = 0
+        for line, cost in zip(body, tokens):
+            if used + cost > budget:
+                break
+            trimmed.append(line)
+            used += cost
+    return trimmed
+
+
+def compact_resume_text(text, max_tokens=None):
+    """
+    Shrink extracted resume text before it is sent to the LLM.
+
+    Normalises whitespace, drops page numbers and all but the first copy of
+    repeated page headers/footers and duplicate lines, and trims sections to
+    fit max_tokens (defaults to RESUME_MAX_TOKENS).
+
+    Returns:
+        (compacted_text, stats) where stats reports the input-token saving
+    """
+    max_tokens = max_tokens or RESUME_MAX_TOKENS
+    original_tokens = count_tokens(text)
+
+    lines = [_normalize_line(line) for line in (text or "").splitlines()]
+
+    compacted = []
+    seen = set()
+    for line in lines:
+        if not line:
+            # Keep single blank lines as paragraph separators
+            if compacted and compacted[-1]:
+                compacted.append("")
+            continue
+        if _is_page_artefact(line):
+            continue
+        key = _line_key(line)
+        if key in seen:
+            continue
+        seen.add(key)
+        compacted.append(line)
+
+    if count_tokens("\n".join(compacted)) > max_tokens:
+        compacted = _trim_sections(compacted, max_tokens)
+
+    compacted_text = "\n".join(compacted).strip()
+    compacted_tokens = count_tokens(compacted_text)
+    saved_tokens = max(original_tokens - compacted_tokens, 0)
+    stats = {
+        "original_tokens": original_tokens,
+        "compacted_tokens": compacted_tokens,
+        "saved_tokens": saved_tokens,
+        "saved_percent": round(100.0 * saved_tokens / original_tokens, 1) if original_tokens else 0.0
+    }
+    return compacted_text, stats
@@ -0,0 +1,158 @@
+import json
+
+# JSON schemas of the LLM replies. Each entry carries the name and schema in
+# the shape the chat completions json_schema response format expects; every
+# object lists all of its properties as required, as strict mode demands.
+
+
+def _object(properties):
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False
+    }
+
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+_PERCENTAGE = {"type": "number", "minimum": 0, "maximum": 100}
+
+_MATCH_PROPERTIES = {
+    "overall_match_percentage": _PERCENTAGE,
+    "skills_match_percentage": _PERCENTAGE,
+    "experience_match_percentage": _PERCENTAGE,
+    "education_match_percentage": _PERCENTAGE,
+    "detailed_analysis": _object({
+        "strengths": _STRING_LIST,
+        "weaknesses": _STRING_LIST,
+        "recommendations": _STRING_LIST
+    }),
+    "key_matches": _STRING_LIST,
+    "missing_requirements": _STRING_LIST
+}
+
+_SKILL_QUALITATIVE_PROPERTIES = {
+    "skill_gaps": _object({
+        "high_priority": _STRING_LIST,
+        "medium_priority": _STRING_LIST,
+        "low_priority": _STRING_LIST
+    }),
+    "skill_analysis": _object({
+        "technical_skills_match": _PERCENTAGE,
+        "soft_skills_match": _PERCENTAGE,
+        "domain_knowledge_match": _PERCENTAGE
+    }),
+    "recommendations": _STRING_LIST
+}
+
+_SKILLS = _object(dict({
+    "matched_skills": _object({
+        "must_have": _STRING_LIST,
+        "nice_to_have": _STRING_LIST,
+        "additional": _STRING_LIST
+    }),
+    "missing_skills": _object({
+        "critical": _STRING_LIST,
+        "important": _STRING_LIST,
+        "optional": _STRING_LIST
+    })
+}, **_SKILL_QUALITATIVE_PROPERTIES))
+
+MATCH_ANALYSIS_SCHEMA = {"name": "match_analysis", "schema": _object(_MATCH_PROPERTIES)}
+
+SKILLS_ANALYSIS_SCHEMA = {"name": "skills_analysis", "schema": _SKILLS}
+
+# Hybrid skills mode: matched/missing skills come from the local matcher
+SKILLS_QUALITATIVE_SCHEMA = {"name": "skills_qualitative", "schema": _object(_SKILL_QUALITATIVE_PROPERTIES)}
+
+FUSED_ANALYSIS_SCHEMA = {
+    "name": "match_and_skills_analysis",
+    "schema": _object({
+        "match_analysis": _object(_MATCH_PROPERTIES),
+        "skills_analysis": _SKILLS
+    })
+}
+
+PACKED_MATCH_SCHEMA = {
+    "name": "packed_match_analysis",
+    "schema": _object({
+        "results": {"type": "array", "items": _object(dict({"id": {"type": "string"}}, **_MATCH_PROPERTIES))}
+    })
+}
+
+PRESCREEN_SCHEMA = {
+    "name": "prescreen",
+    "schema": _object({
+        "overall_match_percentage": _PERCENTAGE,
+        "reason": {"type": "string"}
+    })
+}
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+    "null": type(None)
+}
+
+
+def validate(instance, schema, path="$"):
+    """
+    Check a parsed reply against a JSON schema.
+
+    Supports the subset used by the schemas above (type, properties, required,
+    items, enum, minimum, maximum). Extra properties are tolerated so models
+    without strict structured output are not sent back for harmless additions.
+
+    Returns:
+        List of error messages, empty when the instance is valid
+    """
+    expected = schema.get("type")
+    if expected is not None:
+        python_type = _TYPES[expected]
+        # bool is a subclass of int but never a valid number
+        if not isinstance(instance, python_type) or (expected in ("number", "integer") and isinstance(instance, bool)):
+            return [f"{path}: expected {expected}, got {type(instance).__name__}"]
+
+    errors = []
+    if "enum" in schema and instance not in schema["enum"]:
+        errors.append(f"{path}: must be one of {schema['enum']}")
+    if "minimum" in schema and instance < schema["minimum"]:
+        errors.append(f"{path}: must be >= {schema['minimum']}")
+    if "maximum" in schema and instance > schema["maximum"]:
+        errors.append(f"{path}: must be <= {schema['maximum']}")
+
+    if isinstance(instance, dict):
+        for key in schema.get("required", []):
+            if key not in instance:
+                errors.append(f"{path}: missing required property '{key}'")
+        for key, subschema in schema.get("properties", {}).items():
+            if key in instance:
+                errors.extend(validate(instance[key], subschema, f"{path}.{key}"))
+    elif isinstance(instance, list) and "items" in schema:
+        for index, item in enumerate(instance):
+            errors.extend(validate(item, schema["items"], f"{path}[{index}]"))
+    return errors
+
+
+def parse_json(text):
+    """
+    Parse a JSON reply, falling back to the outermost {...} when the model
+    wrapped it in prose or a code fence.
+
+    Raises:
+        ValueError: If no JSON object can be parsed
+    """
+    if not text:
+        raise ValueError("Empty response")
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        start = text.find('{')
+        end = text.rfind('}') + 1
+        if start == -1 or end == 0:
+            raise ValueError("No JSON object in response")
+        return json.loads(text[start:end])
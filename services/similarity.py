@@ -0,0 +1,121 @@
+from services.prefilter import tokenize
+from scipy import sparse
+from array import array
+from dotenv import load_dotenv
+import numpy as np
+import os
+import zlib
+
+load_dotenv()
+
+# Width of the hashed feature space; collisions are rare below ~1M distinct terms
+SIMILARITY_N_FEATURES = int(os.getenv("SIMILARITY_N_FEATURES", str(2 ** 20)))
+# Longest word n-gram hashed into the vectors (1 = words only, 2 = words and bigrams)
+SIMILARITY_NGRAM_MAX = int(os.getenv("SIMILARITY_NGRAM_MAX", "2"))
+
+
+def _features(text, ngram_max, n_features):
+    """Hashed feature indices of every word n-gram of a text"""
+    tokens = tokenize(text)
+    grams = list(tokens)
+    for n in range(2, ngram_max + 1):
+        grams.extend(" ".join(tokens[start:start + n]) for start in range(len(tokens) - n + 1))
+    return [zlib.crc32(gram.encode("utf-8")) % n_features for gram in grams]
+
+
+class SimilarityEngine:
+    """
+    Hashed TF-IDF vectors of a resume pool, scored with one sparse product.
+
+    fit() vectorises every resume once into an L2-normalised CSR matrix.
+    rank() turns a job description into a vector of the same space and
+    scores the whole pool with a single matrix-vector product, so a JD is
+    ranked against 50k resumes in well under a second.
+    """
+
+    def __init__(self, n_features=None, ngram_max=None):
+        self.n_features = n_features or SIMILARITY_N_FEATURES
+        self.ngram_max = ngram_max or SIMILARITY_NGRAM_MAX
+        self.doc_ids = []
+        self._matrix = None
+        self._idf = None
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def fit(self, documents):
+        """
+        Vectorise a pool of resumes, replacing any earlier one.
+
+        Args:
+            documents: Mapping of resume id (e.g. filename) to text
+        """
+        # Feature indices go straight into a compact int array; a list of
+        # Python ints would take ~8x the memory on large pools
+        cols = array("i")
+        indptr = [0]
+        self.doc_ids = list(documents)
+        for doc_id in self.doc_ids:
+            cols.extend(_features(documents[doc_id], self.ngram_max, self.n_features))
+            indptr.append(len(cols))
+
+        indices = np.frombuffer(cols, dtype=np.int32) if cols else np.zeros(0, dtype=np.int32)
+        counts = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), indices, np.asarray(indptr, dtype=np.int64)),
+            shape=(len(self.doc_ids), self.n_features)
+        )
+        counts.sum_duplicates()
+
+        # Smoothed IDF and sublinear TF, as in the usual TF-IDF weighting
+        df = np.bincount(counts.indices, minlength=self.n_features)
+        self._idf = (np.log((1 + len(self.doc_ids)) / (1 + df)) + 1).astype(np.float32)
+        counts.data = (1 + np.log(counts.data)) * self._idf[counts.indices]
+        self._matrix = _normalize_rows(counts)
+        return self
+
+    def vectorize(self, text):
+        """L2-normalised dense TF-IDF vector of a query in the fitted space"""
+        if self._idf is None:
+            raise ValueError("SimilarityEngine.fit() must be called before scoring")
+        indices, counts = np.unique(np.asarray(_features(text, self.ngram_max, self.n_features), dtype=np.int64),
+                                    return_counts=True)
+        vector = np.zeros(self.n_features, dtype=np.float32)
+        vector[indices] = (1 + np.log(counts)) * self._idf[indices]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def scores(self, query):
+        """Cosine similarity of the query with every resume, in doc_ids order"""
+        return self._matrix @ self.vectorize(query)
+
+    def rank(self, query, top_k=None):
+        """
+        Rank the pool against a job description.
+
+        Args:
+            query: Job description text
+            top_k: Number of best resumes to return (all when None)
+
+        Returns:
+            List of (resume id, cosine similarity) pairs, best first
+        """
+        if not self.doc_ids:
+            return []
+        scores = self.scores(query)
+        if top_k is not None and 0 < top_k < len(scores):
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(self.doc_ids[i], float(scores[i])) for i in best]
+
+
+def _normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags((1 / norms).astype(np.float32)).dot(matrix).tocsr()
+
+
+def rank_resumes(resumes, jd, top_k=None):
+    """Fit an engine on a mapping of filename to text and rank it against a JD"""
+    return SimilarityEngine().fit(resumes).rank(jd, top_k)
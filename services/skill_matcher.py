@@ -0,0 +1,225 @@
+from collections import deque
+from functools import lru_cache
+import re
+
+# Spellings that name the same skill. Requested skills match any spelling of
+# their group, and groups nobody asked for fill "additional". Ambiguous short
+# words (go, rest, node) are not listed as spellings so prose does not count
+# as a skill unless the job asks for it by that name.
+SKILL_ALIASES = {
+    "JavaScript": ["javascript", "js", "ecmascript", "es6"],
+    "TypeScript": ["typescript", "ts"],
+    "Node.js": ["node.js", "nodejs"],
+    "React": ["react", "react.js", "reactjs"],
+    "Angular": ["angular", "angularjs"],
+    "Vue.js": ["vue", "vue.js", "vuejs"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3"],
+    "Java": ["java"],
+    "Spring Boot": ["spring boot", "springboot", "spring-boot"],
+    "Python": ["python"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi"],
+    "Go": ["golang"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp", "c sharp"],
+    ".NET": [".net", "dotnet"],
+    "SQL": ["sql"],
+    "PostgreSQL": ["postgresql", "postgres", "psql"],
+    "MySQL": ["mysql"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "Elasticsearch": ["elasticsearch", "elastic search"],
+    "Kafka": ["kafka", "apache kafka"],
+    "Spark": ["spark", "apache spark", "pyspark"],
+    "GraphQL": ["graphql"],
+    "REST APIs": ["rest api", "rest apis", "restful"],
+    "Microservices": ["microservices", "microservice"],
+    "AWS": ["aws", "amazon web services"],
+    "Azure": ["azure", "microsoft azure"],
+    "Google Cloud": ["gcp", "google cloud", "google cloud platform"],
+    "Docker": ["docker"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "Terraform": ["terraform"],
+    "Ansible": ["ansible"],
+    "Jenkins": ["jenkins"],
+    "CI/CD": ["ci/cd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "Git": ["git"],
+    "Linux": ["linux"],
+    "Machine Learning": ["machine learning", "ml"],
+    "NLP": ["nlp", "natural language processing"],
+    "TensorFlow": ["tensorflow"],
+    "PyTorch": ["pytorch"],
+    "scikit-learn": ["scikit-learn", "sklearn", "scikit learn"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "Tableau": ["tableau"],
+    "Power BI": ["power bi", "powerbi"],
+    "Agile": ["agile"],
+    "Scrum": ["scrum"]
+}
+
+MUST_HAVE = "must_have"
+NICE_TO_HAVE = "nice_to_have"
+ADDITIONAL = "additional"
+
+_SPACES = re.compile(r"\s+")
+# Requirement markers people add to skill lists, e.g. "Java (required)"
+_SKILL_NOTE = re.compile(r"\((required|preferred|optional|must|nice to have)\)", re.IGNORECASE)
+
+
+def _normalize(text):
+    return _SPACES.sub(" ", (text or "").lower())
+
+
+def _is_word_char(ch):
+    # "+" and "#" belong to skill names, so "c" does not match inside "c++"
+    return ch.isalnum() or ch in "+#_"
+
+
+def _starts_word(text, start):
+    if start == 0:
+        return True
+    if _is_word_char(text[start - 1]):
+        return False
+    # A dotted suffix is part of the name before it: "js" of "D3.js" is not JavaScript
+    return not (text[start - 1] == "." and start >= 2 and _is_word_char(text[start - 2]))
+
+
+class AhoCorasick:
+    """
+    Multi-pattern automaton that finds every pattern in one pass over a text.
+
+    Patterns are matched on whole words only: a hit must not be preceded or
+    followed by a letter, digit, "+", "#" or "_", nor follow a "." that ends
+    a word.
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+    def add(self, pattern, value):
+        state = 0
+        for ch in pattern:
+            if ch not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][ch] = len(self._goto) - 1
+            state = self._goto[state][ch]
+        self._output[state].append((len(pattern), value))
+
+    def build(self):
+        """Compute the failure links; call once after the last add()"""
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for ch, child in self._goto[state].items():
+                pending.append(child)
+                if state:
+                    fallback = self._fail[state]
+                    while fallback and ch not in self._goto[fallback]:
+                        fallback = self._fail[fallback]
+                    self._fail[child] = self._goto[fallback].get(ch, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+        return self
+
+    def find(self, text):
+        """Yield (start, end, value) of every whole-word match"""
+        state = 0
+        for end, ch in enumerate(text, 1):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for length, value in self._output[state]:
+                start = end - length
+                if _starts_word(text, start) and (end == len(text) or not _is_word_char(text[end])):
+                    yield start, end, value
+
+
+def parse_skills(skills):
+    """Split a comma, semicolon or newline separated form field into skill names"""
+    names = []
+    for skill in re.split(r"[,;\n]", skills or ""):
+        skill = _SPACES.sub(" ", _SKILL_NOTE.sub("", skill)).strip()
+        if skill and skill.lower() not in (name.lower() for name in names):
+            names.append(skill)
+    return names
+
+
+def _alias_index():
+    index = {}
+    for canonical, aliases in SKILL_ALIASES.items():
+        for spelling in [canonical] + aliases:
+            index[_normalize(spelling)] = canonical
+    return index
+
+
+_ALIAS_INDEX = _alias_index()
+
+
+class SkillMatcher:
+    """Compiled must-have/nice-to-have skill lists of one job description"""
+
+    def __init__(self, must_have_skills=None, nice_to_have_skills=None):
+        self.must_have = parse_skills(must_have_skills)
+        self.nice_to_have = [skill for skill in parse_skills(nice_to_have_skills)
+                             if skill.lower() not in (name.lower() for name in self.must_have)]
+        self._automaton = AhoCorasick()
+
+        requested = set()
+        for category, skills in ((MUST_HAVE, self.must_have), (NICE_TO_HAVE, self.nice_to_have)):
+            for skill in skills:
+                canonical = _ALIAS_INDEX.get(_normalize(skill))
+                spellings = {_normalize(skill)}
+                if canonical is not None:
+                    requested.add(canonical)
+                    spellings.update(_normalize(alias) for alias in SKILL_ALIASES[canonical])
+                for spelling in spellings:
+                    self._automaton.add(spelling, (category, skill))
+
+        for canonical, aliases in SKILL_ALIASES.items():
+            if canonical not in requested:
+                for spelling in {_normalize(alias) for alias in aliases}:
+                    self._automaton.add(spelling, (ADDITIONAL, canonical))
+        self._automaton.build()
+
+    def match(self, resume):
+        """
+        Scan a resume once and sort the requested skills into found and missing.
+
+        Returns:
+            dict with "matched_skills" (must_have, nice_to_have, additional)
+            and "missing_skills" (critical = must-have, important =
+            nice-to-have, optional), in the shape analyze_skills returns
+        """
+        found = {MUST_HAVE: set(), NICE_TO_HAVE: set(), ADDITIONAL: set()}
+        for _, _, (category, skill) in self._automaton.find(_normalize(resume)):
+            found[category].add(skill)
+
+        return {
+            "matched_skills": {
+                MUST_HAVE: [skill for skill in self.must_have if skill in found[MUST_HAVE]],
+                NICE_TO_HAVE: [skill for skill in self.nice_to_have if skill in found[NICE_TO_HAVE]],
+                ADDITIONAL: sorted(found[ADDITIONAL], key=str.lower)
+            },
+            "missing_skills": {
+                "critical": [skill for skill in self.must_have if skill not in found[MUST_HAVE]],
+                "important": [skill for skill in self.nice_to_have if skill not in found[NICE_TO_HAVE]],
+                "optional": []
+            }
+        }
+
+
+@lru_cache(maxsize=64)
+def get_skill_matcher(must_have_skills, nice_to_have_skills):
+    """Compiled matcher for a pair of form fields, shared by a whole batch"""
+    return SkillMatcher(must_have_skills, nice_to_have_skills)
+
+
+def match_skills(resume, must_have_skills, nice_to_have_skills):
+    """matched_skills/missing_skills of a resume without an LLM call"""
+    return get_skill_matcher(must_have_skills or "", nice_to_have_skills or "").match(resume)
@@ -1,12 +1,113 @@
-from services.llm_utils import call_llm
-import json
+from services.llm_utils import call_llm_json
+from services.schemas import SKILLS_ANALYSIS_SCHEMA, SKILLS_QUALITATIVE_SCHEMA
+from services.skill_matcher import match_skills
+from dotenv import load_dotenv
+import os
 
-def analyze_skills(resume, jd):
+load_dotenv()
+
+# "llm" asks the model for the whole skills analysis, "local" matches the
+# form's skill lists against the resume without any LLM call, and "hybrid"
+# matches locally and asks the model only for gaps, scores and recommendations
+SKILLS_MODE = os.getenv("SKILLS_MODE", "llm").lower()
+SKILLS_MODES = ("llm", "local", "hybrid")
+
+
+def _local_skills_result(local):
+    """Full skills_analysis shape built from the local matcher alone"""
+    matched, missing = local["matched_skills"], local["missing_skills"]
+    requested = len(matched["must_have"]) + len(matched["nice_to_have"]) + \
+        len(missing["critical"]) + len(missing["important"])
+    found = len(matched["must_have"]) + len(matched["nice_to_have"])
+    return {
+        "matched_skills": matched,
+        "missing_skills": missing,
+        "skill_gaps": {"high_priority": missing["critical"], "medium_priority": missing["important"],
+                       "low_priority": []},
+        "skill_analysis": {"technical_skills_match": round(100 * found / requested) if requested else "N/A",
+                           "soft_skills_match": "N/A", "domain_knowledge_match": "N/A"},
+        "recommendations": [],
+        "skills_source": "local"
+    }
+
+
+def _hybrid_skills(resume, jd, local, use_cache=True, api_key=None):
+    """Local matched/missing skills plus the qualitative fields from the LLM"""
+    matched, missing = local["matched_skills"], local["missing_skills"]
     prompt = f"""
-    You are an expert skills analyst. Analyze the following resume against the job description and provide ONLY a valid JSON response.
+    You are an expert skills analyst. The skills requested by the job have already been matched against the resume. Assess the gaps and provide ONLY a valid JSON response.
+
+    JOB DESCRIPTION:
+    {jd}
+
+    IMPORTANT: Respond with ONLY valid JSON. No additional text before or after the JSON.
+
+    JSON STRUCTURE:
+    {{
+        "skill_gaps": {{
+            "high_priority": ["high priority skills to learn"],
+            "medium_priority": ["medium priority skills to learn"],
+            "low_priority": ["low priority skills to learn"]
+        }},
+        "skill_analysis": {{
+            "technical_skills_match": <number 0-100>,
+            "soft_skills_match": <number 0-100>,
+            "domain_knowledge_match": <number 0-100>
+        }},
+        "recommendations": ["specific skill development recommendations"]
+    }}
+
+    FOUND IN RESUME: {', '.join(matched["must_have"] + matched["nice_to_have"] + matched["additional"]) or 'None'}
+    MISSING MUST-HAVE: {', '.join(missing["critical"]) or 'None'}
+    MISSING NICE-TO-HAVE: {', '.join(missing["important"]) or 'None'}
 
     RESUME:
     {resume}
+    """
+
+    parsed, response = call_llm_json(prompt, SKILLS_QUALITATIVE_SCHEMA, temperature=0.5, use_cache=use_cache,
+                                     api_key=api_key)
+    result = _local_skills_result(local)
+    result["skills_source"] = "hybrid"
+    if parsed is None:
+        result["error"] = "Could not parse response"
+        result["raw_response"] = response
+        return result
+    for key in ("skill_gaps", "skill_analysis", "recommendations"):
+        if key in parsed:
+            result[key] = parsed[key]
+    return result
+
+
+def analyze_skills(resume, jd, use_cache=True, api_key=None, must_have_skills=None, nice_to_have_skills=None,
+                   skills_mode=None):
+    """
+    Analyze the skills of a resume against a job description.
+
+    Args:
+        resume: Resume text content
+        jd: Job description text
+        use_cache: Set to False to bypass the LLM response cache
+        api_key: OpenAI API key of the caller (defaults to OPENAI_API_KEY)
+        must_have_skills: Comma separated must-have skills of the job form
+        nice_to_have_skills: Comma separated nice-to-have skills of the job form
+        skills_mode: "llm", "local" or "hybrid" (defaults to SKILLS_MODE)
+
+    Returns:
+        dict with matched_skills, missing_skills, skill_gaps, skill_analysis
+        and recommendations
+    """
+    skills_mode = (skills_mode or SKILLS_MODE).lower()
+    if skills_mode not in SKILLS_MODES:
+        raise ValueError(f"Unknown skills mode: {skills_mode}")
+    if skills_mode != "llm":
+        local = match_skills(resume, must_have_skills, nice_to_have_skills)
+        if skills_mode == "local":
+            return _local_skills_result(local)
+        return _hybrid_skills(resume, jd, local, use_cache=use_cache, api_key=api_key)
+
+    prompt = f"""
+    You are an expert skills analyst. Analyze the following resume against the job description and provide ONLY a valid JSON response.
 
     JOB DESCRIPTION:
     {jd}
@@ -45,33 +146,24 @@ def analyze_skills(resume, jd):
     4. Soft skills: Communication, leadership, problem-solving
     5. Domain knowledge: Industry-specific expertise
     6. Experience alignment: Years of experience vs requirements
+
+    RESUME:
+    {resume}
     """
     
-    response = call_llm(prompt, temperature=0.5)
-    
-    # Try to extract JSON from the response
-    try:
-        # First, try direct JSON parsing
-        return json.loads(response)
-    except json.JSONDecodeError:
-        # If that fails, try to extract JSON from the response
-        try:
-            # Look for JSON content between curly braces
-            start = response.find('{')
-            end = response.rfind('}') + 1
-            if start != -1 and end != 0:
-                json_str = response[start:end]
-                return json.loads(json_str)
-        except:
-            pass
-        
-        # If all else fails, return error with raw response
-        return {
-            "error": "Could not parse response", 
-            "raw_response": response,
-            "matched_skills": {"must_have": [], "nice_to_have": [], "additional": []},
-            "missing_skills": {"critical": [], "important": [], "optional": []},
-            "skill_gaps": {"high_priority": [], "medium_priority": [], "low_priority": []},
-            "skill_analysis": {"technical_skills_match": 0, "soft_skills_match": 0, "domain_knowledge_match": 0},
-            "recommendations": []
-        }
+    # Replies are validated against the schema and repaired once if malformed
+    parsed, response = call_llm_json(prompt, SKILLS_ANALYSIS_SCHEMA, temperature=0.5, use_cache=use_cache,
+                                     api_key=api_key)
+    if parsed is not None:
+        return parsed
+
+    # If all else fails, return error with raw response
+    return {
+        "error": "Could not parse response", 
+        "raw_response": response,
+        "matched_skills": {"must_have": [], "nice_to_have": [], "additional": []},
+        "missing_skills": {"critical": [], "important": [], "optional": []},
+        "skill_gaps": {"high_priority": [], "medium_priority": [], "low_priority": []},
+        "skill_analysis": {"technical_skills_match": 0, "soft_skills_match": 0, "domain_knowledge_match": 0},
+        "recommendations": []
+    }
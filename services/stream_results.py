@@ -0,0 +1,90 @@
+from dotenv import load_dotenv
+import json
+import os
+import sqlite3
+import threading
+import time
+
+load_dotenv()
+
+# Results of /analyze-stream jobs, kept on disk for the CSV/PDF downloads so
+# every worker process of the server can answer for any job
+STREAM_RESULTS_PATH = os.getenv("STREAM_RESULTS_PATH", os.path.join("cache", "stream_results.sqlite3"))
+STREAM_RESULTS_TTL_SECONDS = int(os.getenv("STREAM_RESULTS_TTL_SECONDS", str(24 * 3600)))
+
+RUNNING = "running"
+EXPIRED = "expired"
+
+
+class StreamResultStore:
+    """
+    SQLite store of streamed analysis results keyed by job id.
+
+    A job is registered as running when its stream starts and holds its
+    results once it completes. Jobs older than ``ttl_seconds`` are deleted.
+    """
+
+    def __init__(self, path=STREAM_RESULTS_PATH, ttl_seconds=STREAM_RESULTS_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        # Several server processes write to the same file
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS stream_results ("
+            "job_id TEXT PRIMARY KEY, results TEXT, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def start(self, job_id):
+        """Register a job whose results are not in yet"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM stream_results WHERE created_at < ?", (now - self.ttl_seconds,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO stream_results (job_id, results, created_at) VALUES (?, NULL, ?)",
+                (job_id, now)
+            )
+            self._conn.commit()
+
+    def finish(self, job_id, results):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO stream_results (job_id, results, created_at) VALUES (?, ?, ?)",
+                (job_id, json.dumps(results, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+
+    def get(self, job_id):
+        """
+        Results of a job.
+
+        Returns:
+            The list of results, RUNNING while the stream is still going, or
+            EXPIRED when the job is unknown or older than the TTL
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, created_at FROM stream_results WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return EXPIRED
+        return RUNNING if row[0] is None else json.loads(row[0])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_stream_result_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = StreamResultStore()
+    return _store
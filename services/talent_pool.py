@@ -0,0 +1,303 @@
+from services.prefilter import tokenize, build_query, bm25_idf, bm25_weight
+from services.skill_matcher import match_skills
+from services.dedup import get_minhasher, band_keys, similarity, DEDUP_THRESHOLD
+from collections import Counter
+from dotenv import load_dotenv
+import numpy as np
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+load_dotenv()
+
+# Keep the extracted text of every analyzed resume so new job descriptions
+# can be matched against the whole pool without re-uploading anything. Resumes
+# hold personal data, so storing them is opt-in
+TALENT_POOL_ENABLED = os.getenv("TALENT_POOL_ENABLED", "false").lower() in ("1", "true", "yes")
+TALENT_POOL_PATH = os.getenv("TALENT_POOL_PATH", os.path.join("cache", "talent_pool.sqlite3"))
+# Default number of pool resumes returned by a search or sent to /analyze
+TALENT_POOL_TOP_K = int(os.getenv("TALENT_POOL_TOP_K", "20"))
+# Token the /talent-pool search and delete endpoints require in the
+# X-Admin-Token header; without one they are disabled
+TALENT_POOL_ADMIN_TOKEN = os.getenv("TALENT_POOL_ADMIN_TOKEN", "")
+
+_SPACES = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+
+
+def normalize_resume_text(text):
+    """Collapse runs of spaces and blank lines so re-extracted copies hash alike"""
+    lines = (_SPACES.sub(" ", line).strip() for line in (text or "").splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def content_hash(text):
+    return hashlib.sha256(normalize_resume_text(text).encode("utf-8")).hexdigest()
+
+
+def extract_metadata(text):
+    """Known skills found in a resume; contact details are not copied out of the text"""
+    return {
+        "skills": match_skills(text, "", "")["matched_skills"]["additional"],
+        "characters": len(text)
+    }
+
+
+class TalentPool:
+    """
+    SQLite store of resume texts with an inverted index for BM25 search.
+
+    Every resume is stored once per normalised content hash. Adding or
+    removing a resume touches only that resume's row and postings, and the
+    pool-wide document count and total length are kept as running totals, so
+    index maintenance is O(document) whatever the size of the pool.
+    """
+
+    def __init__(self, path=TALENT_POOL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS resumes ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, content_hash TEXT NOT NULL UNIQUE, "
+            "filename TEXT NOT NULL, text TEXT NOT NULL, length INTEGER NOT NULL, "
+            "metadata TEXT NOT NULL, added_at REAL NOT NULL, last_seen_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS postings ("
+            "term TEXT NOT NULL, resume_id INTEGER NOT NULL, tf INTEGER NOT NULL, "
+            "PRIMARY KEY (term, resume_id)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS idx_postings_resume ON postings (resume_id);"
+            "CREATE TABLE IF NOT EXISTS signatures (resume_id INTEGER PRIMARY KEY, signature BLOB NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS lsh_buckets ("
+            "band INTEGER NOT NULL, bucket BLOB NOT NULL, resume_id INTEGER NOT NULL, "
+            "PRIMARY KEY (band, bucket, resume_id)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS idx_lsh_buckets_resume ON lsh_buckets (resume_id);"
+            "CREATE TABLE IF NOT EXISTS pool_totals (name TEXT PRIMARY KEY, value INTEGER NOT NULL);"
+            "INSERT OR IGNORE INTO pool_totals VALUES ('documents', 0), ('length', 0);"
+        )
+        self._conn.commit()
+
+    def _totals(self):
+        return dict(self._conn.execute("SELECT name, value FROM pool_totals").fetchall())
+
+    def _bump_totals(self, documents, length):
+        self._conn.execute("UPDATE pool_totals SET value = value + ? WHERE name = 'documents'", (documents,))
+        self._conn.execute("UPDATE pool_totals SET value = value + ? WHERE name = 'length'", (length,))
+
+    def add(self, filename, text, metadata=None):
+        """
+        Store a resume and index its terms.
+
+        Returns:
+            (resume id, True if it was new, False if the same text was already
+            in the pool)
+        """
+        return self.add_many([(filename, text, metadata)])[0]
+
+    def add_many(self, resumes):
+        """
+        Store several resumes in one transaction.
+
+        Args:
+            resumes: Iterable of (filename, text) or (filename, text, metadata)
+
+        Returns:
+            List of (resume id, is_new) in input order
+        """
+        prepared = []
+        for item in resumes:
+            filename, text = item[0], normalize_resume_text(item[1])
+            metadata = item[2] if len(item) > 2 else None
+            prepared.append((filename, text, hashlib.sha256(text.encode("utf-8")).hexdigest(), metadata))
+
+        now = time.time()
+        added = []
+        with self._lock:
+            for filename, text, digest, metadata in prepared:
+                row = self._conn.execute("SELECT id FROM resumes WHERE content_hash = ?", (digest,)).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE resumes SET last_seen_at = ? WHERE id = ?", (now, row[0]))
+                    added.append((row[0], False))
+                    continue
+
+                terms = Counter(tokenize(text))
+                length = sum(terms.values())
+                metadata = metadata if metadata is not None else extract_metadata(text)
+                cursor = self._conn.execute(
+                    "INSERT INTO resumes (content_hash, filename, text, length, metadata, added_at, last_seen_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (digest, filename, text, length, json.dumps(metadata), now, now)
+                )
+                resume_id = cursor.lastrowid
+                self._conn.executemany("INSERT INTO postings (term, resume_id, tf) VALUES (?, ?, ?)",
+                                       ((term, resume_id, tf) for term, tf in terms.items()))
+                signature = get_minhasher().signature(text)
+                self._conn.execute("INSERT INTO signatures (resume_id, signature) VALUES (?, ?)",
+                                   (resume_id, signature.tobytes()))
+                self._conn.executemany("INSERT OR IGNORE INTO lsh_buckets (band, bucket, resume_id) VALUES (?, ?, ?)",
+                                       ((band, bucket, resume_id) for band, bucket in enumerate(band_keys(signature))))
+                self._bump_totals(1, length)
+                added.append((resume_id, True))
+            self._conn.commit()
+        return added
+
+    def remove(self, resume_id):
+        """Delete a resume and its postings; returns False if it was not in the pool"""
+        with self._lock:
+            row = self._conn.execute("SELECT length FROM resumes WHERE id = ?", (resume_id,)).fetchone()
+            if row is None:
+                return False
+            self._conn.execute("DELETE FROM postings WHERE resume_id = ?", (resume_id,))
+            self._conn.execute("DELETE FROM lsh_buckets WHERE resume_id = ?", (resume_id,))
+            self._conn.execute("DELETE FROM signatures WHERE resume_id = ?", (resume_id,))
+            self._conn.execute("DELETE FROM resumes WHERE id = ?", (resume_id,))
+            self._bump_totals(-1, -row[0])
+            self._conn.commit()
+            return True
+
+    def get(self, resume_id):
+        """Stored resume as a dict including its text, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, filename, content_hash, metadata, added_at, last_seen_at, text "
+                "FROM resumes WHERE id = ?", (resume_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        entry = self._entry(row[:6])
+        entry["text"] = row[6]
+        return entry
+
+    @staticmethod
+    def _entry(row):
+        resume_id, filename, digest, metadata, added_at, last_seen_at = row
+        return {"id": resume_id, "filename": filename, "content_hash": digest,
+                "metadata": json.loads(metadata), "added_at": added_at, "last_seen_at": last_seen_at}
+
+    def search(self, jd, must_have_skills=None, top_k=None):
+        """
+        Rank every stored resume against a job description with BM25.
+
+        Only the postings of the query terms are read, so the cost grows with
+        the number of resumes sharing a term with the JD, not the pool size.
+
+        Returns:
+            List of dicts with id, filename, content_hash, metadata, added_at,
+            last_seen_at, score, relevance (0-100, relative to the best match)
+            and rank, best first
+        """
+        top_k = TALENT_POOL_TOP_K if top_k is None else top_k
+        query = build_query(jd, must_have_skills)
+        scores = {}
+        with self._lock:
+            totals = self._totals()
+            if not totals["documents"]:
+                return []
+            average_length = totals["length"] / totals["documents"] or 1
+            for term, weight in query.items():
+                postings = self._conn.execute(
+                    "SELECT p.resume_id, p.tf, r.length FROM postings p JOIN resumes r ON r.id = p.resume_id "
+                    "WHERE p.term = ?", (term,)
+                ).fetchall()
+                if not postings:
+                    continue
+                idf = bm25_idf(totals["documents"], len(postings))
+                for resume_id, tf, length in postings:
+                    scores[resume_id] = scores.get(resume_id, 0.0) + \
+                        weight * idf * bm25_weight(tf, length, average_length)
+
+            ranked = sorted(scores, key=scores.get, reverse=True)
+            if top_k > 0:
+                ranked = ranked[:top_k]
+            rows = {}
+            for resume_id in ranked:
+                rows[resume_id] = self._conn.execute(
+                    "SELECT id, filename, content_hash, metadata, added_at, last_seen_at FROM resumes WHERE id = ?",
+                    (resume_id,)
+                ).fetchone()
+
+        best = scores[ranked[0]] if ranked else 0.0
+        results = []
+        for rank, resume_id in enumerate(ranked, 1):
+            entry = self._entry(rows[resume_id])
+            entry["score"] = round(scores[resume_id], 3)
+            entry["relevance"] = round(100 * scores[resume_id] / best, 1) if best > 0 else 0.0
+            entry["rank"] = rank
+            results.append(entry)
+        return results
+
+    def near_duplicates(self, text, threshold=None):
+        """
+        Stored resumes whose MinHash signature is near-identical to text's.
+
+        Returns:
+            List of dicts with id, filename, content_hash and similarity,
+            oldest first
+        """
+        threshold = DEDUP_THRESHOLD if threshold is None else threshold
+        signature = get_minhasher().signature(normalize_resume_text(text))
+        matches = []
+        with self._lock:
+            candidates = set()
+            for band, bucket in enumerate(band_keys(signature)):
+                candidates.update(row[0] for row in self._conn.execute(
+                    "SELECT resume_id FROM lsh_buckets WHERE band = ? AND bucket = ?", (band, bucket)
+                ))
+            for resume_id in sorted(candidates):
+                row = self._conn.execute(
+                    "SELECT r.filename, r.content_hash, s.signature FROM resumes r "
+                    "JOIN signatures s ON s.resume_id = r.id WHERE r.id = ?", (resume_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                score = similarity(signature, np.frombuffer(row[2], dtype=np.uint64))
+                if score >= threshold:
+                    matches.append({"id": resume_id, "filename": row[0], "content_hash": row[1],
+                                    "similarity": round(score, 3)})
+        return matches
+
+    def texts(self, resume_ids):
+        """Mapping of resume id to stored text; unknown ids are skipped"""
+        texts = {}
+        with self._lock:
+            for resume_id in resume_ids:
+                row = self._conn.execute("SELECT text FROM resumes WHERE id = ?", (resume_id,)).fetchone()
+                if row is not None:
+                    texts[resume_id] = row[0]
+        return texts
+
+    def stats(self):
+        with self._lock:
+            totals = self._totals()
+        return {
+            "enabled": True,
+            "resumes": totals["documents"],
+            "average_length": round(totals["length"] / totals["documents"], 1) if totals["documents"] else 0
+        }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_talent_pool():
+    """Return the process-wide talent pool, or None when it is disabled"""
+    global _pool
+    if not TALENT_POOL_ENABLED:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = TalentPool()
+    return _pool
+
+
+def get_talent_pool_stats():
+    pool = get_talent_pool()
+    return pool.stats() if pool is not None else {"enabled": False}
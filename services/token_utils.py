@@ -0,0 +1,74 @@
+from dotenv import load_dotenv
+import math
+import os
+import threading
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to the character heuristic
+    tiktoken = None
+
+load_dotenv()
+
+# Rough average for English prose with GPT tokenizers
+CHARS_PER_TOKEN = 4
+TOKENIZER_ENCODING = "cl100k_base"
+# How long startup waits for the tokenizer. tiktoken downloads its BPE file on
+# first use unless TIKTOKEN_CACHE_DIR already holds it; until it is loaded,
+# and for good if it cannot be, tokens are estimated from length
+TOKENIZER_LOAD_TIMEOUT_SECONDS = float(os.getenv("TOKENIZER_LOAD_TIMEOUT_SECONDS", "2"))
+
+_encoding = None
+_loader = None
+_loader_lock = threading.Lock()
+
+
+def _load():
+    global _encoding
+    try:
+        _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+    except Exception as e:
+        print(f"tiktoken unavailable, estimating tokens from length: {str(e)}")
+
+
+def load_encoding(timeout=TOKENIZER_LOAD_TIMEOUT_SECONDS):
+    """
+    Start loading the tokenizer in the background and wait up to timeout
+    seconds for it. Called at startup so no request waits on the download.
+
+    Returns:
+        True when the tokenizer is ready
+    """
+    global _loader
+    if tiktoken is None:
+        return False
+    with _loader_lock:
+        if _loader is None:
+            _loader = threading.Thread(target=_load, name="tokenizer-loader", daemon=True)
+            _loader.start()
+    _loader.join(timeout)
+    return _encoding is not None
+
+
+def _get_encoding():
+    """The tokenizer if it is loaded; never waits for it"""
+    if _encoding is None and _loader is None:
+        load_encoding(timeout=0)
+    return _encoding
+
+
+def estimate_tokens(text):
+    """Cheap upper-bound-ish estimate of the number of tokens in text"""
+    if not text:
+        return 0
+    return int(math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+def count_tokens(text):
+    """Exact token count with the local tokenizer, or estimate_tokens without it"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Test script for the cheap-model pre-screen of services/cascade.py
+
+The LLM call is patched out, so no server or API key is needed.
+Runs under pytest or on its own: python test_cascade.py
+"""
+
+from unittest import mock
+
+from services.cascade import prescreen_resume, select_shortlist
+
+
+def prescreen(score):
+    return {"overall_match_percentage": score, "reason": "", "model": "gpt-4o-mini"}
+
+
+def test_shortlist_top_k_and_min_score():
+    """Test that the top K and everything at or above min_score advance"""
+    print("Testing select_shortlist...")
+    prescreens = {"a.pdf": prescreen(95), "b.pdf": prescreen(40), "c.pdf": prescreen(80),
+                  "d.pdf": prescreen(60), "e.pdf": prescreen(75)}
+    assert select_shortlist(prescreens, top_k=2, min_score=75) == {"a.pdf", "c.pdf", "e.pdf"}
+    assert select_shortlist(prescreens, top_k=4, min_score=0) == {"a.pdf", "c.pdf", "e.pdf", "d.pdf"}
+    assert select_shortlist(prescreens, top_k=0, min_score=90) == {"a.pdf"}
+    assert select_shortlist(prescreens, top_k=0, min_score=0) == set()
+
+
+def test_unscored_resumes_advance():
+    """Test that a failed pre-screen never drops a resume"""
+    print("Testing unscored resumes...")
+    prescreens = {"a.pdf": prescreen(90), "broken.pdf": prescreen(None)}
+    assert select_shortlist(prescreens, top_k=1, min_score=100) == {"a.pdf", "broken.pdf"}
+
+
+def test_prescreen_parsing():
+    """Test that the reply is parsed once, without repair requests"""
+    print("Testing prescreen_resume...")
+    with mock.patch("services.cascade.call_llm_json") as call:
+        call.return_value = ({"overall_match_percentage": "72.6", "reason": "Strong Python"}, "{}")
+        result = prescreen_resume("resume", "jd", model="cheap-model")
+        assert result == {"overall_match_percentage": 73, "reason": "Strong Python", "model": "cheap-model"}
+        assert call.call_args.kwargs["repair_retries"] == 0
+        assert call.call_args.kwargs["model"] == "cheap-model"
+
+        call.return_value = (None, "not json")
+        result = prescreen_resume("resume", "jd")
+        assert result["overall_match_percentage"] is None
+        assert result["reason"] == "Could not parse pre-screen response"
+
+
+def main():
+    """Run all tests"""
+    print("Cascade Pre-screen Test Suite")
+    print("=" * 50)
+    test_shortlist_top_k_and_min_score()
+    test_unscored_resumes_advance()
+    test_prescreen_parsing()
+    print("All tests completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for near-duplicate clustering (services/dedup.py and the batch
+deduplication of services/batch_analysis.py)
+
+Clusters inline resume texts, so no server or API key is needed.
+Runs under pytest or on its own: python test_dedup.py
+"""
+
+import os
+import tempfile
+from unittest import mock
+
+from services.batch_analysis import _deduplicate
+from services.dedup import find_duplicate_groups, get_minhasher, similarity
+from services.talent_pool import TalentPool
+
+BASE = "\n".join(f"Delivered project {i} using Python, Kafka and PostgreSQL for the payments platform team"
+                 for i in range(40))
+EDITED = BASE.replace("project 7 ", "project seven ") + "\nReferences available on request"
+OTHER = "\n".join(f"Designed marketing campaign {i} for retail clients across Europe and Asia" for i in range(40))
+
+
+def test_similarity_estimate():
+    """Test that signatures estimate high similarity for edits and low for unrelated text"""
+    print("Testing MinHash similarity...")
+    hasher = get_minhasher()
+    assert similarity(hasher.signature(BASE), hasher.signature(BASE)) == 1.0
+    assert similarity(hasher.signature(BASE), hasher.signature(EDITED)) >= 0.9
+    assert similarity(hasher.signature(BASE), hasher.signature(OTHER)) < 0.1
+
+
+def test_clusters():
+    """Test that near-duplicates cluster in input order and distinct resumes stay alone"""
+    print("Testing LSH clustering...")
+    resumes = {"cv.pdf": BASE, "marketing.pdf": OTHER, "cv.docx": EDITED, "cv_copy.txt": BASE}
+    groups, signatures = find_duplicate_groups(resumes)
+    assert groups == [["cv.pdf", "cv.docx", "cv_copy.txt"]], groups
+    assert set(signatures) == set(resumes)
+
+
+def test_batch_deduplicate():
+    """Test that each cluster is analyzed once through its first member"""
+    print("Testing batch deduplication...")
+    resumes = {"cv.pdf": BASE, "marketing.pdf": OTHER, "cv.docx": EDITED}
+    with mock.patch("services.batch_analysis.get_talent_pool", return_value=None):
+        unique, groups = _deduplicate(resumes)
+    assert unique == {"cv.pdf": BASE, "marketing.pdf": OTHER}
+    assert groups == {"cv.pdf": {"representative": "cv.pdf", "members": ["cv.pdf", "cv.docx"], "id": 1, "size": 2}}
+
+
+def test_talent_pool_match_keeps_own_text():
+    """Test that a resume similar to an earlier pool resume is analyzed with its own text"""
+    print("Testing talent pool matches...")
+    with tempfile.TemporaryDirectory() as directory:
+        pool = TalentPool(path=os.path.join(directory, "talent_pool.sqlite3"))
+        earlier_id, _ = pool.add("cv_2025.pdf", BASE)
+        with mock.patch("services.batch_analysis.get_talent_pool", return_value=pool):
+            unique, groups = _deduplicate({"cv_2026.pdf": EDITED, "marketing.pdf": OTHER})
+            assert unique == {"cv_2026.pdf": EDITED, "marketing.pdf": OTHER}
+            match = groups["cv_2026.pdf"]["talent_pool_match"]
+            assert match["id"] == earlier_id and match["filename"] == "cv_2025.pdf", match
+            assert "marketing.pdf" not in groups
+
+            # A resume already stored by this batch is not its own earlier match
+            pool.add("cv_2026.pdf", EDITED)
+            pool.remove(earlier_id)
+            _, groups = _deduplicate({"cv_2026.pdf": EDITED})
+            assert groups == {}
+
+
+def main():
+    """Run all tests"""
+    print("Deduplication Test Suite")
+    print("=" * 50)
+    test_similarity_estimate()
+    test_clusters()
+    test_batch_deduplicate()
+    test_talent_pool_match_keeps_own_text()
+    print("All tests completed!")
+
+
+if __name__ == "__main__":
+    main()
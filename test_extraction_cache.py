@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the extracted-text cache of utils/extraction_cache.py
+
+Uses a throwaway SQLite file and a fake clock, so no server or resume files
+are needed. Runs under pytest or on its own: python test_extraction_cache.py
+"""
+
+import os
+import tempfile
+from unittest import mock
+
+from utils.extraction_cache import ExtractionCache, make_extraction_key
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_extraction_key():
+    """Test that the key follows the file content, extension and parser version"""
+    print("Testing make_extraction_key...")
+    key = make_extraction_key(("resume.pdf", b"%PDF-1.4 resume"), "3")
+    assert key == make_extraction_key(("renamed.PDF", b"%PDF-1.4 resume"), "3")
+    assert key != make_extraction_key(("resume.pdf", b"%PDF-1.4 resume v2"), "3")
+    assert key != make_extraction_key(("resume.docx", b"%PDF-1.4 resume"), "3")
+    assert key != make_extraction_key(("resume.pdf", b"%PDF-1.4 resume"), "4")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "resume.pdf")
+        with open(path, "wb") as file:
+            file.write(b"%PDF-1.4 resume")
+        # A file on disk and the same bytes in memory share a key
+        assert make_extraction_key(path, "3") == key
+
+
+def test_lru_eviction_by_size():
+    """Test that the least recently used texts go once max_bytes is exceeded"""
+    print("Testing size-bounded LRU eviction...")
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as directory, mock.patch("time.time", clock):
+        cache = ExtractionCache(path=os.path.join(directory, "extraction.sqlite3"), max_bytes=250)
+        for key in ("a", "b"):
+            cache.set(key, key * 100)
+            clock.now += 1
+        # Reading "a" makes "b" the least recently used entry
+        assert cache.get("a") == "a" * 100
+        clock.now += 1
+        cache.set("c", "c" * 100)
+
+        assert cache.get("b") is None
+        assert cache.get("a") and cache.get("c")
+        stats = cache.stats()
+        assert (stats["entries"], stats["bytes"], stats["evictions"]) == (2, 200, 1), stats
+
+        # Texts larger than the whole cache are not stored
+        cache.set("huge", "x" * 300)
+        assert cache.get("huge") is None and cache.stats()["bytes"] == 200
+
+
+def test_overwrite_and_reopen():
+    """Test that replacing a key does not double count, and sizes survive a reopen"""
+    print("Testing byte accounting...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "extraction.sqlite3")
+        cache = ExtractionCache(path=path, max_bytes=1000)
+        cache.set("a", "x" * 100)
+        cache.set("a", "é" * 100)
+        assert cache.stats()["bytes"] == 200
+        assert ExtractionCache(path=path, max_bytes=1000).stats()["bytes"] == 200
+        cache.clear()
+        assert cache.stats()["bytes"] == 0 and cache.get("a") is None
+
+
+def main():
+    """Run all tests"""
+    print("Extraction Cache Test Suite")
+    print("=" * 50)
+    test_extraction_key()
+    test_lru_eviction_by_size()
+    test_overwrite_and_reopen()
+    print("All tests completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for the streamed JSON parser of services/json_stream.py
+
+Feeds replies split into small chunks, so no server is needed.
+Runs under pytest or on its own: python test_json_stream.py
+"""
+
+from services.json_stream import IncrementalJSONParser
+
+
+def feed_in_chunks(parser, text, size):
+    completed = []
+    for start in range(0, len(text), size):
+        completed.append(parser.feed(text[start:start + size]))
+    return completed
+
+
+def test_fields_reported_when_complete():
+    """Test that each top-level field is reported once, by the chunk that completes it"""
+    print("Testing incremental fields...")
+    reply = '{"score": 82, "matched": ["Python", "SQL"], "detail": {"years": 5}, "note": "a, b } c"}'
+    parser = IncrementalJSONParser()
+    completed = feed_in_chunks(parser, reply, 3)
+    fields = [pair for chunk in completed for pair in chunk]
+    assert fields == [
+        ("score", 82), ("matched", ["Python", "SQL"]), ("detail", {"years": 5}), ("note", "a, b } c")
+    ], fields
+    # The score is known well before the reply ends
+    first = next(i for i, chunk in enumerate(completed) if chunk)
+    assert first < len(completed) // 3, (first, len(completed))
+
+
+def test_code_fence_and_trailing_text():
+    """Test that text around the object, such as a Markdown fence, is ignored"""
+    print("Testing code fences...")
+    parser = IncrementalJSONParser()
+    feed_in_chunks(parser, '```json\n{"score": 70, "reason": "say \\"hi\\""}\n```\n{"score": 1}', 4)
+    assert parser.fields == {"score": 70, "reason": 'say "hi"'}, parser.fields
+    assert parser.feed('{"extra": 1}') == []
+
+
+def test_reset_before_retry():
+    """Test that reset() drops a partial reply so a retried stream starts clean"""
+    print("Testing reset...")
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"score": 40, "matched": ["Ja') == [("score", 40)]
+    parser.reset()
+    assert parser.fields == {}
+    completed = parser.feed('{"score": 90, "matched": ["Go"]}')
+    assert completed == [("score", 90), ("matched", ["Go"])], completed
+
+
+def main():
+    """Run all tests"""
+    print("Streamed JSON Parser Test Suite")
+    print("=" * 50)
+    test_fields_reported_when_complete()
+    test_code_fence_and_trailing_text()
+    test_reset_before_retry()
+    print("All tests completed!")
+
+
+if __name__ == "__main__":
+    main()
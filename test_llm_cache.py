@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for the LLM response cache of services/llm_cache.py
+
+Uses a throwaway SQLite file and a fake clock, so no server or API key is
+needed. Runs under pytest or on its own: python test_llm_cache.py
+"""
+
+import os
+import tempfile
+from unittest import mock
+
+from services.llm_cache import LLMCache, make_cache_key
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def new_cache(directory, **options):
+    return LLMCache(path=os.path.join(directory, "llm_cache.sqlite3"), **options)
+
+
+def test_cache_key():
+    """Test that the key covers model, prompt and temperature"""
+    print("Testing make_cache_key...")
+    key = make_cache_key("gpt-4", "prompt", 0.7)
+    assert key == make_cache_key("gpt-4", "prompt", 0.7)
+    assert key != make_cache_key("gpt-4o", "prompt", 0.7)
+    assert key != make_cache_key("gpt-4", "prompt", 0.8)
+    assert key != make_cache_key("gpt-4", "prompt ", 0.7)
+
+
+def test_memory_and_disk_hits():
+    """Test that a response evicted from memory is still served from disk"""
+    print("Testing memory and disk tiers...")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = new_cache(directory, memory_entries=1)
+        cache.set("a", "reply a")
+        cache.set("b", "reply b")
+        assert cache.get("b") == "reply b"
+        assert cache.get("a") == "reply a"
+        assert cache.get("missing") is None
+        stats = cache.stats()
+        assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1), stats
+
+        # A new instance on the same file starts with an empty memory tier
+        assert new_cache(directory).get("b") == "reply b"
+
+
+def test_ttl_expiry():
+    """Test that entries older than ttl_seconds are misses and get deleted"""
+    print("Testing TTL expiry...")
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as directory, mock.patch("time.time", clock):
+        cache = new_cache(directory, ttl_seconds=60)
+        cache.set("a", "reply a")
+        clock.now += 59
+        assert cache.get("a") == "reply a"
+        clock.now += 2
+        assert cache.get("a") is None
+        assert cache.stats()["disk_entries"] == 0
+
+
+def test_lru_eviction():
+    """Test that the least recently used rows go once max_entries is exceeded"""
+    print("Testing LRU eviction...")
+    clock = FakeClock()
+    with tempfile.TemporaryDirectory() as directory, mock.patch("time.time", clock):
+        cache = new_cache(directory, max_entries=2, memory_entries=0)
+        cache.set("a", "reply a")
+        clock.now += 1
+        cache.set("b", "reply b")
+        clock.now += 1
+        # Reading "a" makes "b" the least recently used entry
+        assert cache.get("a") == "reply a"
+        clock.now += 1
+        cache.set("c", "reply c")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "reply a"
+        assert cache.get("c") == "reply c"
+        stats = cache.stats()
+        assert stats["disk_entries"] == 2 and stats["evictions"] == 1, stats
+
+
+def main():
+    """Run all tests"""
+    print("LLM Cache Test Suite")
+    print("=" * 50)
+    test_cache_key()
+    test_memory_and_disk_hits()
+    test_ttl_expiry()
+    test_lru_eviction()
+    print("All tests completed!")
+
+
+if __name__ == "__main__":
+    main()
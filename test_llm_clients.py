@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-key OpenAI client pool of services/llm_clients.py
+
+Clients are only constructed, never used, so no server or real API key is
+needed. Runs under pytest or on its own: python test_llm_clients.py
+"""
+
+import os
+from unittest import mock
+
+from services.llm_clients import ClientRegistry
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_client_per_key():
+    """Test that a client is reused per key and never mutates os.environ"""
+    print("Testing one client per API key...")
+    registry = ClientRegistry()
+    with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "sk-default"}):
+        first = registry.get("sk-user-1")
+        assert registry.get("sk-user-1") is first
+        assert registry.get("sk-user-2") is not first
+        assert first.api_key == "sk-user-1"
+        # No key falls back to OPENAI_API_KEY without overwriting it
+        assert registry.get().api_key == "sk-default"
+        assert os.environ["OPENAI_API_KEY"] == "sk-default"
+        assert registry.size() == 3
+
+
+def test_missing_key():
+    """Test that a missing key is an error instead of an unauthenticated client"""
+    print("Testing missing API key...")
+    with mock.patch.dict(os.environ, {"OPENAI_API_KEY": ""}):
+        try:
+            ClientRegistry().get()
+        except ValueError as e:
+            assert "No OpenAI API key" in str(e)
+            return
+    raise AssertionError("expected ValueError")
+
+
+def test_idle_clients_closed():
+    """Test that clients idle for longer than idle_seconds are closed and dropped"""
+    print("Testing idle client eviction...")
+    clock = FakeClock()
+    registry = ClientRegistry(idle_seconds=60)
+    with mock.patch("time.time", clock):
+        idle = registry.get("sk-idle")
+        clock.now += 30
+        active = registry.get("sk-active")
+        clock.now += 40
+        assert registry.get("sk-active") is active
+        assert registry.size() == 1
+        assert idle.is_closed()
+        assert not active.is_closed()
+        # A returning key gets a fresh client
+        assert registry.get("sk-idle") is not idle
+
+
+def main():
+    """Run all tests"""
+    print("LLM Client Pool Test Suite")
+    print("=" * 50)
+    test_client_per_key()
+    test_missing_key()
+    test_idle_clients_closed()
+    print("All tests completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for multi-resume match requests of services/packed_scoring.py
+
+The LLM calls are patched out, so no server or API key is needed.
+Runs under pytest or on its own: python test_packed_scoring.py
+"""
+
+import threading
+import time
+from unittest import mock
+
+from services import packed_scoring
+from services.packed_scoring import pack_resumes, score_pack
+
+MATCH = {
+    "overall_match_percentage": 70, "skills_match_percentage": 70, "experience_match_percentage": 70,
+    "education_match_percentage": 70,
+    "detailed_analysis": {"strengths": [], "weaknesses": [], "recommendations": []},
+    "key_matches": [], "missing_requirements": []
+}
+
+
+def reply(*item_ids):
+    return {"results": [dict(MATCH, id=item_id) for item_id in item_ids]}, "{}"
+
+
+def test_pack_limits():
+    """Test that packs respect the item limit and the token budget"""
+    print("Testing pack_resumes...")
+    resumes = {f"r{i}.txt": "Python developer " * 20 for i in range(10)}
+    packs = pack_resumes(resumes, "Python developer", token_budget=100000, max_items=4)
+    assert [len(pack) for pack in packs] == [4, 4, 2]
+    assert [item[0] for item in packs[0]] == ["R1", "R2", "R3", "R4"]
+    # A resume too large for any pack still gets a pack of its own
+    packs = pack_resumes({"big.txt": "word " * 5000, "small.txt": "word"}, "jd", token_budget=2000, max_items=4)
+    assert [[item[1] for item in pack] for pack in packs] == [["big.txt"], ["small.txt"]]
+
+
+def test_failed_items_repacked():
+    """Test that entries missing from a reply are sent again as one smaller pack"""
+    print("Testing re-packing...")
+    items = [(f"R{i}", f"r{i}.txt", f"resume {i}") for i in range(1, 5)]
+    with mock.patch.object(packed_scoring, "call_llm_json") as call, \
+            mock.patch.object(packed_scoring, "get_match_score") as single:
+        call.side_effect = [reply("R1", "R3"), reply("R2", "R4")]
+        results = score_pack(items, "jd")
+        assert set(results) == {"r1.txt", "r2.txt", "r3.txt", "r4.txt"}
+        assert call.call_count == 2 and single.call_count == 0
+        repacked_prompt = call.call_args_list[1].args[0]
+        assert "RESUME ID: R2" in repacked_prompt and "RESUME ID: R1" not in repacked_prompt
+
+
+def test_remaining_items_scored_concurrently():
+    """Test that items failing the re-pack are scored individually and in parallel"""
+    print("Testing concurrent individual re-scores...")
+    items = [(f"R{i}", f"r{i}.txt", f"resume {i}") for i in range(1, 6)]
+    running = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    def single(text, jd, **kwargs):
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        time.sleep(0.1)
+        with lock:
+            running["now"] -= 1
+        return dict(MATCH, overall_match_percentage=int(text.split()[-1]))
+
+    with mock.patch.object(packed_scoring, "call_llm_json") as call, \
+            mock.patch.object(packed_scoring, "get_match_score", side_effect=single):
+        # The first reply keeps one entry, the re-pack returns an invalid one
+        call.side_effect = [reply("R1"), ({"results": [{"id": "R2", "overall_match_percentage": 500}]}, "{}")]
+        started = time.monotonic()
+        results = score_pack(items, "jd")
+        assert time.monotonic() - started < 0.35
+    assert call.call_count == 2
+    assert [results[f"r{i}.txt"]["overall_match_percentage"] for i in range(2, 6)] == [2, 3, 4, 5]
+    assert running["max"] == 4, running
+
+
+def test_unparsed_reply_not_repacked():
+    """Test that a reply without any usable entry goes straight to individual scoring"""
+    print("Testing unparsed reply...")
+    items = [("R1", "a.txt", "resume 1"), ("R2", "b.txt", "resume 2")]
+    with mock.patch.object(packed_scoring, "call_llm_json", return_value=(None, "garbage")) as call, \
+            mock.patch.object(packed_scoring, "get_match_score", return_value=MATCH) as single:
+        assert set(score_pack(items, "jd")) == {"a.txt", "b.txt"}
+        assert call.call_count == 1 and single.call_count == 2
+
+
+def main():
+    """Run all tests"""
+    print("Packed Scoring Test Suite")
+    print("=" * 50)
+    test_pack_limits()
+    test_failed_items_repacked()
+    test_remaining_items_scored_concurrently()
+    test_unparsed_reply_not_repacked()
+    print("All tests completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for the BM25 batch pre-filter of services/prefilter.py
+
+Ranks inline resume texts locally, so no server or API key is needed.
+Runs under pytest or on its own: python test_prefilter.py
+"""
+
+from services.prefilter import tokenize, BM25Index, prefilter_resumes, select_prefiltered
+
+JD = "Backend engineer building Python APIs with Django and PostgreSQL on AWS"
+
+RESUMES = {
+    "python.txt": "Python developer. Built Django REST APIs backed by PostgreSQL, deployed on AWS.",
+    "partial.txt": "Python scripting for data analysis with pandas and Excel reports.",
+    "frontend.txt": "Frontend developer: React, TypeScript, CSS and Figma designs.",
+    "java.txt": "Java engineer building Spring Boot APIs on Oracle databases.",
+}
+
+
+def test_tokenize():
+    """Test that skill spellings survive tokenization and stopwords are dropped"""
+    print("Testing tokenize...")
+    assert tokenize("Experience with C++, C#, Node.js and front-end work.") == \
+        ["c++", "c#", "node.js", "front-end"]
+
+
+def test_ranking_order():
+    """Test that the resume covering the job description ranks first"""
+    print("Testing BM25 ordering...")
+    prefilter = prefilter_resumes(RESUMES, JD)
+    ranked = sorted(prefilter, key=lambda name: prefilter[name]["rank"])
+    # The Java resume shares "engineer building APIs", the partial one only "Python"
+    assert ranked == ["python.txt", "java.txt", "partial.txt", "frontend.txt"], prefilter
+    assert prefilter["python.txt"]["relevance"] == 100.0
+    assert prefilter["frontend.txt"]["score"] == 0.0
+    assert sorted(entry["rank"] for entry in prefilter.values()) == [1, 2, 3, 4]
+
+
+def test_must_have_boost():
+    """Test that must-have skills reorder the batch and are reported per resume"""
+    print("Testing must-have skills...")
+    prefilter = prefilter_resumes(RESUMES, "Engineer building APIs", must_have_skills="Java, Spring Boot")
+    assert prefilter["java.txt"]["rank"] == 1, prefilter
+    assert prefilter["java.txt"]["matched_must_have"] == ["Java", "Spring Boot"]
+    assert prefilter["python.txt"]["matched_must_have"] == []
+
+
+def test_length_normalisation():
+    """Test that a short focused resume beats a long one with the same matches"""
+    print("Testing length normalisation...")
+    index = BM25Index()
+    index.add("short", "kubernetes operator")
+    index.add("long", "kubernetes operator " + " ".join(f"filler{i}" for i in range(200)))
+    index.add("none", "accounting")
+    scores = index.score({"kubernetes": 1.0})
+    assert scores["short"] > scores["long"] > scores["none"] == 0.0, scores
+    try:
+        index.add("short", "again")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError for a duplicate document")
+
+
+def test_select_prefiltered():
+    """Test top-K and minimum relevance selection"""
+    print("Testing select_prefiltered...")
+    prefilter = prefilter_resumes(RESUMES, JD)
+    assert select_prefiltered(prefilter, top_k=1, min_score=0) == {"python.txt"}
+    assert select_prefiltered(prefilter, top_k=0, min_score=50) == {"python.txt", "java.txt"}
+    assert select_prefiltered(prefilter, top_k=1, min_score=10) == {"python.txt", "java.txt", "partial.txt"}
+    assert select_prefiltered(prefilter, top_k=0, min_score=0) == set(RESUMES)
+
+
+def test_tfidf_method():
+    """Test that the TF-IDF method ranks the same best resume"""
+    print("Testing tfidf method...")
+    prefilter = prefilter_resumes(RESUMES, JD, method="tfidf")
+    assert prefilter["python.txt"]["rank"] == 1, prefilter
+    try:
+        prefilter_resumes(RESUMES, JD, method="lsi")
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError for an unknown method")
+
+
+def main():
+    """Run all tests"""
+    print("Pre-filter Test Suite")
+    print("=" * 50)
+    test_tokenize()
+    test_ranking_order()
+    test_must_have_boost()
+    test_length_normalisation()
+    test_select_prefiltered()
+    test_tfidf_method()
+    print("All tests completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for the token-bucket scheduler of services/rate_limiter.py
+
+Drives the buckets with explicit timestamps and short timeouts, so no server
+is needed. Runs under pytest or on its own: python test_rate_limiter.py
+"""
+
+import time
+from types import SimpleNamespace
+
+from services import rate_limiter
+from services.rate_limiter import TokenBucket, RateLimitScheduler, backoff_delay, retry_after_seconds
+
+
+def test_token_bucket_refill():
+    """Test that a bucket refills at capacity per minute and never overfills"""
+    print("Testing TokenBucket refill...")
+    bucket = TokenBucket(60)
+    start = bucket.updated_at
+    bucket.consume(60)
+    assert bucket.wait_time(1, start) == 1.0
+    assert bucket.wait_time(30, start + 10) == 20.0
+    assert bucket.wait_time(10, start + 10) == 0.0
+    assert bucket.wait_time(1, start + 3600) == 0.0
+    assert bucket.available == 60
+    # Requests larger than the bucket wait for a full bucket, not forever
+    bucket.consume(1000)
+    assert bucket.available == 0
+    assert bucket.wait_time(1000, start + 3600) == 60.0
+
+
+def test_acquire_timeout():
+    """Test that acquire gives up after its timeout instead of blocking"""
+    print("Testing acquire timeout...")
+    scheduler = RateLimitScheduler(rpm=60, tpm=1000, headroom=1.0)
+    assert scheduler.acquire(1000)
+    started = time.monotonic()
+    assert not scheduler.acquire(500, timeout=0.2)
+    assert 0.15 <= time.monotonic() - started < 1.0
+    assert scheduler.stats()["waiting"] == 0
+
+
+def test_reconcile_refunds_unused_tokens():
+    """Test that tokens reserved but not used are given back"""
+    print("Testing reconcile...")
+    scheduler = RateLimitScheduler(rpm=60, tpm=1000, headroom=1.0)
+    assert scheduler.acquire(1000)
+    scheduler.reconcile(1000, 400)
+    assert scheduler.acquire(500, timeout=0)
+    # Using more than the estimate refunds nothing
+    scheduler.reconcile(100, 300)
+    assert not scheduler.acquire(200, timeout=0)
+
+
+def test_pause():
+    """Test that pause() holds back every caller"""
+    print("Testing pause...")
+    scheduler = RateLimitScheduler(rpm=600, tpm=100000, headroom=1.0)
+    scheduler.pause(5)
+    assert not scheduler.acquire(1, timeout=0.05)
+    stats = scheduler.stats()
+    assert stats["rate_limited"] == 1 and stats["paused_for_seconds"] > 4, stats
+
+
+def test_backoff():
+    """Test the jittered backoff bounds and that Retry-After is respected"""
+    print("Testing backoff_delay and retry_after_seconds...")
+    base, cap = rate_limiter.LLM_BACKOFF_BASE_SECONDS, rate_limiter.LLM_BACKOFF_MAX_SECONDS
+    rate_limiter.LLM_BACKOFF_BASE_SECONDS, rate_limiter.LLM_BACKOFF_MAX_SECONDS = 1.0, 8.0
+    try:
+        for attempt in range(6):
+            delay = backoff_delay(attempt)
+            expected = min(8.0, 2 ** attempt)
+            assert expected / 2 <= delay <= expected, (attempt, delay)
+        assert 30 <= backoff_delay(0, retry_after=30) <= 31
+    finally:
+        rate_limiter.LLM_BACKOFF_BASE_SECONDS, rate_limiter.LLM_BACKOFF_MAX_SECONDS = base, cap
+
+    def error(headers):
+        return SimpleNamespace(response=SimpleNamespace(headers=headers))
+
+    assert retry_after_seconds(error({"retry-after-ms": "1500"})) == 1.5
+    assert retry_after_seconds(error({"retry-after": "7"})) == 7.0
+    assert retry_after_seconds(error({"retry-after": "Wed, 21 Oct 2026 07:28:00 GMT"})) is None
+    assert retry_after_seconds(ValueError("no response")) is None
+
+
+def main():
+    """Run all tests"""
+    print("Rate Limiter Test Suite")
+    print("=" * 50)
+    test_token_bucket_refill()
+    test_acquire_timeout()
+    test_reconcile_refunds_unused_tokens()
+    test_pause()
+    test_backoff()
+    print("All tests completed!")
+
+
+if __name__ == "__main__":
+    main()
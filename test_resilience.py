@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Test script for the circuit breaker and hedged calls of services/resilience.py
+
+Uses short real delays instead of LLM calls, so no server is needed.
+Runs under pytest or on its own: python test_resilience.py
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from services import llm_utils, rate_limiter, resilience
+from services.llm_utils import _create_completion
+from services.rate_limiter import get_scheduler
+from services.resilience import (CircuitBreaker, CircuitOpenError, DeadlineExceededError, LatencyTracker,
+                                 run_hedged)
+
+
+def expect_open(breaker):
+    try:
+        breaker.before_call()
+    except CircuitOpenError:
+        return
+    raise AssertionError("expected CircuitOpenError")
+
+
+def test_breaker_opens_and_recovers():
+    """Test closed -> open -> half-open -> closed"""
+    print("Testing circuit breaker recovery...")
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=0.1)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    breaker.before_call()
+    breaker.record_success()
+    # A success resets the consecutive failure count
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.stats()["state"] == "closed"
+    breaker.record_failure()
+    assert breaker.stats()["state"] == "open"
+    expect_open(breaker)
+
+    time.sleep(0.15)
+    breaker.before_call()
+    assert breaker.stats()["state"] == "half_open"
+    # Only one probe is let through while half-open
+    expect_open(breaker)
+    breaker.record_success()
+    assert breaker.stats() == {"state": "closed", "consecutive_failures": 0, "times_opened": 1, "rejected": 2}
+
+
+def test_failed_probe_reopens():
+    """Test that a failed half-open probe re-opens the circuit at once"""
+    print("Testing circuit breaker re-open...")
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.1)
+    breaker.record_failure()
+    time.sleep(0.15)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.stats()["state"] == "open" and breaker.stats()["times_opened"] == 2
+    expect_open(breaker)
+
+
+def test_abandoned_probe():
+    """Test that a probe that was never sent lets the next caller probe"""
+    print("Testing abandon...")
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    time.sleep(0.1)
+    breaker.before_call()
+    breaker.abandon()
+    breaker.before_call()
+    expect_open(breaker)
+
+
+def test_hedge_wins():
+    """Test that a slow first attempt is hedged and the faster reply returned"""
+    print("Testing hedged request...")
+    attempts = []
+    lock = threading.Lock()
+
+    def send():
+        with lock:
+            attempts.append(1)
+            first = len(attempts) == 1
+        time.sleep(1.0 if first else 0.01)
+        return "slow" if first else "fast"
+
+    hedged = []
+    started = time.monotonic()
+    assert run_hedged(send, hedge_delay=0.05, deadline=2, before_hedge=lambda: hedged.append(1)) == "fast"
+    assert time.monotonic() - started < 0.5
+    assert hedged == [1]
+
+
+def test_deadline_exceeded():
+    """Test that run_hedged gives up at its deadline"""
+    print("Testing deadline...")
+    started = time.monotonic()
+    try:
+        run_hedged(lambda: time.sleep(1), hedge_delay=None, deadline=0.1)
+    except DeadlineExceededError:
+        assert time.monotonic() - started < 0.5
+    else:
+        raise AssertionError("expected DeadlineExceededError")
+
+
+def test_early_failure_not_hedged():
+    """Test that a failure before the hedge is raised straight away"""
+    print("Testing early failure...")
+
+    def send():
+        raise ValueError("bad request")
+
+    try:
+        run_hedged(send, hedge_delay=0.5, deadline=2)
+    except ValueError as e:
+        assert str(e) == "bad request"
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_hedge_delay_follows_tail_latency():
+    """Test that the hedge delay is the recent percentile once enough samples exist"""
+    print("Testing LatencyTracker...")
+    min_samples = resilience.LLM_HEDGE_MIN_SAMPLES
+    resilience.LLM_HEDGE_MIN_SAMPLES = 10
+    try:
+        tracker = LatencyTracker()
+        tracker.record(3.0)
+        assert tracker.hedge_delay() == resilience.LLM_HEDGE_INITIAL_DELAY_SECONDS
+        for seconds in range(2, 21):
+            tracker.record(float(seconds))
+        assert tracker.percentile(50) == 11.0
+        assert tracker.hedge_delay() == tracker.percentile(resilience.LLM_HEDGE_PERCENTILE)
+    finally:
+        resilience.LLM_HEDGE_MIN_SAMPLES = min_samples
+
+
+def slow_client(seconds, calls):
+    """Client whose completions take seconds to arrive"""
+    def create(**kwargs):
+        calls.append(kwargs["timeout"])
+        time.sleep(seconds)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="late"))], usage=None)
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def patch_call_limits(timeout, budget):
+    saved = (llm_utils.LLM_CALL_TIMEOUT_SECONDS, llm_utils.LLM_CALL_BUDGET_SECONDS, llm_utils.LLM_HEDGE_ENABLED,
+             rate_limiter.LLM_BACKOFF_BASE_SECONDS)
+    llm_utils.LLM_CALL_TIMEOUT_SECONDS, llm_utils.LLM_CALL_BUDGET_SECONDS = timeout, budget
+    llm_utils.LLM_HEDGE_ENABLED, rate_limiter.LLM_BACKOFF_BASE_SECONDS = False, 0.01
+    return saved
+
+
+def restore_call_limits(saved):
+    (llm_utils.LLM_CALL_TIMEOUT_SECONDS, llm_utils.LLM_CALL_BUDGET_SECONDS, llm_utils.LLM_HEDGE_ENABLED,
+     rate_limiter.LLM_BACKOFF_BASE_SECONDS) = saved
+
+
+def test_deadline_retried_once():
+    """Test that a call whose attempts keep missing the deadline is retried only once"""
+    print("Testing deadline retries...")
+    saved = patch_call_limits(timeout=0.1, budget=30)
+    calls = []
+    try:
+        _create_completion(slow_client(0.5, calls), "sk-test-deadline", "test-deadline", "prompt", 0.0)
+    except DeadlineExceededError:
+        assert len(calls) == 2, calls
+    else:
+        raise AssertionError("expected DeadlineExceededError")
+    finally:
+        restore_call_limits(saved)
+
+
+def test_call_budget():
+    """Test that one overall budget caps every attempt, whatever the per-attempt timeout"""
+    print("Testing call budget...")
+    saved = patch_call_limits(timeout=10, budget=0.2)
+    calls = []
+    started = time.monotonic()
+    try:
+        _create_completion(slow_client(1.0, calls), "sk-test-budget", "test-budget", "prompt", 0.0)
+    except DeadlineExceededError:
+        assert time.monotonic() - started < 0.6
+        assert len(calls) == 1 and calls[0] <= 0.2, calls
+    else:
+        raise AssertionError("expected DeadlineExceededError")
+    finally:
+        restore_call_limits(saved)
+
+
+def test_open_circuit_skips_rate_limit_queue():
+    """Test that an open circuit rejects a call before it takes rate limit capacity"""
+    print("Testing open circuit before acquire...")
+    breaker = resilience.get_circuit_breaker("test-open")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    scheduler = get_scheduler("sk-test-open")
+    available = scheduler.requests.available
+    calls = []
+    try:
+        _create_completion(slow_client(0, calls), "sk-test-open", "test-open", "prompt", 0.0)
+    except resilience.CircuitOpenError:
+        assert calls == [] and scheduler.requests.available == available
+    else:
+        raise AssertionError("expected CircuitOpenError")
+
+
+def main():
+    """Run all tests"""
+    print("Resilience Test Suite")
+    print("=" * 50)
+    test_breaker_opens_and_recovers()
+    test_failed_probe_reopens()
+    test_abandoned_probe()
+    test_hedge_wins()
+    test_deadline_exceeded()
+    test_early_failure_not_hedged()
+    test_hedge_delay_follows_tail_latency()
+    test_deadline_retried_once()
+    test_call_budget()
+    test_open_circuit_skips_rate_limit_queue()
+    print("All tests completed!")
+
+
+if __name__ == "__main__":
+    main()
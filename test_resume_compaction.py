@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the resume text compaction of services/resume_compaction.py
+
+Works on inline resume text, so no server or resume files are needed.
+Runs under pytest or on its own: python test_resume_compaction.py
+"""
+
+from services.resume_compaction import compact_resume_text
+from services.token_utils import count_tokens
+
+
+def test_page_artefacts_and_headers():
+    """Test that page numbers, repeated page headers and duplicate bullets are dropped"""
+    print("Testing page numbers and headers...")
+    text = "\n".join([
+        "Jane Doe - Page 1",
+        "EXPERIENCE",
+        "•   Built   data pipelines",
+        "Page 1 of 2",
+        "Jane Doe - Page 2",
+        "- 2 -",
+        "* Built data pipelines",
+        "2/2",
+    ])
+    compacted, stats = compact_resume_text(text, max_tokens=1000)
+    assert compacted.splitlines() == [
+        "Jane Doe - Page 1", "EXPERIENCE", "- Built data pipelines"
+    ], compacted
+    assert stats["saved_tokens"] > 0
+    assert stats["compacted_tokens"] == count_tokens(compacted)
+
+
+def test_lines_differing_in_numbers_kept():
+    """Test that content lines differing only by numbers are not merged"""
+    print("Testing numeric content lines...")
+    text = "\n".join([
+        "Led a team of 5 engineers",
+        "Led a team of 12 engineers",
+        "Python 2 and Python 3",
+        "Cut costs by 30% in 2021",
+        "Cut costs by 40% in 2022",
+        "Led a team of 5 engineers",
+    ])
+    compacted, _ = compact_resume_text(text, max_tokens=1000)
+    assert compacted.splitlines() == text.splitlines()[:5], compacted
+
+
+def test_blank_lines_collapsed():
+    """Test that runs of blank lines collapse to one paragraph separator"""
+    print("Testing blank lines...")
+    compacted, _ = compact_resume_text("\n\nSummary\n\n\n\nPython developer\n\n", max_tokens=1000)
+    assert compacted == "Summary\n\nPython developer", repr(compacted)
+
+
+def test_trim_to_budget():
+    """Test that long resumes are trimmed to max_tokens, favouring key sections"""
+    print("Testing section trimming...")
+    experience = [f"Shipped feature {i} for the payments platform" for i in range(80)]
+    hobbies = [f"Hobby number {i} involving hiking and chess" for i in range(80)]
+    text = "\n".join(["Experience"] + experience + ["Hobbies"] + hobbies)
+    compacted, stats = compact_resume_text(text, max_tokens=300)
+    lines = compacted.splitlines()
+    assert stats["compacted_tokens"] <= 300, stats
+    assert lines[0] == "Experience" and "Hobbies" in lines
+    kept_experience = lines.index("Hobbies") - 1
+    kept_hobbies = len(lines) - lines.index("Hobbies") - 1
+    assert kept_experience > kept_hobbies > 0, (kept_experience, kept_hobbies)
+    # Lines are kept in order from the top of each section
+    assert lines[1:1 + kept_experience] == experience[:kept_experience]
+
+
+def test_empty_text():
+    """Test that empty text compacts to nothing without dividing by zero"""
+    print("Testing empty text...")
+    compacted, stats = compact_resume_text("", max_tokens=100)
+    assert compacted == "" and stats["saved_percent"] == 0.0
+
+
+def main():
+    """Run all tests"""
+    print("Resume Compaction Test Suite")
+    print("=" * 50)
+    test_page_artefacts_and_headers()
+    test_lines_differing_in_numbers_kept()
+    test_blank_lines_collapsed()
+    test_trim_to_budget()
+    test_empty_text()
+    print("All tests completed!")
+
+
+if __name__ == "__main__":
+    main()
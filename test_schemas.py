@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for reply validation and repair (services/schemas.py and
+call_llm_json in services/llm_utils.py)
+
+The LLM call is patched out, so no server or API key is needed.
+Runs under pytest or on its own: python test_schemas.py
+"""
+
+import json
+from unittest import mock
+
+from services import llm_utils
+from services.llm_utils import call_llm_json, _response_format
+from services.schemas import validate, parse_json, MATCH_ANALYSIS_SCHEMA, PRESCREEN_SCHEMA
+
+
+def test_validate():
+    """Test types, ranges, required and nested properties"""
+    print("Testing validate...")
+    schema = PRESCREEN_SCHEMA["schema"]
+    assert validate({"overall_match_percentage": 80, "reason": "ok"}, schema) == []
+    # Extra properties are tolerated
+    assert validate({"overall_match_percentage": 80.5, "reason": "ok", "extra": 1}, schema) == []
+    assert validate({"overall_match_percentage": 120, "reason": "ok"}, schema) == \
+        ["$.overall_match_percentage: must be <= 100"]
+    assert validate({"overall_match_percentage": True, "reason": "ok"}, schema) == \
+        ["$.overall_match_percentage: expected number, got bool"]
+    assert validate({"reason": "ok"}, schema) == ["$: missing required property 'overall_match_percentage'"]
+    assert validate([], schema) == ["$: expected object, got list"]
+
+    reply = {
+        "overall_match_percentage": 70, "skills_match_percentage": 60,
+        "experience_match_percentage": 80, "education_match_percentage": 90,
+        "detailed_analysis": {"strengths": ["Python"], "weaknesses": [3], "recommendations": []},
+        "key_matches": [], "missing_requirements": []
+    }
+    assert validate(reply, MATCH_ANALYSIS_SCHEMA["schema"]) == \
+        ["$.detailed_analysis.weaknesses[0]: expected string, got int"]
+
+
+def test_parse_json():
+    """Test that JSON wrapped in prose or a code fence is still parsed"""
+    print("Testing parse_json...")
+    assert parse_json('{"a": 1}') == {"a": 1}
+    assert parse_json('Sure:\n```json\n{"a": {"b": 2}}\n```') == {"a": {"b": 2}}
+    for text in ("", "no json here"):
+        try:
+            parse_json(text)
+        except ValueError:
+            continue
+        raise AssertionError(f"expected ValueError for {text!r}")
+
+
+def test_repair_request():
+    """Test that an invalid reply is sent back once with its errors"""
+    print("Testing call_llm_json repair...")
+    valid = json.dumps({"overall_match_percentage": 55, "reason": "fine"})
+    with mock.patch.object(llm_utils, "call_llm") as call:
+        call.side_effect = ['{"overall_match_percentage": 155, "reason": "too high"}', valid]
+        parsed, raw = call_llm_json("PROMPT", PRESCREEN_SCHEMA, repair_retries=1)
+        assert parsed == {"overall_match_percentage": 55, "reason": "fine"} and raw == valid
+        repair_prompt = call.call_args_list[1].args[0]
+        assert repair_prompt.startswith("PROMPT") and "must be <= 100" in repair_prompt
+
+        # Without repair retries the last JSON object is returned as is
+        call.reset_mock(side_effect=True)
+        call.side_effect = ['{"overall_match_percentage": 155, "reason": "too high"}']
+        parsed, _ = call_llm_json("PROMPT", PRESCREEN_SCHEMA, repair_retries=0)
+        assert parsed["overall_match_percentage"] == 155 and call.call_count == 1
+
+        # API errors are not repaired
+        call.reset_mock(side_effect=True)
+        call.side_effect = ["Error calling LLM: boom"]
+        assert call_llm_json("PROMPT", PRESCREEN_SCHEMA, repair_retries=2) == (None, "Error calling LLM: boom")
+        assert call.call_count == 1
+
+
+def test_response_format():
+    """Test the response format picked per model in auto mode"""
+    print("Testing _response_format...")
+    mode = llm_utils.LLM_STRUCTURED_OUTPUT
+    llm_utils.LLM_STRUCTURED_OUTPUT = "auto"
+    try:
+        assert _response_format("gpt-4o-mini", PRESCREEN_SCHEMA)["type"] == "json_schema"
+        assert _response_format("gpt-4-turbo", PRESCREEN_SCHEMA) == {"type": "json_object"}
+        # Plain gpt-4 supports neither format
+        assert _response_format("gpt-4", PRESCREEN_SCHEMA) is None
+        assert _response_format("gpt-4o", None) is None
+        llm_utils.LLM_STRUCTURED_OUTPUT = "off"
+        assert _response_format("gpt-4o", PRESCREEN_SCHEMA) is None
+    finally:
+        llm_utils.LLM_STRUCTURED_OUTPUT = mode
+
+
+def main():
+    """Run all tests"""
+    print("Schema Validation Test Suite")
+    print("=" * 50)
+    test_validate()
+    test_parse_json()
+    test_repair_request()
+    test_response_format()
+    print("All tests completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the hashed TF-IDF engine of services/similarity.py
+
+Ranks inline resume texts locally, so no server or API key is needed.
+Runs under pytest or on its own: python test_similarity.py
+"""
+
+import numpy as np
+
+from services.similarity import SimilarityEngine, rank_resumes
+
+RESUMES = {
+    "ml.txt": "Machine learning engineer: PyTorch models, feature pipelines in Python, model serving",
+    "data.txt": "Data analyst with SQL, Tableau dashboards and some Python",
+    "web.txt": "Web developer building React and TypeScript frontends",
+}
+
+
+def test_rank_order_and_scores():
+    """Test that the closest resume ranks first with cosine scores in [0, 1]"""
+    print("Testing rank...")
+    ranked = rank_resumes(RESUMES, "Machine learning engineer with PyTorch and Python")
+    assert [doc_id for doc_id, _ in ranked] == ["ml.txt", "data.txt", "web.txt"], ranked
+    scores = [score for _, score in ranked]
+    assert 0 < scores[0] <= 1.0 + 1e-6 and scores[-1] == 0.0, scores
+
+
+def test_top_k():
+    """Test that top_k returns the same leaders as a full ranking"""
+    print("Testing top_k...")
+    resumes = {f"r{i}.txt": f"python developer {'django ' * (i % 7)} project {i}" for i in range(50)}
+    engine = SimilarityEngine().fit(resumes)
+    full = engine.rank("python django developer")
+    top = engine.rank("python django developer", top_k=5)
+    # Resumes with equal scores may swap places, the scores may not
+    assert [score for _, score in top] == [score for _, score in full[:5]], (top, full[:5])
+    assert len(full) == 50
+
+
+def test_rows_normalised():
+    """Test that every resume vector has unit length, so long resumes gain nothing"""
+    print("Testing row normalisation...")
+    engine = SimilarityEngine(n_features=2 ** 12).fit(dict(RESUMES, empty=""))
+    norms = np.sqrt(np.asarray(engine._matrix.multiply(engine._matrix).sum(axis=1)).ravel())
+    assert np.allclose(norms[:-1], 1.0) and norms[-1] == 0.0, norms
+    # Keyword stuffing does not raise a resume's score
+    repeated = SimilarityEngine().fit({"once": "rust systems", "twice": "rust systems " * 20, "other": "golang"})
+    scores = dict(repeated.rank("rust"))
+    assert scores["twice"] <= scores["once"], scores
+
+
+def test_unfitted_engine():
+    """Test that scoring before fit() is an error and an empty pool ranks nothing"""
+    print("Testing unfitted engine...")
+    try:
+        SimilarityEngine().vectorize("python")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+    assert SimilarityEngine().fit({}).rank("python") == []
+
+
+def main():
+    """Run all tests"""
+    print("Similarity Engine Test Suite")
+    print("=" * 50)
+    test_rank_order_and_scores()
+    test_top_k()
+    test_rows_normalised()
+    test_unfitted_engine()
+    print("All tests completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-flight call coalescing of services/single_flight.py
+
+Uses plain threads and events, so no server is needed.
+Runs under pytest or on its own: python test_single_flight.py
+"""
+
+import threading
+import time
+
+from services.single_flight import SingleFlight
+
+
+def run_concurrently(flight, key, fn, callers):
+    """Start callers threads on key while the leader is held inside fn"""
+    outcomes = []
+    lock = threading.Lock()
+
+    def caller():
+        try:
+            outcome = flight.do(key, fn)
+        except Exception as e:
+            outcome = e
+        with lock:
+            outcomes.append(outcome)
+
+    threads = [threading.Thread(target=caller) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def wait_for_followers(flight, count):
+    while flight.stats()["coalesced"] < count:
+        time.sleep(0.005)
+
+
+def test_followers_share_result():
+    """Test that concurrent callers with one key run the function once"""
+    print("Testing leader/follower result sharing...")
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return "reply"
+
+    threads, outcomes = run_concurrently(flight, "key", fn, 5)
+    wait_for_followers(flight, 4)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(outcomes) == [("reply", False)] + [("reply", True)] * 4, outcomes
+    assert flight.stats() == {"executed": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_error_propagates_to_followers():
+    """Test that the leader's exception reaches every follower and is not remembered"""
+    print("Testing leader/follower error propagation...")
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise RuntimeError("API down")
+
+    threads, outcomes = run_concurrently(flight, "key", failing, 3)
+    wait_for_followers(flight, 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(outcomes) == 3
+    assert all(isinstance(e, RuntimeError) and str(e) == "API down" for e in outcomes), outcomes
+    # The next call runs again instead of replaying the failure
+    assert flight.do("key", lambda: "recovered") == ("recovered", False)
+
+
+def test_distinct_keys_not_coalesced():
+    """Test that calls with different keys run independently"""
+    print("Testing distinct keys...")
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == (1, False)
+    assert flight.do("b", lambda: 2) == (2, False)
+    assert flight.stats()["executed"] == 2 and flight.stats()["coalesced"] == 0
+
+
+def main():
+    """Run all tests"""
+    print("Single Flight Test Suite")
+    print("=" * 50)
+    test_followers_share_result()
+    test_error_propagates_to_followers()
+    test_distinct_keys_not_coalesced()
+    print("All tests completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test script for the local skill matching of services/skill_matcher.py
+
+Matches inline resume snippets, so no server or API key is needed.
+Runs under pytest or on its own: python test_skill_matcher.py
+"""
+
+from services.skill_matcher import AhoCorasick, SkillMatcher, parse_skills
+
+
+def matched(resume, must_have, nice_to_have=""):
+    return SkillMatcher(must_have, nice_to_have).match(resume)["matched_skills"]
+
+
+def test_java_is_not_javascript():
+    """Test that Java and JavaScript only match their own names"""
+    print("Testing Java vs JavaScript...")
+    assert matched("Frontend work in JavaScript and TypeScript", "Java, JavaScript")["must_have"] == ["JavaScript"]
+    assert matched("Backend services in Java 17", "Java, JavaScript")["must_have"] == ["Java"]
+    # An alias of a requested skill counts for it
+    assert matched("Built SPAs with ES6 and React", "JavaScript")["must_have"] == ["JavaScript"]
+
+
+def test_c_is_not_cpp():
+    """Test that C, C++ and C# are told apart"""
+    print("Testing C vs C++ vs C#...")
+    skills = "C, C++, C#"
+    assert matched("Embedded firmware in C++", skills)["must_have"] == ["C++"]
+    assert matched("Unity games written in C#", skills)["must_have"] == ["C#"]
+    assert matched("Kernel modules in C and some cpp", skills)["must_have"] == ["C", "C++"]
+
+
+def test_dotted_names():
+    """Test that the "js" of D3.js or Chart.js is not JavaScript"""
+    print("Testing D3.js...")
+    result = matched("Dashboards with D3.js and Chart.js", "JavaScript, D3.js")
+    assert result["must_have"] == ["D3.js"], result
+    assert "JavaScript" not in result["additional"]
+    # A sentence ending before a skill still matches it
+    assert matched("Shipped features. JS and CSS daily.", "JavaScript")["must_have"] == ["JavaScript"]
+
+
+def test_missing_and_additional():
+    """Test must-have/nice-to-have misses and unrequested skills"""
+    print("Testing missing and additional skills...")
+    result = SkillMatcher("Python (required), Kubernetes", "Terraform; Go").match(
+        "Python and Django developer, Docker and k8s in production, some Golang"
+    )
+    assert result["matched_skills"] == {
+        "must_have": ["Python", "Kubernetes"], "nice_to_have": ["Go"], "additional": ["Django", "Docker"]
+    }, result
+    assert result["missing_skills"] == {"critical": [], "important": ["Terraform"], "optional": []}
+
+
+def test_parse_skills():
+    """Test splitting and de-duplicating the form fields"""
+    print("Testing parse_skills...")
+    assert parse_skills("Java (required), java; Spring  Boot\nSQL (preferred),") == ["Java", "Spring Boot", "SQL"]
+
+
+def test_automaton_overlaps():
+    """Test that overlapping patterns are all found in one pass"""
+    print("Testing AhoCorasick...")
+    automaton = AhoCorasick()
+    for pattern in ("spring", "spring boot", "boot"):
+        automaton.add(pattern, pattern)
+    found = [value for _, _, value in automaton.build().find("spring boot and bootstrap")]
+    assert found == ["spring", "spring boot", "boot"], found
+
+
+def main():
+    """Run all tests"""
+    print("Skill Matcher Test Suite")
+    print("=" * 50)
+    test_java_is_not_javascript()
+    test_c_is_not_cpp()
+    test_dotted_names()
+    test_missing_and_additional()
+    test_parse_skills()
+    test_automaton_overlaps()
+    print("All tests completed!")
+
+
+if __name__ == "__main__":
+    main()
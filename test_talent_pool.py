@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent talent pool of services/talent_pool.py
+
+Uses a throwaway SQLite file, so no server or API key is needed.
+Runs under pytest or on its own: python test_talent_pool.py
+"""
+
+import os
+import tempfile
+
+from services import talent_pool
+from services.prefilter import BM25Index, build_query
+from services.talent_pool import TalentPool, get_talent_pool
+
+RESUMES = [
+    ("alice.pdf", "Alice Smith\nalice@example.com  +1 555 123 4567\nPython and Django backend engineer, AWS"),
+    ("bob.pdf", "Bob Jones\nJava and Spring Boot services on Kubernetes"),
+    ("carol.pdf", "Carol White\nData analyst: SQL, Tableau and Python notebooks"),
+]
+
+
+def new_pool(directory):
+    return TalentPool(path=os.path.join(directory, "talent_pool.sqlite3"))
+
+
+def totals(pool):
+    return pool._totals()
+
+
+def test_add_remove_totals():
+    """Test that the running document and length totals follow adds and removes"""
+    print("Testing add/remove index totals...")
+    with tempfile.TemporaryDirectory() as directory:
+        pool = new_pool(directory)
+        ids = [resume_id for resume_id, is_new in pool.add_many(RESUMES)]
+        lengths = [pool._conn.execute("SELECT length FROM resumes WHERE id = ?", (i,)).fetchone()[0] for i in ids]
+        assert totals(pool) == {"documents": 3, "length": sum(lengths)}
+
+        # The same text with different spacing is stored once
+        resume_id, is_new = pool.add("alice_copy.pdf", RESUMES[0][1].replace("\n", "\n\n  "))
+        assert (resume_id, is_new) == (ids[0], False)
+        assert totals(pool)["documents"] == 3
+
+        assert pool.remove(ids[1]) and not pool.remove(ids[1])
+        assert totals(pool) == {"documents": 2, "length": lengths[0] + lengths[2]}
+        assert pool._conn.execute("SELECT COUNT(*) FROM postings WHERE resume_id = ?", (ids[1],)).fetchone()[0] == 0
+        assert pool._conn.execute("SELECT COUNT(*) FROM lsh_buckets WHERE resume_id = ?",
+                                  (ids[1],)).fetchone()[0] == 0
+        assert pool.stats()["resumes"] == 2
+
+        # Totals survive a reopen of the same file
+        assert totals(new_pool(directory)) == totals(pool)
+
+
+def test_search_matches_in_memory_bm25():
+    """Test that pool search ranks and scores like the batch BM25 index"""
+    print("Testing search...")
+    jd = "Python backend engineer with SQL"
+    with tempfile.TemporaryDirectory() as directory:
+        pool = new_pool(directory)
+        pool.add_many(RESUMES)
+        results = pool.search(jd, must_have_skills="Python")
+
+        index = BM25Index()
+        for filename, text in RESUMES:
+            index.add(filename, talent_pool.normalize_resume_text(text))
+        expected = index.score(build_query(jd, "Python"))
+        assert [r["filename"] for r in results] == sorted((f for f in expected if expected[f] > 0),
+                                                         key=expected.get, reverse=True)
+        for result in results:
+            assert abs(result["score"] - expected[result["filename"]]) < 1e-3, (result, expected)
+        assert results[0]["relevance"] == 100.0 and results[0]["rank"] == 1
+        assert len(pool.search(jd, top_k=1)) == 1
+
+
+def test_no_contact_details_in_metadata():
+    """Test that emails and phone numbers are not copied into the metadata"""
+    print("Testing metadata...")
+    with tempfile.TemporaryDirectory() as directory:
+        pool = new_pool(directory)
+        resume_id, _ = pool.add(*RESUMES[0])
+        metadata = pool.get(resume_id)["metadata"]
+        assert set(metadata) == {"skills", "characters"}, metadata
+        assert "alice@example.com" not in str(metadata) and "555" not in str(metadata)
+        assert metadata["skills"] == ["AWS", "Django", "Python"]
+
+
+def test_near_duplicates():
+    """Test that a lightly edited copy of a stored resume is found"""
+    print("Testing near duplicates...")
+    text = "\n".join(f"Built service {i} in Python with PostgreSQL and Redis for the billing team" for i in range(30))
+    with tempfile.TemporaryDirectory() as directory:
+        pool = new_pool(directory)
+        resume_id, _ = pool.add("original.pdf", text)
+        pool.add("other.pdf", RESUMES[1][1])
+        matches = pool.near_duplicates(text + "\nReferences available on request")
+        assert [match["id"] for match in matches] == [resume_id], matches
+        assert pool.near_duplicates(RESUMES[2][1]) == []
+
+
+def test_disabled_by_default():
+    """Test that no pool is opened unless TALENT_POOL_ENABLED is set"""
+    print("Testing opt-in...")
+    enabled = talent_pool.TALENT_POOL_ENABLED
+    talent_pool.TALENT_POOL_ENABLED = False
+    try:
+        assert get_talent_pool() is None
+        assert talent_pool.get_talent_pool_stats() == {"enabled": False}
+    finally:
+        talent_pool.TALENT_POOL_ENABLED = enabled
+
+
+def main():
+    """Run all tests"""
+    print("Talent Pool Test Suite")
+    print("=" * 50)
+    test_add_remove_totals()
+    test_search_matches_in_memory_bm25()
+    test_no_contact_details_in_metadata()
+    test_near_duplicates()
+    test_disabled_by_default()
+    print("All tests completed!")
+
+
+if __name__ == "__main__":
+    main()
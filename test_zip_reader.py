@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the ZIP upload limits of utils/zip_reader.py
+
+Builds small archives in memory, so no server or resume files are needed.
+Runs under pytest or on its own: python test_zip_reader.py
+"""
+
+import io
+import zipfile
+
+from utils import zip_reader
+from utils.zip_reader import read_zip_members, ZipLimitError
+
+
+def accept(name):
+    return name.lower().endswith((".pdf", ".docx", ".txt"))
+
+
+def build_zip(members, encrypted=()):
+    """
+    Return an in-memory ZIP archive of (name, data) pairs.
+
+    zipfile cannot write encrypted members, so for the names in encrypted
+    only the "encrypted" flag bit of the local and central headers is set.
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+    data = bytearray(buffer.getvalue())
+    for name in encrypted:
+        # (signature, offset of the flag bits, offset of the file name)
+        for signature, flags_at, name_at in ((b"PK\x03\x04", 6, 30), (b"PK\x01\x02", 8, 46)):
+            start = data.find(signature)
+            while start != -1:
+                if data[start + name_at:start + name_at + len(name)] == name.encode():
+                    data[start + flags_at] |= 0x1
+                start = data.find(signature, start + 1)
+    return io.BytesIO(bytes(data))
+
+
+def expect_limit_error(archive, message):
+    try:
+        read_zip_members(archive, accept)
+    except ZipLimitError as e:
+        assert message in str(e), f"unexpected error: {e}"
+        print(f"  rejected: {e}")
+        return
+    raise AssertionError(f"expected ZipLimitError containing {message!r}")
+
+
+def test_member_limit():
+    """Test that an archive with more files than ZIP_MAX_MEMBERS is rejected"""
+    print("Testing ZIP_MAX_MEMBERS...")
+    limit = zip_reader.ZIP_MAX_MEMBERS
+    zip_reader.ZIP_MAX_MEMBERS = 3
+    try:
+        expect_limit_error(build_zip([(f"resume_{i}.txt", "Python developer") for i in range(4)]),
+                           "archive has 4 files, the limit is 3")
+        assert len(read_zip_members(build_zip([(f"resume_{i}.txt", "Python") for i in range(3)]), accept)) == 3
+    finally:
+        zip_reader.ZIP_MAX_MEMBERS = limit
+
+
+def test_total_bytes_limit():
+    """Test that resumes expanding beyond ZIP_MAX_TOTAL_BYTES are rejected"""
+    print("Testing ZIP_MAX_TOTAL_BYTES...")
+    limit = zip_reader.ZIP_MAX_TOTAL_BYTES
+    zip_reader.ZIP_MAX_TOTAL_BYTES = 1024 * 1024
+    half = 600 * 1024
+    try:
+        expect_limit_error(build_zip([("a.txt", "x" * half), ("b.txt", "y" * half)]), "archive expands beyond 1MB")
+        # Members that are not resumes do not count
+        assert len(read_zip_members(build_zip([("a.txt", "x" * half), ("notes.bin", "y" * half)]), accept)) == 1
+    finally:
+        zip_reader.ZIP_MAX_TOTAL_BYTES = limit
+
+
+def test_compression_ratio_limit():
+    """Test that a member expanding more than ZIP_MAX_COMPRESSION_RATIO is rejected"""
+    print("Testing ZIP_MAX_COMPRESSION_RATIO...")
+    # 4MB of zeros deflates to a few KB
+    expect_limit_error(build_zip([("bomb.pdf", b"\0" * (4 * 1024 * 1024))]), "bomb.pdf expands more than")
+    # Small members may compress well without tripping the check
+    assert len(read_zip_members(build_zip([("small.txt", "a" * 10000)]), accept)) == 1
+
+
+def test_encrypted_member_skipped():
+    """Test that encrypted members are skipped and the rest is read"""
+    print("Testing encrypted members...")
+    archive = build_zip([("secret.pdf", b"%PDF-1.4"), ("resume.txt", "Python developer")], encrypted=["secret.pdf"])
+    members = read_zip_members(archive, accept)
+    assert members == [("resume.txt", b"Python developer")], members
+
+
+def test_macosx_entries_skipped():
+    """Test that __MACOSX/ resource forks are not read as resumes"""
+    print("Testing __MACOSX/ entries...")
+    archive = build_zip([
+        ("resumes/alice.pdf", b"%PDF-1.4"),
+        ("__MACOSX/resumes/._alice.pdf", b"\0\5\26\7"),
+        ("__MACOSX/resumes/bob.txt", "not a resume"),
+        ("resumes/._carol.docx", b"\0\5\26\7")
+    ])
+    members = read_zip_members(archive, accept)
+    assert [name for name, _ in members] == ["resumes/alice.pdf"], members
+
+
+def main():
+    """Run all tests"""
+    print("ZIP Reader Test Suite")
+    print("=" * 50)
+    test_member_limit()
+    test_total_bytes_limit()
+    test_compression_ratio_limit()
+    test_encrypted_member_skipped()
+    test_macosx_entries_skipped()
+    print("All tests completed!")
+
+
+if __name__ == "__main__":
+    main()
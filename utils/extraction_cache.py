@@ -0,0 +1,152 @@
+from dotenv import load_dotenv
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+load_dotenv()
+
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+EXTRACTION_CACHE_PATH = os.getenv("EXTRACTION_CACHE_PATH", os.path.join("cache", "extraction_cache.sqlite3"))
+# Total size of the stored texts; least recently used entries go first
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+_READ_BLOCK = 1024 * 1024
+
+
+def file_digest(path):
+    """SHA-256 of a file's bytes, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(_READ_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_extraction_key(source, parser_version):
+    """
+    Cache key of a resume file: the content hash, the extension (the parser
+    is chosen by extension) and the parser version.
+
+    Args:
+        source: File path, or (filename, bytes) of a file held in memory
+        parser_version: Version of the extraction code
+    """
+    if isinstance(source, tuple):
+        filename, digest = source[0], hashlib.sha256(source[1]).hexdigest()
+    else:
+        filename, digest = source, file_digest(source)
+    file_format = os.path.splitext(filename)[1].lower().lstrip(".")
+    return f"{digest}:{file_format}:{parser_version}"
+
+
+class ExtractionCache:
+    """
+    SQLite store of extracted resume text keyed by file content.
+
+    When the stored texts grow beyond ``max_bytes`` the least recently used
+    rows are evicted.
+    """
+
+    def __init__(self, path=EXTRACTION_CACHE_PATH, max_bytes=EXTRACTION_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extraction_cache ("
+            "key TEXT PRIMARY KEY, text TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_extraction_cache_accessed ON extraction_cache (accessed_at)"
+        )
+        self._conn.commit()
+        (self._total_bytes,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM extraction_cache").fetchone()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM extraction_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._conn.execute("UPDATE extraction_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self._stats["hits"] += 1
+            return row[0]
+
+    def set(self, key, text):
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM extraction_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extraction_cache (key, text, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, text, size, now, now)
+            )
+            self._total_bytes += size - (row[0] if row else 0)
+            self._stats["writes"] += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM extraction_cache ORDER BY accessed_at ASC LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                return
+            for key, size in rows:
+                if self._total_bytes <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM extraction_cache WHERE key = ?", (key,))
+                self._total_bytes -= size
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM extraction_cache")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            (stats["entries"],) = self._conn.execute("SELECT COUNT(*) FROM extraction_cache").fetchone()
+        stats["bytes"] = self._total_bytes
+        stats["max_bytes"] = self.max_bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache():
+    """Return the process-wide cache, or None when caching is disabled"""
+    global _cache
+    if not EXTRACTION_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ExtractionCache()
+    return _cache
+
+
+def get_extraction_cache_stats():
+    """Hit/miss counters and size of the extraction cache"""
+    cache = get_extraction_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
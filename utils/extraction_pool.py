@@ -0,0 +1,196 @@
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from dotenv import load_dotenv
+import multiprocessing
+import threading
+import os
+
+load_dotenv()
+
+# Worker processes for resume text extraction (PDF parsing is CPU bound and
+# holds the GIL, so threads do not help)
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "0")) or os.cpu_count() or 1
+# Files handed to a worker per task; larger chunks cost less IPC per file
+EXTRACTION_CHUNK_SIZE = int(os.getenv("EXTRACTION_CHUNK_SIZE", "4"))
+# Smaller batches are extracted in-process, where a pool would cost more than it saves
+EXTRACTION_PARALLEL_MIN_FILES = int(os.getenv("EXTRACTION_PARALLEL_MIN_FILES", "4"))
+# "spawn" keeps workers independent of the server's threads and open connections
+EXTRACTION_START_METHOD = os.getenv("EXTRACTION_START_METHOD", "spawn")
+# Address space limit of each worker process (0 = unlimited; not enforced on Windows)
+EXTRACTION_WORKER_MAX_MEMORY_MB = int(os.getenv("EXTRACTION_WORKER_MAX_MEMORY_MB", "1024"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _limit_worker_memory(max_memory_mb):
+    """Worker initializer: cap the address space, so a pathological file
+    fails with MemoryError instead of swelling the worker"""
+    try:
+        import resource
+        limit = max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        print(f"Extraction worker memory limit not applied: {e}")
+
+
+def _extract_chunk(sources, measure_memory=False):
+    """
+    Extract a chunk of files, isolating each file's errors.
+
+    measure_memory is only set for pool tasks: a worker parses one file at a
+    time, so its peak RSS belongs to that file. In the server process other
+    threads share the counter, so it is left alone.
+    """
+    from utils.resume_parser import measure_extraction, source_name
+
+    extracted = []
+    for source in sources:
+        name = source_name(source)
+        try:
+            extracted.append((name,) + measure_extraction(source, measure_memory))
+        except Exception as e:
+            extracted.append((name, f"Error extracting text from {name}: {str(e)}", 0.0, None))
+    return extracted
+
+
+def _get_pool():
+    """Shared worker pool, started on first use and replaced after a crash"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            initializer = _limit_worker_memory if EXTRACTION_WORKER_MAX_MEMORY_MB > 0 else None
+            _pool = ProcessPoolExecutor(max_workers=EXTRACTION_WORKERS,
+                                        mp_context=multiprocessing.get_context(EXTRACTION_START_METHOD),
+                                        initializer=initializer, initargs=(EXTRACTION_WORKER_MAX_MEMORY_MB,))
+        return _pool
+
+
+def _reset_pool(broken):
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    # Its pending futures have already failed; cancelling them again trips
+    # the executor's own cleanup thread
+    broken.shutdown(wait=False)
+
+
+def _retry_one_by_one(sources):
+    """
+    Re-run the files of a chunk whose worker died, one task per file, so a
+    single file that crashes the parser only fails itself.
+    """
+    from utils.resume_parser import source_name
+
+    for source in sources:
+        pool = _get_pool()
+        try:
+            extracted = pool.submit(_extract_chunk, [source], True).result()
+        except BrokenProcessPool as e:
+            _reset_pool(pool)
+            name = source_name(source)
+            extracted = [(name, f"Error extracting text from {name}: worker process crashed ({e})", 0.0, None)]
+        yield from extracted
+
+
+def iter_extracted(sources, workers=None, chunk_size=None):
+    """
+    Extract resume files on a process pool and yield each text as soon as
+    its chunk is done.
+
+    Chunks are submitted through a sliding window of two per worker, so a
+    large upload never queues every file at once and the first texts are
+    available while the rest are still being parsed. Failures are confined
+    to the file that caused them: errors come back as "Error extracting
+    text ..." strings, like extract_resume_text returns them.
+
+    Files found in the extraction cache are yielded first, without reaching
+    the pool; newly parsed texts are added to the cache.
+
+    Args:
+        sources: Resume file paths, or (filename, bytes) pairs of files held
+            in memory such as ZIP members
+        workers: Worker processes (defaults to EXTRACTION_WORKERS)
+        chunk_size: Files per task (defaults to EXTRACTION_CHUNK_SIZE)
+
+    Yields:
+        (path or filename, text) pairs in completion order
+    """
+    from utils.resume_parser import lookup_cached_text, store_cached_text, source_name
+
+    cache_keys = {}
+    misses = []
+    for source in sources:
+        cache_key, text = lookup_cached_text(source)
+        if text is not None:
+            yield source_name(source), text
+        else:
+            cache_keys[source_name(source)] = cache_key
+            misses.append(source)
+
+    for name, text in _iter_parsed(misses, workers, chunk_size):
+        store_cached_text(cache_keys[name], text)
+        yield name, text
+
+
+def _iter_parsed(sources, workers, chunk_size):
+    from utils.resume_parser import record_extraction
+
+    workers = workers or EXTRACTION_WORKERS
+    if workers <= 1 or len(sources) < EXTRACTION_PARALLEL_MIN_FILES:
+        for source in sources:
+            for name, text, seconds, peak_rss in _extract_chunk([source]):
+                record_extraction(name, text, seconds, peak_rss)
+                yield name, text
+        return
+
+    chunk_size = max(1, chunk_size or EXTRACTION_CHUNK_SIZE)
+    # Keep every worker busy even when the batch is small
+    chunk_size = min(chunk_size, max(1, len(sources) // workers))
+    chunks = [sources[start:start + chunk_size] for start in range(0, len(sources), chunk_size)]
+    pending = iter(chunks)
+    in_flight = {}
+
+    def submit_next():
+        chunk = next(pending, None)
+        if chunk is None:
+            return
+        pool = _get_pool()
+        try:
+            future = pool.submit(_extract_chunk, chunk, True)
+        except BrokenProcessPool:
+            _reset_pool(pool)
+            pool = _get_pool()
+            future = pool.submit(_extract_chunk, chunk, True)
+        in_flight[future] = (pool, chunk)
+
+    for _ in range(2 * workers):
+        submit_next()
+    try:
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                pool, chunk = in_flight.pop(future)
+                try:
+                    extracted = future.result()
+                except BrokenProcessPool:
+                    _reset_pool(pool)
+                    extracted = _retry_one_by_one(chunk)
+                for name, text, seconds, peak_rss in extracted:
+                    record_extraction(name, text, seconds, peak_rss)
+                    yield name, text
+                submit_next()
+    finally:
+        # The caller stopped early: drop the chunks that have not started
+        for future in in_flight:
+            future.cancel()
+
+
+def extract_many(sources, workers=None, chunk_size=None):
+    """Extract resume files in parallel; returns path or filename -> text in input order"""
+    from utils.resume_parser import source_name
+
+    sources = list(sources)
+    texts = dict(iter_extracted(sources, workers=workers, chunk_size=chunk_size))
+    return {source_name(source): texts[source_name(source)] for source in sources}
@@ -0,0 +1,183 @@
+from importlib import metadata
+from importlib.util import find_spec
+from dotenv import load_dotenv
+import io
+import os
+
+load_dotenv()
+
+# Backend chain per extension, tried in order until one returns text, e.g.
+# "pdf=pypdfium2,pypdf2;docx=docx2txt". Extensions that are not listed use
+# every available backend, highest priority first.
+EXTRACTOR_BACKENDS = os.getenv("EXTRACTOR_BACKENDS", "")
+
+
+class ExtractorBackend:
+    """
+    One way of turning a resume file into text.
+
+    extract(source, max_chars) yields the text in parts (pages of a PDF,
+    paragraphs of a DOCX) and may stop once max_chars characters are out;
+    paged backends are limited to RESUME_MAX_PAGES parts. Backends whose
+    module is not installed are registered but unavailable.
+    """
+
+    def __init__(self, name, extensions, extract, priority=0, paged=False, module=None, distribution=None):
+        self.name = name
+        self.extensions = extensions
+        self.extract = extract
+        self.priority = priority
+        self.paged = paged
+        self.module = module
+        self.distribution = distribution or module
+
+    def available(self):
+        return self.module is None or find_spec(self.module) is not None
+
+    def version(self):
+        if self.distribution is None:
+            return "builtin"
+        try:
+            return metadata.version(self.distribution)
+        except metadata.PackageNotFoundError:
+            return "unknown"
+
+
+_BACKENDS = {}
+
+
+def register_extractor(name, extensions, priority=0, paged=False, module=None, distribution=None):
+    """
+    Register a text extractor for one or more file extensions.
+
+    Args:
+        name: Backend name used in EXTRACTOR_BACKENDS and error messages
+        extensions: Extensions without the dot, e.g. ("pdf",)
+        priority: Higher priorities are tried first when no chain is configured
+        paged: The extractor yields one part per page
+        module: Module that must be importable for the backend to be used
+        distribution: Package that provides the module, for the cache key
+    """
+    def decorator(extract):
+        backend = ExtractorBackend(name, tuple(extensions), extract, priority, paged, module, distribution)
+        for extension in backend.extensions:
+            _BACKENDS.setdefault(extension, {})[name] = backend
+        return extract
+    return decorator
+
+
+def registered_backends(extension):
+    """Every backend registered for an extension, highest priority first"""
+    return sorted(_BACKENDS.get(extension, {}).values(), key=lambda backend: -backend.priority)
+
+
+def _configured_chains():
+    chains = {}
+    for entry in EXTRACTOR_BACKENDS.split(";"):
+        if "=" in entry:
+            extension, names = entry.split("=", 1)
+            chains[extension.strip().lower().lstrip(".")] = [name.strip() for name in names.split(",") if name.strip()]
+    return chains
+
+
+def backend_chain(extension):
+    """Available backends to try for an extension, in order"""
+    chain = _configured_chains().get(extension)
+    backends = _BACKENDS.get(extension, {})
+    if chain is None:
+        candidates = registered_backends(extension)
+    else:
+        unknown = [name for name in chain if name not in backends]
+        if unknown:
+            raise ValueError(f"Unknown extractor backend for .{extension}: {', '.join(unknown)}")
+        candidates = [backends[name] for name in chain]
+    return [backend for backend in candidates if backend.available()]
+
+
+def backends_signature():
+    """Backend chains and versions of every extension, part of the extraction cache key"""
+    return ";".join(
+        f"{extension}={','.join(f'{backend.name}-{backend.version()}' for backend in backend_chain(extension))}"
+        for extension in sorted(_BACKENDS)
+    )
+
+
+def parser_input(source):
+    """What the parser libraries accept: the path, or a buffer over the bytes"""
+    return io.BytesIO(source[1]) if isinstance(source, tuple) else source
+
+
+def _open_binary(source):
+    return io.BytesIO(source[1]) if isinstance(source, tuple) else open(source, "rb")
+
+
+def _open_text(source, encoding):
+    if isinstance(source, tuple):
+        return io.TextIOWrapper(io.BytesIO(source[1]), encoding=encoding)
+    return open(source, "r", encoding=encoding)
+
+
+@register_extractor("pypdf2", ["pdf"], priority=100, paged=True, module="PyPDF2")
+def extract_pypdf2(source, max_chars):
+    import PyPDF2
+
+    with _open_binary(source) as file:
+        for page in PyPDF2.PdfReader(file).pages:
+            yield page.extract_text() or ""
+
+
+@register_extractor("pypdfium2", ["pdf"], priority=50, paged=True, module="pypdfium2")
+def extract_pypdfium2(source, max_chars):
+    import pypdfium2
+
+    document = pypdfium2.PdfDocument(source[1] if isinstance(source, tuple) else source)
+    try:
+        for page in document:
+            text_page = page.get_textpage()
+            try:
+                yield text_page.get_text_range()
+            finally:
+                text_page.close()
+                page.close()
+    finally:
+        document.close()
+
+
+@register_extractor("pymupdf", ["pdf"], priority=40, paged=True, module="pymupdf", distribution="PyMuPDF")
+def extract_pymupdf(source, max_chars):
+    import pymupdf
+
+    if isinstance(source, tuple):
+        document = pymupdf.open(stream=source[1], filetype="pdf")
+    else:
+        document = pymupdf.open(source)
+    with document:
+        for page in document:
+            yield page.get_text()
+
+
+@register_extractor("python-docx", ["docx"], priority=100, module="docx", distribution="python-docx")
+def extract_python_docx(source, max_chars):
+    from docx import Document
+
+    for paragraph in Document(parser_input(source)).paragraphs:
+        yield paragraph.text
+
+
+@register_extractor("docx2txt", ["docx", "doc"], priority=50, module="docx2txt")
+def extract_docx2txt(source, max_chars):
+    import docx2txt
+
+    yield docx2txt.process(parser_input(source)) or ""
+
+
+@register_extractor("text", ["txt"], priority=100)
+def extract_plain_text(source, max_chars):
+    # Files that are not valid UTF-8 are read as latin-1, which accepts any byte
+    try:
+        with _open_text(source, "utf-8") as file:
+            text = file.read(max_chars)
+    except UnicodeDecodeError:
+        with _open_text(source, "latin-1") as file:
+            text = file.read(max_chars)
+    yield text
@@ -1,95 +1,199 @@
 import os
-import PyPDF2
-from typing import Optional
-from docx import Document
-import docx2txt
+import time
+import sqlite3
+from typing import Iterator, Optional, Tuple, Union
+from dotenv import load_dotenv
+from services.metrics import (
+    EXTRACTION_SECONDS, EXTRACTION_FAILURES, EXTRACTION_CACHE_LOOKUPS, EXTRACTION_PEAK_RSS_BYTES
+)
+from utils.extraction_cache import get_extraction_cache, make_extraction_key
+from utils.extraction_pool import iter_extracted
+from utils.extractors import backend_chain, backends_signature
+
+load_dotenv()
+
+# Extraction budget per file: a 300-page portfolio stops after the first
+# RESUME_MAX_PAGES pages (0 = no limit) or RESUME_MAX_CHARS characters,
+# whichever comes first
+RESUME_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "50"))
+RESUME_MAX_CHARS = int(os.getenv("RESUME_MAX_CHARS", "100000"))
+
+# Part of every extraction cache key; bump it whenever the extracted text of
+# a file would change, so stale entries are no longer served. The budgets and
+# the configured backend chains with their versions are included.
+RESUME_PARSER_VERSION = f"3-p{RESUME_MAX_PAGES}-c{RESUME_MAX_CHARS}-{backends_signature()}"
+
+# A resume source is a file path, or a (filename, bytes) pair of a file that
+# was read into memory (e.g. a ZIP member); the filename picks the parser
+Source = Union[str, Tuple[str, bytes]]
 
 def extract_resume_text(file_path: str) -> Optional[str]:
     """
     Extract text from resume files (PDF, DOCX, etc.)
+
+    Files parsed before are served from the extraction cache by content
+    hash. Extraction time and failures are recorded per file format for
+    /metrics.
+    """
+    return _extract_with_cache(file_path)
+
+def extract_resume_bytes(filename: str, data: bytes) -> Optional[str]:
+    """Extract text from the bytes of a resume file held in memory"""
+    return _extract_with_cache((filename, data))
+
+def _extract_with_cache(source: Source) -> Optional[str]:
+    cache_key, text = lookup_cached_text(source)
+    if text is not None:
+        return text
+    text, seconds, peak_rss = measure_extraction(source)
+    record_extraction(source_name(source), text, seconds, peak_rss)
+    store_cached_text(cache_key, text)
+    return text
+
+def source_name(source: Source) -> str:
+    """File path or in-memory filename of a resume source"""
+    return source[0] if isinstance(source, tuple) else source
+
+def measure_extraction(source: Source, measure_memory: bool = False) -> Tuple[Optional[str], float, Optional[int]]:
+    """
+    Extract one file and measure it.
+
+    Args:
+        source: File path, or (filename, bytes) of a file held in memory
+        measure_memory: Reset and read the process's peak RSS around the
+            file. Only for a process that parses nothing else at the same
+            time, i.e. an extraction pool worker; the reset is process-wide
+
+    Returns:
+        (text, seconds, peak_rss): peak_rss is the highest resident set size
+        of this process while the file was parsed, in bytes (None when not
+        measured or the platform cannot reset the peak)
+    """
+    measured = measure_memory and _reset_peak_rss()
+    started = time.perf_counter()
+    text = _extract_resume_text(source)
+    return text, time.perf_counter() - started, _peak_rss_bytes() if measured else None
+
+def _reset_peak_rss() -> bool:
+    # Linux only: writing 5 to clear_refs resets VmHWM, so the next reading
+    # covers this file alone
+    try:
+        with open("/proc/self/clear_refs", "w") as refs:
+            refs.write("5")
+        return True
+    except OSError:
+        return False
+
+def _peak_rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+def lookup_cached_text(source: Source) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Look a file up in the extraction cache.
+
+    Returns:
+        (cache_key, text): text is None on a miss; cache_key is None when
+        the cache is disabled or the file cannot be read
     """
+    cache = get_extraction_cache()
+    if cache is None:
+        return None, None
     try:
-        if not os.path.exists(file_path):
+        cache_key = make_extraction_key(source, RESUME_PARSER_VERSION)
+    except OSError:
+        return None, None
+    text = cache.get(cache_key)
+    EXTRACTION_CACHE_LOOKUPS.labels("hit" if text is not None else "miss").inc()
+    return cache_key, text
+
+def store_cached_text(cache_key: Optional[str], text: Optional[str]) -> None:
+    """Keep a successful extraction for the next upload of the same file"""
+    cache = get_extraction_cache()
+    if cache is None or cache_key is None or not text or text.startswith(("Error", "Unsupported")):
+        return
+    try:
+        cache.set(cache_key, text)
+    except sqlite3.Error as e:
+        print(f"Extraction cache warning: {e}")
+
+def record_extraction(file_path: str, text: Optional[str], seconds: float,
+                      peak_rss: Optional[int] = None) -> None:
+    """Record the extraction time, peak memory and outcome of one file for /metrics"""
+    file_format = os.path.splitext(file_path)[1].lower().lstrip('.') or 'unknown'
+    EXTRACTION_SECONDS.labels(file_format).observe(seconds)
+    if peak_rss is not None:
+        EXTRACTION_PEAK_RSS_BYTES.labels(file_format).observe(peak_rss)
+    if not text or text.startswith(("Error", "Unsupported")):
+        EXTRACTION_FAILURES.labels(file_format).inc()
+
+def _extract_resume_text(source: Source) -> Optional[str]:
+    file_path = source_name(source)
+    try:
+        if not isinstance(source, tuple) and not os.path.exists(file_path):
             return None
         
-        # Handle different file extensions
+        # Handle different file extensions with the configured backend chain
         file_extension = os.path.splitext(file_path)[1].lower()
+        backends = backend_chain(file_extension.lstrip('.'))
+        if not backends:
+            return f"Unsupported file format: {file_extension}"
         
-        if file_extension == '.pdf':
-            # Extract text from PDF using PyPDF2
-            try:
-                with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    text = ""
-                    for page in pdf_reader.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
-                    if text.strip():
-                        return text.strip()
-            except Exception as e:
-                print(f"PyPDF2 failed for {file_path}: {str(e)}")
-                return f"Error extracting text from {file_path}: PyPDF2 failed"
-        
-        elif file_extension == '.docx':
-            # Extract text from DOCX using python-docx
+        failed = []
+        for backend in backends:
             try:
-                doc = Document(file_path)
-                text = ""
-                for paragraph in doc.paragraphs:
-                    text += paragraph.text + "\n"
+                text = _join_within_budget(backend.extract(source, RESUME_MAX_CHARS), file_path,
+                                           max_parts=RESUME_MAX_PAGES if backend.paged else None)
                 if text.strip():
                     return text.strip()
             except Exception as e:
-                print(f"python-docx failed for {file_path}: {str(e)}")
-                # Fallback to docx2txt
-                try:
-                    text = docx2txt.process(file_path)
-                    if text and text.strip():
-                        return text.strip()
-                except Exception as e2:
-                    print(f"docx2txt also failed for {file_path}: {str(e2)}")
-                    return f"Error extracting text from {file_path}: Both methods failed"
-        
-        elif file_extension == '.doc':
-            # Extract text from DOC using docx2txt
-            try:
-                text = docx2txt.process(file_path)
-                if text and text.strip():
-                    return text.strip()
-            except Exception as e:
-                print(f"docx2txt failed for {file_path}: {str(e)}")
-                return f"Error extracting text from {file_path}: docx2txt failed"
-        
-        elif file_extension == '.txt':
-            # Read plain text files
-            try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    text = file.read()
-                    if text.strip():
-                        return text.strip()
-            except UnicodeDecodeError:
-                # Try with different encoding
-                try:
-                    with open(file_path, 'r', encoding='latin-1') as file:
-                        text = file.read()
-                        if text.strip():
-                            return text.strip()
-                except Exception as e:
-                    print(f"Failed to read {file_path} with latin-1 encoding: {str(e)}")
-                    return f"Error extracting text from {file_path}: Encoding issues"
-            except Exception as e:
-                print(f"Failed to read {file_path}: {str(e)}")
-                return f"Error extracting text from {file_path}: File read failed"
-        else:
-            return f"Unsupported file format: {file_extension}"
+                # Fall back to the next backend of the chain
+                print(f"{backend.name} failed for {file_path}: {str(e)}")
+                failed.append(backend.name)
+        if failed:
+            return f"Error extracting text from {file_path}: {', '.join(failed)} failed"
+        return None
             
     except Exception as e:
         return f"Error extracting text from {file_path}: {str(e)}"
 
+def _join_within_budget(parts: Iterator[str], file_path: str, max_parts: Optional[int] = RESUME_MAX_PAGES,
+                        max_chars: int = RESUME_MAX_CHARS) -> str:
+    """
+    Join text parts (pages, paragraphs) with newlines in linear time, stopping
+    as soon as max_parts parts or max_chars characters have been read.
+    """
+    kept = []
+    remaining = max_chars
+    try:
+        for count, part in enumerate(parts, 1):
+            if part:
+                kept.append(part[:remaining])
+                remaining -= len(kept[-1]) + 1
+            # Stop before the next part is even parsed
+            if remaining <= 0 or count == max_parts:
+                print(f"Extraction budget reached for {file_path} after {count} pages/paragraphs "
+                      f"(limits: {max_parts or 'none'} parts, {max_chars} characters)")
+                break
+    finally:
+        # Stops the page iterator, which closes the file
+        close = getattr(parts, "close", None)
+        if close is not None:
+            close()
+    return "\n".join(kept)
+
 def get_all_resumes(resumes_dir: str = "resumes") -> dict:
     """
     Get all resumes from the resumes directory
+
+    Files are extracted in parallel on the extraction process pool; the
+    result keeps the directory listing order.
     """
     resumes = {}
     
@@ -111,23 +215,27 @@ def get_all_resumes(resumes_dir: str = "resumes") -> dict:
     # Process all supported files
     supported_files = pdf_files + docx_files + doc_files + txt_files
     
+    readable = {}
     for filename in supported_files:
-        print(f"Processing: {filename}")
         file_path = os.path.join(resumes_dir, filename)
         
         # Check file permissions
         if not os.access(file_path, os.R_OK):
             print(f"  ❌ Cannot read file: {filename}")
             continue
-        
-        # Extract text
-        text = extract_resume_text(file_path)
-        
+        readable[file_path] = filename
+    
+    # Extract text
+    texts = {}
+    for file_path, text in iter_extracted(readable):
+        filename = readable[file_path]
+        print(f"Processed: {filename}")
         if text and not text.startswith("Error"):
-            resumes[filename] = text
+            texts[filename] = text
             print(f"  ✅ Success: {len(text)} characters")
         else:
             print(f"  ❌ Failed: {text}")
+    resumes = {filename: texts[filename] for filename in readable.values() if filename in texts}
     
     print(f"Successfully processed {len(resumes)} out of {len(supported_files)} files")
     return resumes
@@ -0,0 +1,71 @@
+from dotenv import load_dotenv
+import os
+import zipfile
+import zlib
+
+load_dotenv()
+
+# Limits on an uploaded archive, checked against its central directory before
+# any member is decompressed
+ZIP_MAX_MEMBERS = int(os.getenv("ZIP_MAX_MEMBERS", "1000"))
+ZIP_MAX_TOTAL_BYTES = int(os.getenv("ZIP_MAX_TOTAL_BYTES", str(200 * 1024 * 1024)))
+ZIP_MAX_COMPRESSION_RATIO = int(os.getenv("ZIP_MAX_COMPRESSION_RATIO", "100"))
+# Small members can legitimately compress far better than the ratio allows
+_RATIO_CHECK_MIN_BYTES = 1024 * 1024
+
+
+class ZipLimitError(ValueError):
+    """The archive exceeds a member count, size or compression ratio limit"""
+
+
+def read_zip_members(file, accept):
+    """
+    Read the resume files of a ZIP archive into memory.
+
+    Members are selected by name from the central directory, and the limits
+    are enforced on the declared sizes before anything is decompressed.
+    zipfile never inflates a member beyond its declared size, so the checked
+    sizes bound the memory used.
+
+    Args:
+        file: Path or seekable binary file object of the archive
+        accept: Predicate on a member's base name (e.g. allowed_file)
+
+    Returns:
+        List of (member name, bytes) in archive order
+
+    Raises:
+        zipfile.BadZipFile: The upload is not a ZIP archive
+        ZipLimitError: The archive exceeds a limit
+    """
+    with zipfile.ZipFile(file) as archive:
+        entries = [info for info in archive.infolist() if not info.is_dir()]
+        if len(entries) > ZIP_MAX_MEMBERS:
+            raise ZipLimitError(f"archive has {len(entries)} files, the limit is {ZIP_MAX_MEMBERS}")
+
+        selected = []
+        total_bytes = 0
+        for info in entries:
+            name = os.path.basename(info.filename)
+            # macOS resource forks (__MACOSX/._resume.pdf) are not resumes
+            if not accept(name) or info.filename.startswith("__MACOSX/") or name.startswith("._"):
+                continue
+            if info.flag_bits & 0x1:
+                print(f"Skipping encrypted ZIP member: {info.filename}")
+                continue
+            if info.file_size >= _RATIO_CHECK_MIN_BYTES and \
+                    info.file_size > ZIP_MAX_COMPRESSION_RATIO * max(info.compress_size, 1):
+                raise ZipLimitError(f"{info.filename} expands more than {ZIP_MAX_COMPRESSION_RATIO}x")
+            total_bytes += info.file_size
+            if total_bytes > ZIP_MAX_TOTAL_BYTES:
+                raise ZipLimitError(f"archive expands beyond {ZIP_MAX_TOTAL_BYTES // (1024 * 1024)}MB")
+            selected.append(info)
+
+        members = []
+        for info in selected:
+            try:
+                members.append((info.filename, archive.read(info)))
+            except (zipfile.BadZipFile, NotImplementedError, OSError, EOFError, zlib.error) as e:
+                # A corrupt member only costs that file
+                print(f"Skipping unreadable ZIP member {info.filename}: {e}")
+        return members